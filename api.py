@@ -0,0 +1,117 @@
+"""
+JSON/NDJSON endpoints on top of the same cached enrichment used by the Dash pages.
+
+POST /api/enrich?file_type=req|pip_freeze
+    body: raw requirements.txt or pip freeze text, its --extra-index-url lines are used
+    streams one NDJSON record per library as soon as its lookup finishes
+POST /api/upload?file_type=req|pip_freeze
+    body: raw file (not base64), parsed line by line as it arrives
+    returns the parsed libraries and the --extra-index-url lines, ready for the stores
+GET /api/packages/<name>
+    timeline summary of a package
+GET /api/packages/<name>/changelogs?from=<version>&to=<version>
+    release notes between two versions (both optional, both included), 400 if one of
+    them isn't a valid version
+"""
+
+import json
+from flask import Blueprint, Response, abort, jsonify, request, stream_with_context
+from packaging.version import InvalidVersion, Version
+from werkzeug.exceptions import HTTPException
+import report
+import utils
+
+api = Blueprint("api", __name__, url_prefix="/api")
+
+# keep the pool small: every gunicorn worker can serve several streams at once
+API_WORKERS = 8
+
+
+@api.errorhandler(HTTPException)
+def json_error(err):
+    return jsonify(error=err.description), err.code
+
+
+def ndjson_response(records) -> Response:
+    return Response(
+        stream_with_context(json.dumps(record) + "\n" for record in records),
+        mimetype="application/x-ndjson",
+        # ask reverse proxies not to buffer the stream
+        headers={"X-Accel-Buffering": "no"},
+    )
+
+
+@api.post("/enrich")
+def enrich():
+    file_type = request.args.get("file_type", "req")
+    if file_type not in ["req", "pip_freeze"]:
+        abort(400, description="file_type must be 'req' or 'pip_freeze'")
+    text = request.get_data(as_text=True)
+    libs = utils.parse_requirements_text(text, file_type=file_type)
+    extra_index_urls = utils.extract_index_urls(utils.extract_extra_index_url(text))
+
+    def records():
+        for lib, row, err in utils.run_concurrently(
+            lambda lib: utils.enrich_library(lib, extra_index_urls),
+            libs,
+            workers=API_WORKERS,
+        ):
+            if err:
+                row = dict(lib, error=repr(err))
+            yield report.report_row(row)
+
+    return ndjson_response(records())
+
+
+@api.post("/upload")
+def upload():
+    file_type = request.args.get("file_type", "req")
+    if file_type not in ["req", "pip_freeze"]:
+        abort(400, description="file_type must be 'req' or 'pip_freeze'")
+    libs, extra_index_lines = utils.parse_requirements_lines(
+        utils.iter_stream_lines(request.stream), file_type=file_type
+    )
+    return jsonify(libraries=libs, extra_index_url=extra_index_lines)
+
+
+@api.get("/packages/<name>")
+def package(name):
+    lib = utils.get_library_history(name)
+    if not lib["newest_version"]:
+        abort(404, description=f"{name} was not found on PyPI")
+    timeline = utils.get_package_timeline(name)
+    repo_url = utils.get_repo_url(lib)
+    return jsonify(
+        name=lib["name"],
+        newest_version=lib["newest_version"],
+        newest_release_date=lib["newest_release_date"],
+        versions=timeline["versions"],
+        # the timelines of the simple index don't have them
+        project_urls=utils.get_project_urls(name),
+        changelog_url=repo_url.get("changelog_url") or repo_url.get("url"),
+    )
+
+
+@api.get("/packages/<name>/changelogs")
+def package_changelogs(name):
+    bounds = {}
+    for param in ["from", "to"]:
+        value = request.args.get(param)
+        if value:
+            try:
+                bounds[param] = str(Version(value))
+            except InvalidVersion as err:
+                abort(400, description=f"{param}: {err}")
+    changelogs = utils.get_library_changelogs(name)
+    all_changelogs = changelogs.get("all_changelogs")
+    if not all_changelogs:
+        abort(404, description=changelogs.get("error_message", "No changelog found"))
+    versions = utils.versions_in_range(
+        changelogs["versions_reversed"],
+        min_version=bounds.get("from"),
+        max_version=bounds.get("to"),
+    )
+    return jsonify(
+        name=name.lower(),
+        versions=[dict(all_changelogs[v], version=v) for v in versions],
+    )
@@ -1,4 +1,5 @@
 import dash
+import flask
 from dash import Dash, dcc, html
 from dash import callback, Input, Output, State, ctx, Patch, set_props, ALL, MATCH
 import dash_mantine_components as dmc
@@ -8,15 +9,99 @@ from dash_iconify import DashIconify
 import utils
 import re
 import pages
+import snapshot
+import api
+import metrics
+import profiling
+import time
 
 app = Dash(
     __name__, suppress_callback_exceptions=True, on_error=utils.raise_callback_error
 )
 
 server = app.server
+server.register_blueprint(api.api)
 
 cache = utils.cache
 
+# start warm if a cache snapshot was baked into the image (CACHE_SNAPSHOT env var)
+snapshot.import_snapshot_at_boot()
+
+# cull and vacuum the cache periodically so it doesn't take over the disk
+utils.start_cache_maintenance()
+
+# every worker adds its metrics to the shared totals periodically
+metrics.start_flush(utils.caches["metrics"])
+
+
+@server.before_request
+def start_request_timer():
+    flask.g.request_start = time.perf_counter()
+
+
+@server.before_request
+def start_profiler():
+    if flask.request.path.endswith("/_dash-update-component") and profiling.requested(
+        flask.request, utils.caches["profiles"]
+    ):
+        flask.g.profiler = profiling.SamplingProfiler().start()
+
+
+@server.after_request
+def save_profile(response):
+    profiler = flask.g.pop("profiler", None)
+    if profiler is not None:
+        profiler.stop()
+        callback_request = flask.request.get_json(silent=True) or {}
+        profiling.save_profile(
+            utils.caches["profiles"],
+            profiler,
+            metrics.callback_label(callback_request.get("output")),
+            callback_request,
+        )
+    # ?profile=<secret> / ?profile=0 turns profiling on/off for the browser session
+    profile_arg = flask.request.args.get(profiling.PROFILE_COOKIE)
+    if profile_arg == "0":
+        response.delete_cookie(profiling.PROFILE_COOKIE)
+    elif profile_arg and profiling.is_secret(profile_arg):
+        response.set_cookie(
+            profiling.PROFILE_COOKIE,
+            profiling.session_token(),
+            httponly=True,
+            samesite="Strict",
+            secure=flask.request.is_secure,
+        )
+    return response
+
+
+@server.after_request
+def record_request_duration(response):
+    duration = time.perf_counter() - flask.g.get("request_start", time.perf_counter())
+    metrics.observe(
+        "http_server_request_seconds",
+        duration,
+        endpoint=flask.request.endpoint,
+        status=response.status_code,
+    )
+    if flask.request.path.endswith("/_dash-update-component"):
+        # dash parses the body first, get_json returns its cached result
+        callback_request = flask.request.get_json(silent=True) or {}
+        metrics.observe(
+            "dash_callback_seconds",
+            duration,
+            callback=metrics.callback_label(callback_request.get("output")),
+        )
+    return response
+
+
+@server.get("/metrics")
+def metrics_endpoint():
+    return flask.Response(
+        metrics.render(utils.caches["metrics"]),
+        mimetype="text/plain; version=0.0.4",
+    )
+
+
 app.layout = dmc.MantineProvider(
     [
         # notification container
@@ -79,6 +164,10 @@ app.layout = dmc.MantineProvider(
                 {"label": "Packages history", "value": "packages-history"},
                 {"label": "Changelogs", "value": "changelogs"},
                 {"label": "Strip requirements", "value": "strip-req"},
+                {"label": "Freeze diff", "value": "freeze-diff"},
+                {"label": "Portfolio", "value": "portfolio"},
+                {"label": "Search release notes", "value": "search-notes"},
+                {"label": "Error help", "value": "error-help"},
             ],
             value=None,
         ),
@@ -128,12 +217,24 @@ def change_content(
     pathname = dash.strip_relative_path(pathname)
     match pathname:
         case "packages-history":
-            return pages.packages_history.layout(store_req, store_pip)
+            return pages.packages_history.layout(store_req, store_pip, store_extra)
         case "changelogs":
             libs = search_str.removeprefix("?libs=").split("&") if search_str else None
             return pages.packages_changelogs.layout(libs, store_req, store_pip)
         case "strip-req":
             return pages.strip_req.layout(store_req, store_stripped_req, store_extra)
+        case "freeze-diff":
+            return pages.freeze_diff.layout(store_pip)
+        case "portfolio":
+            return pages.portfolio.layout()
+        case "search-notes":
+            return pages.search_notes.layout(store_req, store_pip)
+        case "error-help":
+            return pages.error_help.layout(store_req, store_pip)
+        case "cache-admin":
+            return pages.cache_admin.layout()
+        case "profiles":
+            return pages.profiles.layout()
         case _:
             return []
 
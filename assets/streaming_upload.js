@@ -0,0 +1,95 @@
+// Upload of requirements.txt / pip freeze files without dcc.Upload: the file is sent as
+// is (no base64 data url) to /api/upload, which parses it line by line while it arrives.
+// The parsed libraries go straight to the store of the upload set (utils.text_upload_set),
+// the textarea only shows the file when it is small enough. That content is also written
+// to the "streamed-upload" store, so that the textarea callbacks don't parse it again
+// (utils.is_streamed_upload).
+(function () {
+    // keep in sync with utils.STREAMED_UPLOAD_MARKER
+    const STREAMED_UPLOAD_MARKER = "# uploaded file, not shown: ";
+    const TEXTAREA_MAX_BYTES = 200 * 1024;
+
+    function apiUrl(fileType) {
+        const config = document.getElementById("_dash-config");
+        const prefix = config ? JSON.parse(config.textContent).requests_pathname_prefix : "/";
+        // the previous pip freeze of the freeze diff page is a pip freeze too
+        const parseAs = fileType === "req" ? "req" : "pip_freeze";
+        return `${prefix}api/upload?file_type=${parseAs}`;
+    }
+
+    function notify(message) {
+        dash_clientside.set_props("notification-container", {
+            sendNotifications: [
+                {action: "show", message: message, color: "red", autoClose: false},
+            ],
+        });
+    }
+
+    async function upload(button, file) {
+        const uploadId = JSON.parse(button.id);
+        const fileType = uploadId.index;
+        dash_clientside.set_props(uploadId, {loading: true});
+        try {
+            const response = await fetch(apiUrl(fileType), {
+                method: "POST",
+                body: file,
+                headers: {"Content-Type": "text/plain; charset=utf-8"},
+            });
+            const result = await response.json();
+            if (!response.ok) {
+                throw new Error(result.error);
+            }
+            dash_clientside.set_props({type: "store", index: fileType}, {data: result.libraries});
+            if (fileType === "req") {
+                dash_clientside.set_props("store_extra", {
+                    data: {extra_index_url: result.extra_index_url},
+                });
+            }
+            const textarea = {type: "textarea", index: fileType};
+            if (file.size <= TEXTAREA_MAX_BYTES) {
+                const text = (await file.text()).replace(/^\uFEFF/, "");
+                // before the textarea, which triggers the callbacks reading it
+                dash_clientside.set_props({type: "streamed-upload", index: fileType}, {data: text});
+                dash_clientside.set_props(textarea, {value: text});
+            } else {
+                dash_clientside.set_props(textarea, {
+                    value: `${STREAMED_UPLOAD_MARKER}${file.name} (${result.libraries.length} libraries)`,
+                });
+            }
+        } catch (err) {
+            notify(`${file.name} couldn't be uploaded: ${err.message}`);
+        } finally {
+            dash_clientside.set_props(uploadId, {loading: false});
+        }
+    }
+
+    // the buttons are rendered by dash at any time, listen on the document
+    document.addEventListener("click", function (event) {
+        const button = event.target.closest(".streaming-upload");
+        if (!button) {
+            return;
+        }
+        const input = document.createElement("input");
+        input.type = "file";
+        input.addEventListener("change", function () {
+            if (input.files.length) {
+                upload(button, input.files[0]);
+            }
+        });
+        input.click();
+    });
+
+    document.addEventListener("dragover", function (event) {
+        if (event.target.closest(".streaming-upload")) {
+            event.preventDefault();
+        }
+    });
+
+    document.addEventListener("drop", function (event) {
+        const button = event.target.closest(".streaming-upload");
+        if (button && event.dataTransfer.files.length) {
+            event.preventDefault();
+            upload(button, event.dataTransfer.files[0]);
+        }
+    });
+})();
@@ -0,0 +1,3 @@
+"""
+Offline benchmarks of the hot paths, see __main__.py.
+"""
@@ -0,0 +1,253 @@
+"""
+Benchmarks of the hot paths, replaying recorded PyPI/GitHub responses (offline,
+deterministic). Results are appended to benchmarks/results.jsonl, which is committed,
+and compared with the previous run on the same machine and fixtures.
+
+Usage:
+    python -m benchmarks run
+    python -m benchmarks run --filter history/layout --rounds 10
+    python -m benchmarks run --no-save --fail-on-regression 0.2
+    python -m benchmarks record --packages requests flask dash
+    GITHUB_PAT=... python -m benchmarks record requirements.txt
+"""
+
+import argparse
+import atexit
+import datetime
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results.jsonl")
+
+# a mix of small and large release histories
+DEFAULT_PACKAGES = [
+    "anyio",
+    "attrs",
+    "babel",
+    "black",
+    "boto3",
+    "celery",
+    "certifi",
+    "click",
+    "cryptography",
+    "dash",
+    "dash-ag-grid",
+    "dash-mantine-components",
+    "diskcache",
+    "flask",
+    "jinja2",
+    "numpy",
+    "pandas",
+    "plotly",
+    "pydantic",
+    "pygithub",
+    "requests",
+    "sqlalchemy",
+    "urllib3",
+    "werkzeug",
+]
+
+
+def isolated_environment(**env):
+    """
+    Run with an empty cache (a temporary directory) and the given settings, before
+    `utils` reads them at import time.
+    """
+    cache_directory = tempfile.mkdtemp(prefix="benchmarks-cache-")
+    atexit.register(shutil.rmtree, cache_directory, ignore_errors=True)
+    os.environ["CACHE_DIRECTORY"] = cache_directory
+    os.environ.update(env)
+    # the repo root, to import utils and pages when run from anywhere
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def machine_id() -> str:
+    return os.environ.get("BENCHMARK_MACHINE") or platform.node()
+
+
+def previous_results(
+    fixtures_date: str, fixture_sources: dict, path: str = RESULTS_PATH
+) -> dict:
+    """
+    Results of the last run on this machine with the same fixtures (recording date and
+    sources, see `fixtures.fixture_sources`), {benchmark: result}: runs against other
+    fixtures aren't comparable.
+    """
+    if not os.path.exists(path):
+        return {}
+    last = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if (
+                entry["machine"] == machine_id()
+                and entry.get("fixtures") == fixtures_date
+                and entry.get("fixture_sources") == fixture_sources
+            ):
+                last = entry["results"]
+    return last
+
+
+def record(args):
+    isolated_environment()
+    import utils
+    from benchmarks import fixtures
+
+    names = list(args.packages or [])
+    for path in args.files:
+        with open(path, encoding="utf-8-sig") as f:
+            names += [lib["name"] for lib in utils.parse_requirements_text(f.read())]
+    names = sorted(set(names or DEFAULT_PACKAGES))
+
+    responses = {}
+    if os.path.exists(args.output) and not args.overwrite:
+        responses = fixtures.load_fixtures(args.output)["responses"]
+    github_pat = os.environ.get("GITHUB_PAT")
+
+    def record_package(name):
+        utils.get_package_timeline(name)
+        urls_dict = utils.get_project_urls(name)
+        repo = utils.get_repo_url({"name": name, "urls_dict": urls_dict})
+        if github_pat and repo.get("is_github"):
+            utils.get_gh_changelogs(repo["url"])
+
+    with fixtures.recording(responses):
+        for name, _, err in utils.run_concurrently(record_package, names, workers=4):
+            print(f"{name}: {'failed ' + repr(err) if err else 'recorded'}", flush=True)
+    # get_project_urls recorded the JSON API payloads the html pages are derived from
+    derived = fixtures.derive_simple_records(responses, utils.PYPI_URL)
+    fixtures.write_fixtures(responses, utils.PYPI_URL, args.output)
+    print(f"{len(responses)} responses written to {args.output}")
+    if derived:
+        print(f"{derived} simple index pages were html: PEP 691 JSON derived instead")
+    if not github_pat:
+        print("GITHUB_PAT isn't set: GitHub releases will be generated when replayed")
+
+
+def run(args):
+    # fixtures is independent of utils, it tells which PyPI url was recorded
+    from benchmarks import fixtures
+
+    recorded = fixtures.load_fixtures(args.fixtures)
+    isolated_environment(
+        PYPI_URL=recorded["pypi_url"],
+        PYPI_SIMPLE_URL=f"{recorded['pypi_url']}/simple",
+        PYPI_FETCH_MODE="simple",
+        PYPI_RATE_LIMIT="0",
+        GITHUB_RATE_LIMIT="0",
+    )
+    os.environ.pop("GITHUB_PAT", None)
+    from benchmarks import suite
+
+    print(
+        f"fixtures of {recorded['recorded']}: {fixtures.describe_sources(recorded['responses'])}"
+    )
+    # before the suite adds the clones
+    fixture_sources = fixtures.fixture_sources(recorded["responses"])
+    benchmarks_suite = suite.Suite(recorded["responses"], recorded["pypi_url"])
+    previous = previous_results(recorded["recorded"], fixture_sources)
+    results = {}
+    regressions = []
+    for benchmark in benchmarks_suite.benchmarks():
+        if args.filter and not re.search(args.filter, benchmark.name):
+            continue
+        result = suite.run_benchmark(benchmark, args.rounds)
+        results[benchmark.name] = result
+        before = previous.get(benchmark.name)
+        change = ""
+        if before:
+            ratio = result["median"] / before["median"] - 1
+            change = f"{ratio:+.0%}"
+            if args.fail_on_regression is not None and ratio > args.fail_on_regression:
+                regressions.append(benchmark.name)
+        print(
+            f"{benchmark.name:<70} {result['median'] * 1000:>10.2f} ms  {change}",
+            flush=True,
+        )
+    if benchmarks_suite.replay.missing:
+        print(
+            f"{len(benchmarks_suite.replay.missing)} requests weren't recorded (answered with 404), e.g. {sorted(benchmarks_suite.replay.missing)[0]}"
+        )
+
+    if not args.no_save:
+        entry = {
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(
+                timespec="seconds"
+            ),
+            "commit": git_commit(),
+            "machine": machine_id(),
+            "python": platform.python_version(),
+            "fixtures": recorded["recorded"],
+            "fixture_sources": fixture_sources,
+            "results": results,
+        }
+        with open(RESULTS_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    if regressions:
+        print(f"regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+def main(argv=None):
+    # fixtures has no dependency on utils, the default path can be read safely
+    from benchmarks.fixtures import FIXTURES_PATH
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    subparsers = parser.add_subparsers(required=True)
+
+    parser_run = subparsers.add_parser("run", help="run the benchmarks offline")
+    parser_run.add_argument("--fixtures", default=FIXTURES_PATH)
+    parser_run.add_argument("--rounds", type=int, default=5)
+    parser_run.add_argument(
+        "--filter", help="regular expression on the benchmark names"
+    )
+    parser_run.add_argument(
+        "--no-save", action="store_true", help=f"don't append to {RESULTS_PATH}"
+    )
+    parser_run.add_argument(
+        "--fail-on-regression",
+        type=float,
+        help="exit with 1 if a median is this much slower than the previous run (0.2 = 20%%)",
+    )
+    parser_run.set_defaults(func=run)
+
+    parser_record = subparsers.add_parser(
+        "record", help="record the PyPI (and GitHub) responses of packages"
+    )
+    parser_record.add_argument(
+        "files", nargs="*", help="requirements.txt or pip freeze files"
+    )
+    parser_record.add_argument("--packages", nargs="*")
+    parser_record.add_argument("--output", default=FIXTURES_PATH)
+    parser_record.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="drop the responses already recorded in the output",
+    )
+    parser_record.set_defaults(func=record)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
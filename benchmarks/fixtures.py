@@ -0,0 +1,411 @@
+"""
+Recorded HTTP responses, replayed instead of the network.
+
+Every outbound request of the app goes through `requests.adapters.HTTPAdapter.send`,
+`utils.session` and the private sessions of PyGithub alike, so recording and replaying
+happen there: the code under test runs unchanged.
+
+The fixture file is gzipped JSON:
+{"format", "version", "recorded", "pypi_url", "responses": {"GET <url>": response}}
+where a response is {"status", "headers", "body"} or {"error"} for the requests that
+failed while recording (replayed as a ConnectionError).
+
+Not every response is a recording (see `fixture_sources`):
+- PEP 691 simple index responses are recorded when the index serves them. When it only
+  answered with html (some mirrors and proxies ignore the Accept header), they are
+  derived from the recorded `/pypi/<name>/json` payload of the package instead, so that
+  the default (simple) fetch mode is the one measured. Those records have a
+  "derived_from" field naming the response they were built from.
+- GitHub releases are only recorded when GITHUB_PAT is set (api.github.com has a low
+  anonymous rate limit). The GitHub API requests that weren't recorded are answered with
+  releases generated from the repo name (`synthetic_github_response`): same payload
+  shape, deterministic tag names, dates and markdown bodies, but not real release notes.
+"""
+
+import contextlib
+import datetime
+import functools
+import gzip
+import json
+import os
+import random
+import re
+import threading
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+import requests
+from requests.structures import CaseInsensitiveDict
+
+FIXTURES_FORMAT = "libraries-changelogs-http-fixtures"
+FIXTURES_VERSION = 1
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "http.json.gz")
+
+GITHUB_API_URL = "https://api.github.com"
+SIMPLE_JSON_CONTENT_TYPE = "application/vnd.pypi.simple.v1+json"
+# only these headers matter to the app (simple api detection, github pagination)
+RECORDED_HEADERS = ["Content-Type", "Link", "ETag", "Last-Modified"]
+# releases per page of the github api (PyGithub default)
+GITHUB_PER_PAGE = 30
+# fields of the files of `/pypi/<name>/json` payloads read by the app
+PYPI_FILE_FIELDS = ["filename", "packagetype", "upload_time", "url", "yanked"]
+SYNTHETIC_NEWEST_RELEASE = datetime.datetime(
+    2025, 6, 2, 12, tzinfo=datetime.timezone.utc
+)
+
+
+def request_key(method: str, url: str) -> str:
+    return f"{method.upper()} {url}"
+
+
+def trim_pypi_json(body: str) -> str:
+    """
+    Keep the fields of a `/pypi/<name>/json` payload the app reads: the info (without
+    the description) and the first file of each release. The full payloads of packages
+    with many wheels weigh tens of MB.
+    """
+    data = json.loads(body)
+    info = {k: v for k, v in data["info"].items() if k != "description"}
+    releases = {
+        version: [{k: f.get(k) for k in PYPI_FILE_FIELDS} for f in files[:1]]
+        for version, files in data["releases"].items()
+    }
+    urls = [{k: f.get(k) for k in PYPI_FILE_FIELDS} for f in data["urls"]]
+    return json.dumps({"info": info, "releases": releases, "urls": urls})
+
+
+def simple_json_from_pypi_json(name: str, body: str) -> str:
+    """
+    PEP 691 (API version 1.1, with upload times) project page built from a
+    `/pypi/<name>/json` payload: the same versions and files, without hashes.
+    """
+    data = json.loads(body)
+    files = [
+        {
+            "filename": f["filename"],
+            "url": f["url"],
+            "hashes": {},
+            "upload-time": f"{f['upload_time']}Z" if f.get("upload_time") else None,
+            "yanked": f.get("yanked") or False,
+        }
+        for release_files in data["releases"].values()
+        for f in release_files
+    ]
+    return json.dumps(
+        {
+            "meta": {"api-version": "1.1"},
+            "name": name,
+            "versions": list(data["releases"]),
+            "files": files,
+        }
+    )
+
+
+def derive_simple_records(responses: dict, pypi_url: str) -> int:
+    """
+    Replace the simple index records that aren't PEP 691 JSON (html) with pages derived
+    from the JSON API records of the same packages (see `simple_json_from_pypi_json`).
+    Returns the number of records derived.
+    """
+    pattern = re.compile(rf"GET {re.escape(pypi_url)}/simple/([^/]+)/")
+    derived = 0
+    for key, record in list(responses.items()):
+        match = pattern.fullmatch(key)
+        if not match or "error" in record or record["status"] != 200:
+            continue
+        if (
+            record["headers"]
+            .get("Content-Type", "")
+            .startswith(SIMPLE_JSON_CONTENT_TYPE)
+        ):
+            continue
+        name = match.group(1)
+        source = request_key("GET", f"{pypi_url}/pypi/{name}/json")
+        json_record = responses.get(source)
+        if not json_record or json_record.get("status") != 200:
+            continue
+        responses[key] = {
+            "status": 200,
+            "headers": {"Content-Type": SIMPLE_JSON_CONTENT_TYPE},
+            "body": simple_json_from_pypi_json(name, json_record["body"]),
+            "derived_from": source,
+        }
+        derived += 1
+    return derived
+
+
+def fixture_sources(responses: dict) -> dict:
+    """
+    Number of recorded and derived responses, and of the recorded GitHub ones (the
+    others are generated when replayed).
+    """
+    github = urlsplit(GITHUB_API_URL).hostname
+    derived = sum("derived_from" in record for record in responses.values())
+    recorded_github = sum(
+        urlsplit(key.split(" ", 1)[1]).hostname == github for key in responses
+    )
+    return {
+        "recorded": len(responses) - derived,
+        "derived_simple_index": derived,
+        "recorded_github": recorded_github,
+    }
+
+
+def describe_sources(responses: dict) -> str:
+    sources = fixture_sources(responses)
+    github = (
+        f"{sources['recorded_github']} recorded GitHub responses, other repos get generated releases"
+        if sources["recorded_github"]
+        else "GitHub releases are generated (synthetic)"
+    )
+    return (
+        f"{sources['recorded']} recorded responses, {sources['derived_simple_index']} "
+        f"PEP 691 responses derived from the JSON API ones, {github}"
+    )
+
+
+def response_record(response: requests.Response) -> dict:
+    body = response.text
+    path = urlsplit(response.url).path
+    content_type = response.headers.get("Content-Type", "")
+    if response.ok and re.search(r"/pypi/[^/]+/json$", path):
+        body = trim_pypi_json(body)
+    elif "/simple/" in path and content_type.startswith("text/html"):
+        # the app only reads JSON simple indexes, see `derive_simple_records`
+        body = ""
+    return {
+        "status": response.status_code,
+        "headers": {
+            k: response.headers[k] for k in RECORDED_HEADERS if k in response.headers
+        },
+        "body": body,
+    }
+
+
+def build_response(request, record: dict) -> requests.Response:
+    response = requests.Response()
+    response.status_code = record["status"]
+    response.headers = CaseInsensitiveDict(record["headers"])
+    response._content = record["body"].encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = request.url
+    response.request = request
+    response.reason = "OK" if response.ok else "Error"
+    return response
+
+
+def load_fixtures(path: str = FIXTURES_PATH) -> dict:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        fixtures = json.load(f)
+    if fixtures.get("format") != FIXTURES_FORMAT:
+        raise ValueError(f"{path} is not an HTTP fixtures file")
+    return fixtures
+
+
+def write_fixtures(responses: dict, pypi_url: str, path: str = FIXTURES_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # mtime=0: the same responses give the same file
+    with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+        f.write(
+            json.dumps(
+                {
+                    "format": FIXTURES_FORMAT,
+                    "version": FIXTURES_VERSION,
+                    "recorded": datetime.date.today().isoformat(),
+                    "pypi_url": pypi_url,
+                    "responses": dict(sorted(responses.items())),
+                },
+                separators=(",", ":"),
+            ).encode("utf-8")
+        )
+
+
+@contextlib.contextmanager
+def recording(responses: dict):
+    """
+    Send the requests for real and add their responses to `responses`.
+    """
+    send = requests.adapters.HTTPAdapter.send
+    lock = threading.Lock()
+
+    def recording_send(adapter, request, **kwargs):
+        key = request_key(request.method, request.url)
+        try:
+            response = send(adapter, request, **kwargs)
+        except requests.ConnectionError as err:
+            with lock:
+                responses[key] = {"error": type(err).__name__}
+            raise
+        # the body has to be read before the session hooks see it
+        record = response_record(response)
+        with lock:
+            responses[key] = record
+        return response
+
+    with mock.patch.object(requests.adapters.HTTPAdapter, "send", recording_send):
+        yield responses
+
+
+# generated once per repo, not for every page (the generation isn't what is measured)
+@functools.lru_cache(maxsize=256)
+def synthetic_releases(repo: str) -> list[dict]:
+    """
+    Releases of a GitHub repo in the api format, newest first, generated from its name:
+    20 to 400 releases, one every few weeks, with bodies of a few lines to a few kB.
+    """
+    rng = random.Random(repo)
+    count = rng.randint(20, 400)
+    major, minor, patch = 0, 1, 0
+    gaps = [
+        datetime.timedelta(days=rng.randint(3, 40), hours=rng.randint(0, 23))
+        for _ in range(count)
+    ]
+    # the newest release is the same for every repo
+    date = SYNTHETIC_NEWEST_RELEASE - sum(gaps, datetime.timedelta())
+    releases = []
+    for i in range(count):
+        bump = rng.random()
+        if bump < 0.03:
+            major, minor, patch = major + 1, 0, 0
+        elif bump < 0.3:
+            minor, patch = minor + 1, 0
+        else:
+            patch += 1
+        date += gaps[i]
+        tag = f"v{major}.{minor}.{patch}"
+        sections = []
+        for section in rng.sample(
+            ["Features", "Fixes", "Deprecations", "Breaking changes", "Documentation"],
+            k=rng.randint(1, 4),
+        ):
+            lines = [
+                f"- {rng.choice(['Add', 'Fix', 'Remove', 'Deprecate', 'Support'])} "
+                f"`{rng.choice(['parse', 'load', 'dump', 'Client', 'Session', 'config'])}_{rng.randint(1, 99)}` "
+                f"{rng.choice(['handling of empty values', 'when the timeout is None', 'on Windows', 'for Python 3.13', 'in the async API'])} "
+                f"([#{rng.randint(100, 9999)}](https://github.com/{repo}/pull/{rng.randint(100, 9999)}))"
+                for _ in range(rng.randint(1, 25))
+            ]
+            sections.append(f"### {section}\n\n" + "\n".join(lines))
+        releases.append(
+            {
+                "id": i + 1,
+                "url": f"{GITHUB_API_URL}/repos/{repo}/releases/{i + 1}",
+                "html_url": f"https://github.com/{repo}/releases/tag/{tag}",
+                "tag_name": tag,
+                "name": tag,
+                "draft": False,
+                "prerelease": False,
+                "created_at": date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "published_at": date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "body": "\n\n".join(sections),
+            }
+        )
+    return releases[::-1]
+
+
+def synthetic_github_response(url: str, api_url: str = GITHUB_API_URL) -> dict | None:
+    """
+    Answer the GitHub API requests of `utils.get_gh_changelogs` (repo, paginated
+    releases) with `synthetic_releases`. Other urls return None.
+    """
+    parts = urlsplit(url)
+    base = urlsplit(api_url)
+    if parts.hostname != base.hostname:
+        return None
+    path = parts.path.removeprefix(base.path.rstrip("/"))
+    match = re.fullmatch(r"/repos/([^/]+/[^/]+)(/releases)?/?", path)
+    if not match:
+        return None
+    repo, releases_path = match.groups()
+    repo_url = f"{api_url.rstrip('/')}/repos/{repo}"
+    if not releases_path:
+        owner, name = repo.split("/")
+        body = {
+            "id": random.Random(repo).randint(1, 10**8),
+            "name": name,
+            "full_name": repo,
+            "owner": {"login": owner},
+            "url": repo_url,
+            "html_url": f"https://github.com/{repo}",
+        }
+        return {
+            "status": 200,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps(body),
+        }
+
+    query = parse_qs(parts.query)
+    page = int(query.get("page", ["1"])[0])
+    per_page = int(query.get("per_page", [GITHUB_PER_PAGE])[0])
+    releases = synthetic_releases(repo)
+    last = max(1, -(-len(releases) // per_page))
+    headers = {"Content-Type": "application/json"}
+    links = []
+    if page < last:
+        links.append(
+            f'<{repo_url}/releases?per_page={per_page}&page={page + 1}>; rel="next"'
+        )
+        links.append(
+            f'<{repo_url}/releases?per_page={per_page}&page={last}>; rel="last"'
+        )
+    if links:
+        headers["Link"] = ", ".join(links)
+    body = releases[(page - 1) * per_page : page * per_page]
+    return {"status": 200, "headers": headers, "body": json.dumps(body)}
+
+
+def clone_packages(responses: dict, pypi_url: str, count: int) -> list[str]:
+    """
+    Add `count` packages to `responses`, copies of the recorded ones named
+    "<package>-clone<i>", for benchmarks that need more packages than were recorded.
+    Returns the names of the recorded packages followed by the clones, `count` in total.
+    """
+    pattern = re.compile(rf"GET {re.escape(pypi_url)}/(simple|pypi)/([^/]+)/(json)?")
+    templates = {}
+    for key in responses:
+        match = pattern.fullmatch(key)
+        if match and "error" not in responses[key]:
+            templates.setdefault(match.group(2), []).append(key)
+    recorded = sorted(templates)
+    names = list(recorded)
+    for i in range(max(0, count - len(recorded))):
+        template = recorded[i % len(recorded)]
+        name = f"{template}-clone{i}"
+        for key in templates[template]:
+            responses[key.replace(f"/{template}/", f"/{name}/")] = responses[key]
+        names.append(name)
+    return names[:count]
+
+
+class Replay:
+    """
+    Context manager answering every request from `responses`, so that nothing leaves
+    the machine. Requests that weren't recorded get a 404 and are listed in `missing`.
+    """
+
+    def __init__(self, responses: dict, github_api_url: str = GITHUB_API_URL):
+        self.responses = responses
+        self.github_api_url = github_api_url
+        self.missing = set()
+        self._patch = mock.patch.object(
+            requests.adapters.HTTPAdapter, "send", self.send
+        )
+
+    def send(self, request, **kwargs):
+        key = request_key(request.method, request.url)
+        record = self.responses.get(key) or synthetic_github_response(
+            request.url, self.github_api_url
+        )
+        if record is None:
+            self.missing.add(key)
+            record = {"status": 404, "headers": {}, "body": "Not Found"}
+        if "error" in record:
+            raise requests.ConnectionError(f"{record['error']} (recorded) for {key}")
+        return build_response(request, record)
+
+    def __enter__(self):
+        # send is patched on the class, it is called without the adapter
+        self._patch.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._patch.stop()
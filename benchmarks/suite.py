@@ -0,0 +1,272 @@
+"""
+The benchmarks: hot paths of the app, run against the replayed fixtures (see
+fixtures.py). `utils` must be imported after the environment is set up by __main__.py
+(cache directory, rate limits, PyPI url).
+"""
+
+import dataclasses
+import statistics
+import time
+from unittest import mock
+import utils
+from pages.packages_changelogs import version_markdown_format
+from pages import packages_history
+from benchmarks import fixtures
+
+# packages of the grid and layout benchmarks
+SIZES = [10, 100, 1000]
+# lines of the requirements text of the parse benchmarks
+REQUIREMENTS_LINES = 2000
+# repos of the get_gh_changelogs benchmarks, PyGithub waits 0.25 s between two requests
+GITHUB_REPOS = 5
+
+
+@dataclasses.dataclass
+class Benchmark:
+    name: str
+    func: callable
+    # called before each round, not timed (e.g. to empty the caches)
+    setup: callable = None
+    rounds: int = None
+
+
+def clear_caches(*namespaces):
+    for namespace in namespaces:
+        utils.caches[namespace].clear()
+
+
+class Suite:
+    """
+    Builds the inputs of the benchmarks once, from the recorded packages and their
+    clones, and lists the benchmarks.
+    """
+
+    def __init__(self, responses: dict, pypi_url: str):
+        self.replay = fixtures.Replay(responses)
+        self.names = fixtures.clone_packages(responses, pypi_url, max(SIZES))
+        self.recorded = [name for name in self.names if "-clone" not in name]
+        with self.replay:
+            timelines = {name: utils.get_package_timeline(name) for name in self.names}
+        # pin every package to its oldest version, so that every row has dates and lags
+        self.requirements = {
+            name: next(iter(timeline["versions"]), None)
+            for name, timeline in timelines.items()
+        }
+        lines = [
+            f"{name}=={version}" if version else name
+            for name, version in self.requirements.items()
+        ]
+        # with the comments and options of real files
+        lines[:0] = [
+            "# generated requirements",
+            "--extra-index-url https://example.org/simple",
+        ]
+        self.requirements_text = "\n".join(
+            (lines * (REQUIREMENTS_LINES // len(lines) + 1))[:REQUIREMENTS_LINES]
+        )
+        self.requirements_lines = self.requirements_text.split("\n")
+
+        with self.replay:
+            repos = [
+                utils.get_repo_url(
+                    {"name": name, "urls_dict": utils.get_project_urls(name)}
+                )
+                for name in self.recorded
+            ]
+        self.repo_urls = sorted(
+            {repo["url"] for repo in repos if repo.get("is_github")}
+        )[:GITHUB_REPOS]
+
+        with self.replay:
+            changelogs = [
+                utils.get_gh_changelogs(url, github_pat="benchmark")
+                for url in self.repo_urls
+            ]
+        self.largest_changelog = max(changelogs, key=len, default={})
+        # every version of every repo, as if it was one huge changelog
+        self.all_changelogs = {
+            f"{url}@{version}": notes
+            for url, changelog in zip(self.repo_urls, changelogs)
+            for version, notes in changelog.items()
+        }
+        self.stores = {
+            size: utils.parse_requirements_text(
+                "\n".join(
+                    f"{name}=={self.requirements[name]}" for name in self.names[:size]
+                )
+            )
+            for size in SIZES
+        }
+        with self.replay:
+            self.histories = {
+                size: [utils.get_library_history(lib) for lib in self.stores[size]]
+                for size in SIZES
+            }
+        self.grid_records = {
+            size: utils.staleness_frame(histories).to_dict("records")
+            for size, histories in self.histories.items()
+        }
+
+    def parse_benchmarks(self):
+        lines = self.requirements_lines
+        cold = lambda: clear_caches("parse")
+        yield Benchmark(
+            f"parse/read_requirements_text[{len(lines)} lines, cold]",
+            lambda: utils.read_requirements_text(self.requirements_text),
+            setup=cold,
+        )
+        yield Benchmark(
+            f"parse/read_requirements_text[{len(lines)} lines, warm]",
+            lambda: utils.read_requirements_text(self.requirements_text),
+        )
+        yield Benchmark(
+            f"parse/extract_name_version[{len(lines)} lines, cold]",
+            lambda: [utils.extract_name_version(line) for line in lines],
+            setup=cold,
+        )
+        yield Benchmark(
+            f"parse/extract_name_version[{len(lines)} lines, warm]",
+            lambda: [utils.extract_name_version(line) for line in lines],
+        )
+        yield Benchmark(
+            f"parse/extract_version_from_string[{len(lines)} lines, cold]",
+            lambda: [utils.extract_version_from_string(line) for line in lines],
+            setup=cold,
+        )
+        yield Benchmark(
+            f"parse/extract_version_from_string[{len(lines)} lines, warm]",
+            lambda: [utils.extract_version_from_string(line) for line in lines],
+        )
+        yield Benchmark(
+            f"parse/parse_requirements_text[{len(lines)} lines]",
+            lambda: utils.parse_requirements_text(self.requirements_text),
+        )
+
+    def history_benchmarks(self):
+        libs = [
+            {"name": name, "req_version": self.requirements[name]}
+            for name in self.recorded
+        ]
+
+        def history():
+            with self.replay:
+                return [utils.get_library_history(lib) for lib in libs]
+
+        yield Benchmark(
+            f"history/get_library_history[{len(libs)} packages, cold]",
+            history,
+            setup=lambda: clear_caches("timelines", "pypi"),
+        )
+        yield Benchmark(
+            f"history/get_library_history[{len(libs)} packages, warm]", history
+        )
+
+        def history_json_api():
+            with mock.patch.object(utils, "PYPI_FETCH_MODE", "json"):
+                return history()
+
+        # the fallback of the indexes without PEP 691 (the cold benchmark above reads the
+        # simple index)
+        yield Benchmark(
+            f"history/get_library_history[{len(libs)} packages, cold, json api]",
+            history_json_api,
+            setup=lambda: clear_caches("timelines", "pypi"),
+        )
+
+        for size in SIZES:
+            histories = self.histories[size]
+            records = self.grid_records[size]
+
+            # the row data (staleness columns) and the grid, as the layout builds them
+            # once the histories are cached
+            def grid_build(histories=histories):
+                with self.replay:
+                    rows = utils.staleness_frame(histories).to_dict("records")
+                return packages_history.libraries_grid.__wrapped__(rows, True, False)
+
+            yield Benchmark(
+                f"history/libraries_grid[{size} packages, rows and build]", grid_build
+            )
+            yield Benchmark(
+                f"history/libraries_grid[{size} packages, cached]",
+                lambda records=records: packages_history.libraries_grid(
+                    records, True, False
+                ),
+            )
+
+        for size in SIZES:
+            store = self.stores[size]
+
+            def layout(store=store):
+                with self.replay:
+                    return packages_history.layout(store, None, {})
+
+            yield Benchmark(
+                f"history/layout[{size} packages, cold]",
+                layout,
+                setup=lambda: clear_caches("timelines", "pypi", "components"),
+                rounds=3 if size >= 1000 else None,
+            )
+            yield Benchmark(f"history/layout[{size} packages, warm]", layout)
+
+    def changelog_benchmarks(self):
+        def gh_changelogs():
+            with self.replay:
+                return [
+                    utils.get_gh_changelogs(url, github_pat="benchmark")
+                    for url in self.repo_urls
+                ]
+
+        yield Benchmark(
+            f"changelogs/get_gh_changelogs[{len(self.repo_urls)} repos, cold]",
+            gh_changelogs,
+            setup=lambda: clear_caches("release_notes"),
+        )
+        yield Benchmark(
+            f"changelogs/get_gh_changelogs[{len(self.repo_urls)} repos, warm]",
+            gh_changelogs,
+        )
+
+        largest = self.largest_changelog
+        yield Benchmark(
+            f"changelogs/version_markdown_format[{len(largest)} versions]",
+            lambda: version_markdown_format(largest, list(largest)),
+        )
+        everything = self.all_changelogs
+        yield Benchmark(
+            f"changelogs/version_markdown_format[{len(everything)} versions]",
+            lambda: version_markdown_format(everything, list(everything)),
+        )
+
+    def benchmarks(self):
+        yield from self.parse_benchmarks()
+        yield from self.history_benchmarks()
+        yield from self.changelog_benchmarks()
+
+
+def run_benchmark(benchmark: Benchmark, rounds: int) -> dict:
+    """
+    Time `rounds` calls (at least one) of a benchmark. Benchmarks without setup get a
+    warm-up call first, which fills the caches of the warm benchmarks.
+
+    Returns
+    -------
+    dict
+        min, median and max durations in seconds, and the number of rounds.
+    """
+    rounds = max(1, min(rounds, benchmark.rounds or rounds))
+    if not benchmark.setup:
+        benchmark.func()
+    durations = []
+    for _ in range(rounds):
+        if benchmark.setup:
+            benchmark.setup()
+        start = time.perf_counter()
+        benchmark.func()
+        durations.append(time.perf_counter() - start)
+    return {
+        "min": round(min(durations), 6),
+        "median": round(statistics.median(durations), 6),
+        "max": round(max(durations), 6),
+        "rounds": rounds,
+    }
@@ -0,0 +1,301 @@
+"""
+Command line entry points that share the cache with the web app.
+
+Usage:
+    python cli.py snapshot-export cache_snapshot.ndjson.gz
+    python cli.py snapshot-import cache_snapshot.ndjson.gz
+    python cli.py warm requirements.txt --file-type req --workers 8
+    python cli.py report pip_freeze.txt --file-type pip_freeze --format csv -o report.csv
+    python cli.py portfolio services/*/requirements.txt --who-pins "urllib3<2"
+    python cli.py import-index import_index.json.gz --packages top-packages.txt --installed
+"""
+
+import argparse
+import csv
+import glob
+import os
+import sys
+import time
+import import_index
+import report
+import snapshot
+import utils
+
+
+def read_libraries(paths: list[str], file_type: str) -> list[dict]:
+    libs = []
+    for path in paths:
+        with open(path, encoding="utf-8-sig") as f:
+            libs += utils.parse_requirements_text(f.read(), file_type=file_type)
+    return libs
+
+
+def read_extra_index_urls(
+    paths: list[str], extra_index_urls: list[str] = ()
+) -> list[str]:
+    """
+    Return the --extra-index-url urls of the files, plus the ones given in the command line.
+    """
+    index_urls = list(extra_index_urls)
+    for path in paths:
+        with open(path, encoding="utf-8-sig") as f:
+            lines = utils.extract_extra_index_url(f.read())
+        index_urls += [
+            url for url in utils.extract_index_urls(lines) if url not in index_urls
+        ]
+    return index_urls
+
+
+def snapshot_export(args):
+    counts = snapshot.export_snapshot(args.path)
+    for namespace, count in counts.items():
+        print(f"{namespace}: {count} entries exported")
+
+
+def snapshot_import(args):
+    counts = snapshot.import_snapshot(args.path, overwrite=args.overwrite)
+    for namespace, count in counts.items():
+        print(f"{namespace}: {count} entries imported")
+
+
+def warm(args):
+    names = sorted({lib["name"] for lib in read_libraries(args.files, args.file_type)})
+
+    extra_index_urls = read_extra_index_urls(args.files, args.extra_index_url)
+
+    def warm_library(name):
+        utils.find_package_timeline(name, extra_index_urls)
+        if args.changelogs:
+            utils.get_library_changelogs(name)
+
+    failures = []
+    start = time.perf_counter()
+    for count, (name, _, err) in enumerate(
+        utils.run_concurrently(warm_library, names, workers=args.workers), start=1
+    ):
+        if err:
+            failures.append(name)
+            print(f"[{count}/{len(names)}] {name} failed: {err!r}", flush=True)
+        else:
+            print(f"[{count}/{len(names)}] {name}", flush=True)
+
+    print(
+        f"{len(names) - len(failures)}/{len(names)} packages warmed "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    if failures:
+        print(f"failed: {', '.join(failures)}")
+        sys.exit(1)
+
+
+def report_command(args):
+    # one row per (file, library), the enrichment itself is shared through the cache
+    items = [
+        (path, lib)
+        for path in args.files
+        for lib in read_libraries([path], args.file_type)
+    ]
+
+    extra_index_urls = read_extra_index_urls(args.files, args.extra_index_url)
+
+    def enrich(item):
+        path, lib = item
+        return dict(utils.enrich_library(lib, extra_index_urls), source_file=path)
+
+    def rows():
+        for (path, lib), row, err in utils.run_concurrently(
+            enrich, items, workers=args.workers
+        ):
+            if err:
+                row = dict(lib, source_file=path, error=repr(err))
+            yield row
+
+    start = time.perf_counter()
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            count = report.write_report(rows(), f, args.format)
+    else:
+        count = report.write_report(rows(), sys.stdout, args.format)
+    print(
+        f"{count} rows written in {time.perf_counter() - start:.1f}s", file=sys.stderr
+    )
+
+
+def portfolio(args):
+    manifests = {
+        path: libs for path in args.files for libs in [read_libraries([path], "req")]
+    }
+    portfolio_index = utils.build_portfolio_index(manifests)
+    if args.who_pins:
+        name, version = args.who_pins.split("<", 1)
+        for entry in utils.projects_pinning_below(portfolio_index, name, version):
+            print(f"{entry['project']}: {name}{entry['pinned']}{entry['version']}")
+        return
+
+    # package x project matrix, every package is looked up once
+    newest = {
+        name: lib.get("newest_version")
+        for name, lib, err in utils.run_concurrently(
+            utils.get_library_history, list(portfolio_index), workers=args.workers
+        )
+        if not err
+    }
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["name", "newest_version"] + args.files)
+    for name, entries in sorted(portfolio_index.items()):
+        writer.writerow(
+            [name, newest.get(name)]
+            + [entries.get(path, {}).get("version") for path in args.files]
+        )
+
+
+def import_index_command(args):
+    wheel_paths = []
+    for path in args.wheels:
+        wheel_paths += (
+            glob.glob(os.path.join(path, "*.whl")) if os.path.isdir(path) else [path]
+        )
+    package_names = []
+    for path in args.packages:
+        with open(path, encoding="utf-8-sig") as f:
+            # one name per line, or a requirements.txt / pip freeze
+            package_names += [
+                lib["name"]
+                for lib in utils.parse_requirements_text(f.read(), file_type="req")
+            ]
+
+    start = time.perf_counter()
+    modules, failed = import_index.build_import_index(
+        wheel_paths,
+        sorted(set(package_names)),
+        installed=args.installed or not (wheel_paths or package_names),
+        workers=args.workers,
+    )
+    count = import_index.write_import_index(modules, args.path)
+    print(
+        f"{len(modules)} import names of {count} distributions written to {args.path} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    if failed:
+        print(f"failed: {', '.join(failed)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    subparsers = parser.add_subparsers(required=True)
+
+    export_parser = subparsers.add_parser(
+        "snapshot-export", help="export package timelines and release notes"
+    )
+    export_parser.add_argument("path", help="snapshot file (.ndjson.gz)")
+    export_parser.set_defaults(func=snapshot_export)
+
+    import_parser = subparsers.add_parser(
+        "snapshot-import", help="load a snapshot into the cache"
+    )
+    import_parser.add_argument("path", help="snapshot file (.ndjson.gz)")
+    import_parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="replace the entries that are already cached",
+    )
+    import_parser.set_defaults(func=snapshot_import)
+
+    warm_parser = subparsers.add_parser(
+        "warm", help="pre-populate the history and changelog caches"
+    )
+    warm_parser.add_argument(
+        "files", nargs="+", help="requirements.txt / pip freeze files"
+    )
+    warm_parser.add_argument(
+        "--file-type", choices=["req", "pip_freeze"], default="req"
+    )
+    warm_parser.add_argument(
+        "--extra-index-url",
+        action="append",
+        default=[],
+        help="private index to query with pypi (repeatable), added to the ones in the files",
+    )
+    warm_parser.add_argument(
+        "--workers", type=int, default=8, help="concurrent lookups (default 8)"
+    )
+    warm_parser.add_argument(
+        "--no-changelogs",
+        dest="changelogs",
+        action="store_false",
+        help="only warm the package timelines",
+    )
+    warm_parser.set_defaults(func=warm)
+
+    report_parser = subparsers.add_parser(
+        "report", help="write a versions/staleness/changelogs report"
+    )
+    report_parser.add_argument(
+        "files", nargs="+", help="requirements.txt / pip freeze files"
+    )
+    report_parser.add_argument(
+        "--file-type", choices=["req", "pip_freeze"], default="req"
+    )
+    report_parser.add_argument(
+        "--extra-index-url",
+        action="append",
+        default=[],
+        help="private index to query with pypi (repeatable), added to the ones in the files",
+    )
+    report_parser.add_argument(
+        "--format", choices=report.REPORT_FORMATS, default="ndjson"
+    )
+    report_parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    report_parser.add_argument(
+        "--workers", type=int, default=8, help="concurrent lookups (default 8)"
+    )
+    report_parser.set_defaults(func=report_command)
+
+    portfolio_parser = subparsers.add_parser(
+        "portfolio", help="package x project matrix of many requirements.txt files"
+    )
+    portfolio_parser.add_argument("files", nargs="+", help="requirements.txt files")
+    portfolio_parser.add_argument(
+        "--who-pins",
+        metavar="PACKAGE<VERSION",
+        help="only list the projects pinning PACKAGE below VERSION",
+    )
+    portfolio_parser.add_argument(
+        "--workers", type=int, default=8, help="concurrent lookups (default 8)"
+    )
+    portfolio_parser.set_defaults(func=portfolio)
+
+    index_parser = subparsers.add_parser(
+        "import-index", help="build the import name -> distribution index"
+    )
+    index_parser.add_argument("path", help="index file (.json.gz)")
+    index_parser.add_argument(
+        "--wheels",
+        nargs="*",
+        default=[],
+        help="wheel files or directories of wheels",
+    )
+    index_parser.add_argument(
+        "--packages",
+        nargs="*",
+        default=[],
+        help="files listing PyPI projects (one per line or requirements.txt), "
+        "only the metadata of their latest wheel is downloaded",
+    )
+    index_parser.add_argument(
+        "--installed",
+        action="store_true",
+        help="add the distributions installed in this environment "
+        "(the default without --wheels or --packages)",
+    )
+    index_parser.add_argument(
+        "--workers", type=int, default=8, help="concurrent lookups (default 8)"
+    )
+    index_parser.set_defaults(func=import_index_command)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
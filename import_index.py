@@ -0,0 +1,240 @@
+import functools
+import gzip
+import importlib.metadata
+import io
+import json
+import os
+import zipfile
+from urllib.parse import urljoin
+from packaging.utils import canonicalize_name
+import utils
+
+IMPORT_INDEX_FORMAT = "libraries-changelogs-import-index"
+IMPORT_INDEX_VERSION = 1
+
+# built offline with `python cli.py import-index`, shipped next to the app
+IMPORT_INDEX_PATH = os.environ.get("IMPORT_INDEX", "import_index.json.gz")
+
+
+def record_top_level(paths) -> set[str]:
+    """
+    Top-level import names of a wheel from the paths of its RECORD (or namelist):
+    packages (foo/__init__.py, namespace packages too) and modules (foo.py,
+    foo.cpython-312-x86_64-linux-gnu.so).
+    """
+    names = set()
+    for path in paths:
+        first, _, rest = path.partition("/")
+        if first.endswith((".dist-info", ".data")) or first in ["..", "__pycache__"]:
+            continue
+        if rest:
+            names.add(first)
+        elif first.endswith((".py", ".so", ".pyd")):
+            names.add(first.split(".")[0])
+    return {name for name in names if name.isidentifier()}
+
+
+def wheel_top_level(wheel: zipfile.ZipFile) -> set[str]:
+    """
+    Top-level import names of a wheel: its `top_level.txt` when there is one (setuptools),
+    the top-level entries of its files otherwise (flit, hatch, poetry, maturin...).
+    """
+    for name in wheel.namelist():
+        if name.count("/") == 1 and name.endswith(".dist-info/top_level.txt"):
+            text = wheel.read(name).decode("utf-8")
+            names = {line.strip().replace("/", ".") for line in text.splitlines()}
+            # "foo.bar" entries are sub packages of a namespace package
+            names = {name.split(".")[0] for name in names if name}
+            if names:
+                return names
+    return record_top_level(wheel.namelist())
+
+
+class RemoteFile(io.RawIOBase):
+    """
+    Read-only, seekable file over HTTP range requests, so that `zipfile` only downloads
+    the central directory and the members it reads instead of the whole wheel.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.position = 0
+        response = utils.session.head(
+            url, allow_redirects=True, timeout=utils.PYPI_TIMEOUT
+        )
+        response.raise_for_status()
+        self.size = int(response.headers["Content-Length"])
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        else:
+            self.position = self.size + offset
+        return self.position
+
+    def readinto(self, buffer):
+        if self.position >= self.size or not len(buffer):
+            return 0
+        end = min(self.position + len(buffer), self.size) - 1
+        response = utils.session.get(
+            self.url,
+            headers={"Range": f"bytes={self.position}-{end}"},
+            timeout=utils.PYPI_TIMEOUT,
+        )
+        response.raise_for_status()
+        if response.status_code != 206:
+            # no range support, keep the part that was asked for
+            content = response.content[self.position : end + 1]
+        else:
+            content = response.content
+        buffer[: len(content)] = content
+        self.position += len(content)
+        return len(content)
+
+
+def pypi_wheel_top_level(name: str) -> set[str]:
+    """
+    Top-level import names of the latest wheel of a PyPI project, read remotely.
+    Projects without wheels (sdist only) and unknown projects return an empty set, other
+    errors (rate limit, 5xx) raise.
+    """
+    utils.rate_limiters["pypi"].wait()
+    response = utils.session.get(
+        f"{utils.PYPI_URL}/pypi/{name}/json", timeout=utils.PYPI_TIMEOUT
+    )
+    if response.status_code == 404:
+        return set()
+    response.raise_for_status()
+    # file urls can be relative to the index (mirrors, proxies)
+    wheels = [
+        urljoin(response.url, f["url"])
+        for f in response.json()["urls"]
+        if f["packagetype"] == "bdist_wheel"
+    ]
+    if not wheels:
+        return set()
+    # pure python wheels first, all platform wheels have the same import names
+    wheels.sort(key=lambda url: not url.endswith("-none-any.whl"))
+    remote = io.BufferedReader(RemoteFile(wheels[0]), buffer_size=64 * 1024)
+    with zipfile.ZipFile(remote) as wheel:
+        return wheel_top_level(wheel)
+
+
+def build_import_index(
+    wheel_paths=(), package_names=(), installed=False, workers=8
+) -> tuple[dict[str, set[str]], list[str]]:
+    """
+    Map top-level import names to the distributions providing them.
+
+    Parameters
+    ----------
+    wheel_paths : list of str
+        Local wheel files.
+    package_names : list of str
+        PyPI projects whose latest wheel is read remotely (range requests, a few kB each).
+    installed : bool
+        Add the distributions installed in the current environment.
+    workers : int
+        Number of concurrent PyPI lookups.
+
+    Returns
+    -------
+    tuple
+        {import name: {canonical distribution names}} and the PyPI projects that
+        couldn't be read.
+    """
+    modules = {}
+    failed = []
+
+    def add(distribution, names):
+        for name in names:
+            modules.setdefault(name, set()).add(canonicalize_name(distribution))
+
+    if installed:
+        for name, distributions in importlib.metadata.packages_distributions().items():
+            for distribution in distributions:
+                add(distribution, [name])
+    for path in wheel_paths:
+        distribution, *_ = utils.parse_wheel_filename(os.path.basename(path))
+        with zipfile.ZipFile(path) as wheel:
+            add(distribution, wheel_top_level(wheel))
+    for distribution, names, err in utils.run_concurrently(
+        pypi_wheel_top_level, list(package_names), workers=workers
+    ):
+        if err:
+            failed.append(distribution)
+        else:
+            add(distribution, names)
+    return modules, failed
+
+
+def write_import_index(modules: dict[str, set[str]], path: str = IMPORT_INDEX_PATH):
+    """
+    Write the index as gzipped JSON. Distribution names are stored once and referenced
+    by position, which keeps tens of thousands of distributions in a few hundred kB.
+    """
+    distributions = sorted({d for names in modules.values() for d in names})
+    positions = {d: i for i, d in enumerate(distributions)}
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(
+            {
+                "format": IMPORT_INDEX_FORMAT,
+                "version": IMPORT_INDEX_VERSION,
+                "distributions": distributions,
+                "modules": {
+                    name: sorted(positions[d] for d in names)
+                    for name, names in sorted(modules.items())
+                },
+            },
+            f,
+            separators=(",", ":"),
+        )
+    return len(distributions)
+
+
+@functools.lru_cache
+def load_import_index(path: str = IMPORT_INDEX_PATH) -> dict[str, tuple[str]]:
+    """
+    Load the index once per process as {import name: (distributions)}, merged with the
+    distributions installed next to the app. A missing file only leaves the latter.
+    """
+    modules = {
+        name: tuple(canonicalize_name(d) for d in distributions)
+        for name, distributions in importlib.metadata.packages_distributions().items()
+    }
+    if os.path.exists(path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("format") != IMPORT_INDEX_FORMAT:
+            raise ValueError(f"{path} is not an import index")
+        distributions = index["distributions"]
+        for name, positions in index["modules"].items():
+            modules[name] = tuple(
+                dict.fromkeys(
+                    [distributions[i] for i in positions] + list(modules.get(name, ()))
+                )
+            )
+    return modules
+
+
+def distributions_for_module(module: str) -> list[str]:
+    """
+    Distributions that provide a module (e.g. "werkzeug.urls" -> ["werkzeug"],
+    "yaml" -> ["pyyaml"]). Unknown modules fall back to their top-level name, which
+    is the distribution name more often than not.
+    """
+    top_level = module.split(".")[0]
+    return list(load_import_index().get(top_level, ())) or [
+        canonicalize_name(top_level)
+    ]
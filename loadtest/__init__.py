@@ -0,0 +1,3 @@
+"""
+Load test of the app against a local PyPI/GitHub stand-in, see __main__.py.
+"""
@@ -0,0 +1,135 @@
+"""
+Load test of the whole app against a local stand-in for PyPI and GitHub.
+
+Usage:
+    # 1. the stand-in, 150 ms +- 50 ms per response, 1% of 5xx errors
+    python -m loadtest upstream --port 8081 --latency 0.15 --jitter 0.05 --error-rate 0.01
+
+    # 2. the app, as deployed (Procfile), pointed at the stand-in with an empty cache
+    PYPI_URL=http://127.0.0.1:8081 GITHUB_API_URL=http://127.0.0.1:8081/github \\
+    GITHUB_RAW_URL=http://127.0.0.1:8081/raw GITHUB_PAT=loadtest \\
+    CACHE_DIRECTORY=/tmp/loadtest-cache gunicorn app:server --workers 4 -b 127.0.0.1:8050
+
+    # 3. the virtual users
+    python -m loadtest run http://127.0.0.1:8050 --upstream http://127.0.0.1:8081 \\
+        --users 16 --duration 120 --size 20
+"""
+
+import argparse
+import json
+import sys
+import requests
+
+
+def upstream(args):
+    from loadtest.upstream import create_app
+
+    app = create_app(
+        fixtures_path=args.fixtures,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        github_rate_limit=args.github_rate_limit,
+        github_rate_window=args.github_rate_window,
+        packages=args.packages,
+        seed=args.seed,
+    )
+    print(f"fixtures: {app.config['FIXTURE_SOURCES']}", flush=True)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+def run(args):
+    from loadtest.scenario import run_load_test
+
+    packages = requests.get(f"{args.upstream.rstrip('/')}/packages", timeout=60).json()
+    rows, sessions, elapsed = run_load_test(
+        args.url,
+        packages,
+        users=args.users,
+        duration=args.duration,
+        size=args.size,
+        think_time=args.think_time,
+        seed=args.seed,
+    )
+    if args.format == "json":
+        json.dump(
+            {"sessions": sessions, "elapsed": elapsed, "steps": rows},
+            sys.stdout,
+            indent=2,
+        )
+        print()
+        return
+
+    print(
+        f"{sessions} sessions in {elapsed:.0f} s ({sessions / elapsed:.2f} sessions/s), {args.users} users"
+    )
+    print(
+        f"{'step':<18}{'requests':>9}{'errors':>8}{'req/s':>8}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    )
+    for row in rows:
+        print(
+            f"{row['step']:<18}{row['requests']:>9}{row['errors']:>8}{row['rps']:>8}"
+            + "".join(
+                f"{row[key] * 1000:>9.0f}" for key in ["p50", "p95", "p99", "max"]
+            )
+        )
+
+
+def main(argv=None):
+    # fixtures has no dependency on utils, the default path can be read safely
+    from benchmarks.fixtures import FIXTURES_PATH
+
+    parser = argparse.ArgumentParser(prog="python -m loadtest")
+    subparsers = parser.add_subparsers(required=True)
+
+    parser_upstream = subparsers.add_parser(
+        "upstream", help="serve the PyPI and GitHub stand-in"
+    )
+    parser_upstream.add_argument("--host", default="127.0.0.1")
+    parser_upstream.add_argument("--port", type=int, default=8081)
+    parser_upstream.add_argument("--fixtures", default=FIXTURES_PATH)
+    parser_upstream.add_argument(
+        "--latency", type=float, default=0.0, help="mean delay (s)"
+    )
+    parser_upstream.add_argument(
+        "--jitter", type=float, default=0.0, help="standard deviation of the delay (s)"
+    )
+    parser_upstream.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of 5xx responses"
+    )
+    parser_upstream.add_argument("--github-rate-limit", type=int, default=5000)
+    parser_upstream.add_argument(
+        "--github-rate-window", type=int, default=3600, help="seconds"
+    )
+    parser_upstream.add_argument(
+        "--packages", type=int, default=1000, help="recorded packages and copies"
+    )
+    parser_upstream.add_argument("--seed", type=int)
+    parser_upstream.set_defaults(func=upstream)
+
+    parser_run = subparsers.add_parser("run", help="run the virtual users")
+    parser_run.add_argument("url", help="url of the app")
+    parser_run.add_argument(
+        "--upstream",
+        default="http://127.0.0.1:8081",
+        help="url of the stand-in, to pick the packages from",
+    )
+    parser_run.add_argument("--users", type=int, default=8)
+    parser_run.add_argument("--duration", type=float, default=60, help="seconds")
+    parser_run.add_argument(
+        "--size", type=int, default=20, help="packages per requirements.txt"
+    )
+    parser_run.add_argument(
+        "--think-time", type=float, default=1.0, help="mean pause between steps (s)"
+    )
+    parser_run.add_argument("--seed", type=int, default=0)
+    parser_run.add_argument("--format", choices=["table", "json"], default="table")
+    parser_run.set_defaults(func=run)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
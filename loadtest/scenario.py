@@ -0,0 +1,288 @@
+"""
+Virtual users driving the app like a browser would, over HTTP: each session uploads a
+requirements.txt, opens the packages history grid, selects a few packages, opens their
+changelogs and loads more versions of one of them. Callbacks are found in
+/_dash-dependencies by their inputs, so the requests match the running app.
+"""
+
+import dataclasses
+import json
+import random
+import statistics
+import threading
+import time
+import requests
+
+# step name: (input or output identifying the callback)
+CALLBACKS = {
+    "content": "content.children",
+    "select": "show_details_button.n_clicks",
+    "changelogs": "changelogs-container.children",
+    "load_more": '{"index":["MATCH"],"type":"changelog-container"}.children',
+}
+
+
+def prop_id(component_id, prop: str) -> str:
+    """
+    Dash's id of a property, e.g. `{"index":"dash","type":"store"}.data`.
+    """
+    if isinstance(component_id, dict):
+        component_id = json.dumps(component_id, sort_keys=True, separators=(",", ":"))
+    return f"{component_id}.{prop}"
+
+
+def find_component(tree, component_id):
+    """
+    First component with `component_id` in a callback response (components, patches).
+    """
+    if isinstance(tree, dict):
+        if tree.get("props", {}).get("id") == component_id:
+            return tree
+        values = tree.values()
+    elif isinstance(tree, list):
+        values = tree
+    else:
+        return None
+    for value in values:
+        found = find_component(value, component_id)
+        if found:
+            return found
+    return None
+
+
+@dataclasses.dataclass
+class Sample:
+    step: str
+    duration: float
+    ok: bool
+
+
+class DashClient:
+    """
+    One browser session: cookies and the callbacks of the app.
+    """
+
+    def __init__(self, url: str, dependencies: list[dict], samples: list, lock):
+        self.url = url.rstrip("/")
+        self.session = requests.Session()
+        self.samples = samples
+        self.lock = lock
+        self.outputs = {}
+        for step, key in CALLBACKS.items():
+            for dependency in dependencies:
+                inputs = [prop_id(i["id"], i["property"]) for i in dependency["inputs"]]
+                if dependency["output"] == key or key in inputs:
+                    self.outputs[step] = dependency["output"]
+
+    def timed(self, step: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, f"{self.url}{path}", timeout=300, **kwargs
+            )
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        with self.lock:
+            self.samples.append(Sample(step, time.perf_counter() - start, ok))
+        return response if ok else None
+
+    def callback(self, step, outputs, inputs, state=(), changed=(), callback=None):
+        """
+        Call a callback (the one of `step` in CALLBACKS unless `callback` is given);
+        `inputs` and `state` are (id, property, value) tuples, or lists of them for the
+        ALL wildcards. Returns the "response" part of the answer.
+        """
+
+        def spec(item):
+            if isinstance(item, list):
+                return [spec(i) for i in item]
+            component_id, prop, value = item
+            return {"id": component_id, "property": prop, "value": value}
+
+        body = {
+            "output": self.outputs[callback or step],
+            "outputs": ({"id": outputs[0], "property": outputs[1]} if outputs else []),
+            "inputs": [spec(i) for i in inputs],
+            "state": [spec(s) for s in state],
+            "changedPropIds": list(changed),
+        }
+        response = self.timed(step, "POST", "/_dash-update-component", json=body)
+        if response is None or response.status_code == 204:
+            return {}
+        return response.json().get("response", {})
+
+    def content(self, step, pathname, store_req, search=""):
+        return self.callback(
+            step,
+            ("content", "children"),
+            [
+                ("location", "pathname", pathname),
+                ({"type": "store", "index": "req"}, "data", store_req),
+                ({"type": "store", "index": "pip_freeze"}, "data", []),
+            ],
+            [
+                ("store_stripped_requirements", "data", []),
+                ("store_extra", "data", {}),
+                ("location", "search", search),
+            ],
+            changed=["location.pathname"],
+            callback="content",
+        )
+
+
+def user_session(
+    client: DashClient, rng: random.Random, packages: dict, size: int, think_time: float
+):
+    """
+    One visit: upload → history grid → select → changelogs → load more versions.
+    """
+
+    def think():
+        if think_time:
+            time.sleep(rng.uniform(0, 2 * think_time))
+
+    names = rng.sample(sorted(packages), k=min(size, len(packages)))
+    text = "\n".join(
+        f"{name}=={rng.choice(packages[name])}" if packages[name] else name
+        for name in names
+    )
+    response = client.timed(
+        "upload",
+        "POST",
+        "/api/upload?file_type=req",
+        data=text.encode(),
+        headers={"Content-Type": "text/plain; charset=utf-8"},
+    )
+    if response is None:
+        return
+    store_req = response.json()["libraries"]
+    think()
+
+    history = client.content("history", "/packages-history", store_req)
+    grid = find_component(history, "libraries_grid")
+    rows = grid["props"]["rowData"] if grid else []
+    if not rows:
+        return
+    selected = rng.sample(rows, k=min(len(rows), rng.randint(1, 3)))
+    think()
+
+    client.callback(
+        "select",
+        None,
+        [("show_details_button", "n_clicks", 1)],
+        [("libraries_grid", "selectedRows", selected)],
+        changed=["show_details_button.n_clicks"],
+    )
+    libs = [row["name"] for row in selected]
+    client.content(
+        "changelogs_page", "/changelogs", store_req, f"?libs={'&'.join(libs)}"
+    )
+    changelogs = client.callback(
+        "changelogs",
+        ("changelogs-container", "children"),
+        [("lib-names", "value", libs)],
+        [[]],
+        changed=["lib-names.value"],
+    )
+    think()
+
+    for lib in libs:
+        store = find_component(changelogs, {"type": "changelog-store", "index": lib})
+        if not store or not store["props"]["data"].get("versions_reversed"):
+            continue
+        data = store["props"]["data"]
+        load_more = {"type": "changelog-version-load-more", "index": lib}
+        client.callback(
+            "load_more",
+            ({"type": "changelog-container", "index": lib}, "children"),
+            [
+                ({"type": "changelog-version-update", "index": lib}, "n_clicks", None),
+                (load_more, "n_clicks", 1),
+            ],
+            [
+                ({"type": "changelog-version-min", "index": lib}, "value", None),
+                ({"type": "changelog-version-max", "index": lib}, "value", None),
+                ({"type": "changelog-store", "index": lib}, "data", data),
+                ({"type": "changelog-state", "index": lib}, "data", {"last": None}),
+            ],
+            changed=[prop_id(load_more, "n_clicks")],
+        )
+        break
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: list[Sample], elapsed: float) -> list[dict]:
+    """
+    Throughput, errors and latency percentiles of each step, then of all of them.
+    """
+    steps = {}
+    for sample in samples:
+        steps.setdefault(sample.step, []).append(sample)
+    steps["all"] = samples
+    rows = []
+    for step, step_samples in steps.items():
+        durations = sorted(s.duration for s in step_samples)
+        rows.append(
+            {
+                "step": step,
+                "requests": len(step_samples),
+                "errors": sum(not s.ok for s in step_samples),
+                "rps": round(len(step_samples) / elapsed, 2),
+                "p50": percentile(durations, 0.5),
+                "p95": percentile(durations, 0.95),
+                "p99": percentile(durations, 0.99),
+                "max": durations[-1],
+                "mean": statistics.fmean(durations),
+            }
+        )
+    return rows
+
+
+def run_load_test(
+    url: str,
+    packages: dict,
+    users: int = 8,
+    duration: float = 60,
+    size: int = 20,
+    think_time: float = 1.0,
+    seed: int = 0,
+) -> tuple[list[dict], int, float]:
+    """
+    Run `users` concurrent sessions in a loop for `duration` seconds.
+
+    Returns
+    -------
+    tuple
+        The summary rows (see `summarize`), the number of finished sessions and the
+        elapsed time.
+    """
+    dependencies = requests.get(
+        f"{url.rstrip('/')}/_dash-dependencies", timeout=60
+    ).json()
+    samples, lock = [], threading.Lock()
+    sessions = []
+    start = time.perf_counter()
+    deadline = start + duration
+
+    def user(index):
+        rng = random.Random(seed * 10_000 + index)
+        client = DashClient(url, dependencies, samples, lock)
+        while time.perf_counter() < deadline:
+            user_session(client, rng, packages, size, think_time)
+            with lock:
+                sessions.append(index)
+
+    threads = [
+        threading.Thread(target=user, args=(i,), daemon=True) for i in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return summarize(samples, elapsed), len(sessions), elapsed
@@ -0,0 +1,216 @@
+"""
+Stand-in for PyPI and the GitHub API, to load-test the app without leaving the machine.
+
+It serves the responses of the benchmarks fixtures (benchmarks/fixtures/http.json.gz,
+plus copies of the recorded packages named "<package>-clone<i>"), see
+benchmarks/fixtures.py for which of them are recorded:
+- the simple index as PEP 691 JSON (406 without the JSON Accept header), derived from
+  the JSON API payloads when only html was recorded (X-Fixture-Derived-From header),
+- the JSON API as recorded,
+- generated (synthetic) GitHub releases for the repos that weren't recorded,
+with:
+- a configurable latency (mean and standard deviation),
+- a share of requests answered with a 5xx error,
+- GitHub's rate limiting: X-RateLimit-* headers on every GitHub response and a 403 once
+  a token used up its requests of the window.
+
+Point the app at it with:
+    PYPI_URL=http://127.0.0.1:8081
+    GITHUB_API_URL=http://127.0.0.1:8081/github
+    GITHUB_RAW_URL=http://127.0.0.1:8081/raw
+    GITHUB_PAT=<any token>
+"""
+
+import json
+import random
+import threading
+import time
+import flask
+from benchmarks import fixtures
+
+ERROR_STATUSES = [500, 502, 503]
+
+
+class FixedWindowRateLimit:
+    """
+    GitHub-like rate limit: `limit` requests per token every `window` seconds.
+    """
+
+    def __init__(self, limit: int, window: int):
+        self.limit = limit
+        self.window = window
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def hit(self, token: str) -> tuple[bool, dict]:
+        """
+        Count one request of `token`. Returns whether it is allowed and the headers
+        reporting the rate limit.
+        """
+        now = time.time()
+        with self.lock:
+            reset, used = self.windows.get(token, (0, 0))
+            if now >= reset:
+                reset, used = int(now) + self.window, 0
+            allowed = used < self.limit
+            used += allowed
+            self.windows[token] = (reset, used)
+        return allowed, {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.limit - used),
+            "X-RateLimit-Reset": str(reset),
+            "X-RateLimit-Used": str(used),
+            "X-RateLimit-Resource": "core",
+        }
+
+
+def create_app(
+    fixtures_path: str = fixtures.FIXTURES_PATH,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    github_rate_limit: int = 5000,
+    github_rate_window: int = 3600,
+    packages: int = 1000,
+    seed: int = None,
+) -> flask.Flask:
+    """
+    Parameters
+    ----------
+    fixtures_path : str
+        Recorded responses (see `python -m benchmarks record`).
+    latency, jitter : float
+        Mean and standard deviation (seconds) of the delay added to every response.
+    error_rate : float
+        Share of the requests answered with a 500, 502 or 503.
+    github_rate_limit, github_rate_window : int
+        Requests allowed per token (Authorization header) every window (seconds).
+    packages : int
+        Packages served: the recorded ones and copies of them.
+    seed : int
+        Seed of the latency and errors, for repeatable runs.
+    """
+    recorded = fixtures.load_fixtures(fixtures_path)
+    pypi_url = recorded["pypi_url"]
+    responses = recorded["responses"]
+    # fixtures recorded before the html pages were derived at recording time
+    fixtures.derive_simple_records(responses, pypi_url)
+    fixture_sources = fixtures.describe_sources(responses)
+    package_names = fixtures.clone_packages(responses, pypi_url, packages)
+    rate_limit = FixedWindowRateLimit(github_rate_limit, github_rate_window)
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    app = flask.Flask(__name__)
+    app.config["FIXTURE_SOURCES"] = fixture_sources
+
+    def record_response(record: dict, headers: dict = None):
+        if "error" in record:
+            # the request failed while recording, close the connection the same way
+            flask.abort(502)
+        if "derived_from" in record:
+            headers = {
+                **(headers or {}),
+                "X-Fixture-Derived-From": record["derived_from"],
+            }
+        return flask.Response(
+            record["body"],
+            status=record["status"],
+            headers={**record["headers"], **(headers or {})},
+        )
+
+    @app.before_request
+    def degrade():
+        if flask.request.path == "/packages":
+            return None
+        with rng_lock:
+            delay = max(0.0, rng.gauss(latency, jitter)) if latency or jitter else 0
+            failed = rng.random() < error_rate
+            status = rng.choice(ERROR_STATUSES)
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return flask.Response("injected error", status=status)
+
+    # for the load test scenario, which builds its requirements from them
+    # (not degraded, it isn't part of PyPI)
+    package_versions = {}
+    for name in package_names:
+        record = responses.get(
+            fixtures.request_key("GET", f"{pypi_url}/pypi/{name}/json")
+        )
+        releases = json.loads(record["body"])["releases"] if record else {}
+        package_versions[name] = [v for v, files in releases.items() if files]
+
+    @app.get("/packages")
+    def list_packages():
+        return flask.jsonify(package_versions)
+
+    @app.get("/simple/<name>/")
+    @app.get("/pypi/<name>/json")
+    def pypi(name):
+        record = responses.get(
+            fixtures.request_key("GET", f"{pypi_url}{flask.request.path}")
+        )
+        if record is None:
+            return flask.Response("Not Found", status=404)
+        if (
+            flask.request.path.startswith("/simple/")
+            and fixtures.SIMPLE_JSON_CONTENT_TYPE
+            not in flask.request.accept_mimetypes.values()
+        ):
+            # only the JSON pages are served, PEP 691 allows a 406 for the others
+            return flask.Response("Not Acceptable", status=406)
+        return record_response(record)
+
+    @app.get("/github/<path:path>")
+    def github(path):
+        token = flask.request.headers.get("Authorization", "anonymous")
+        allowed, headers = rate_limit.hit(token)
+        if not allowed:
+            body = {
+                "message": "API rate limit exceeded for user.",
+                "documentation_url": "https://docs.github.com/rest/overview/rate-limits-for-the-rest-api",
+            }
+            return flask.Response(
+                json.dumps(body),
+                status=403,
+                headers=headers,
+                content_type="application/json",
+            )
+
+        api_url = f"{flask.request.host_url}github"
+        query = (
+            f"?{flask.request.query_string.decode()}"
+            if flask.request.query_string
+            else ""
+        )
+        # PyGithub requests include the default port
+        for base in [f"{fixtures.GITHUB_API_URL}:443", fixtures.GITHUB_API_URL]:
+            record = responses.get(fixtures.request_key("GET", f"{base}/{path}{query}"))
+            if record is not None:
+                record = dict(
+                    record,
+                    headers={
+                        k: v.replace(fixtures.GITHUB_API_URL, api_url)
+                        for k, v in record.get("headers", {}).items()
+                    },
+                )
+                break
+        else:
+            record = fixtures.synthetic_github_response(flask.request.url, api_url)
+        if record is None:
+            return flask.Response(
+                json.dumps({"message": "Not Found"}),
+                status=404,
+                headers=headers,
+                content_type="application/json",
+            )
+        return record_response(record, headers)
+
+    @app.get("/raw/<path:path>")
+    def raw(path):
+        # changelog files aren't recorded, the app falls back to the GitHub releases
+        return flask.Response("404: Not Found", status=404)
+
+    return app
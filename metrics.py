@@ -0,0 +1,211 @@
+"""
+Low-overhead counters and histograms, exported in the Prometheus text format.
+
+Every process records into a dict in memory (one lock, no I/O on the hot path). The
+pending values are added to a shared diskcache every `METRICS_FLUSH_INTERVAL` seconds
+and before each scrape, so that /metrics reports the totals of all the gunicorn workers
+whichever of them answers.
+"""
+
+import atexit
+import bisect
+import contextlib
+import json
+import os
+import re
+import threading
+import time
+import traceback
+
+# seconds between two flushes of a process' metrics to the shared cache
+METRICS_FLUSH_INTERVAL = int(os.environ.get("METRICS_FLUSH_INTERVAL", 10))
+
+# upper bounds (seconds) of the latency histograms buckets, +Inf is implicit
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# name: (type, help)
+METRICS = {
+    "dash_callback_seconds": (
+        "histogram",
+        "Duration of the Dash callback requests, by callback output",
+    ),
+    "dash_callback_errors_total": (
+        "counter",
+        "Dash callbacks that raised an exception, by callback output",
+    ),
+    "http_server_request_seconds": (
+        "histogram",
+        "Duration of the requests served by the Flask server, by endpoint and status",
+    ),
+    "memoize_calls_total": (
+        "counter",
+        "Calls of memoized functions, by function and cache result (hit or miss)",
+    ),
+    "memoize_key_seconds_total": (
+        "counter",
+        "Time spent building the cache keys of memoized functions",
+    ),
+    "memoize_lookup_seconds_total": (
+        "counter",
+        "Time spent reading the cache of memoized functions",
+    ),
+    "memoize_compute_seconds": (
+        "histogram",
+        "Duration of memoized functions on cache misses (computation and cache write)",
+    ),
+    "http_client_request_seconds": (
+        "histogram",
+        "Duration of the outbound HTTP requests (PyPI, GitHub, changelogs), by host and status",
+    ),
+    "http_client_response_bytes_total": (
+        "counter",
+        "Size of the outbound HTTP responses bodies, by host",
+    ),
+}
+
+_lock = threading.Lock()
+# {(series name, labels as a sorted tuple of pairs): value} not flushed yet
+_pending = {}
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def inc(name: str, value: float = 1, **labels):
+    """
+    Add `value` to a counter.
+    """
+    key = (name, _labels(labels))
+    with _lock:
+        _pending[key] = _pending.get(key, 0) + value
+
+
+def observe(name: str, value: float, **labels):
+    """
+    Record one observation (usually a duration in seconds) in a histogram. Buckets are
+    stored non cumulative and summed up when rendered.
+    """
+    labels = _labels(labels)
+    i = bisect.bisect_left(LATENCY_BUCKETS, value)
+    le = str(LATENCY_BUCKETS[i]) if i < len(LATENCY_BUCKETS) else "+Inf"
+    with _lock:
+        for key, delta in [
+            ((f"{name}_bucket", labels + (("le", le),)), 1),
+            ((f"{name}_sum", labels), value),
+            ((f"{name}_count", labels), 1),
+        ]:
+            _pending[key] = _pending.get(key, 0) + delta
+
+
+@contextlib.contextmanager
+def timed(name: str, **labels):
+    """
+    Observe the duration of a block in a histogram, with a `status` label: "ok" or the
+    name of the exception raised.
+    """
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except Exception as err:
+        status = type(err).__name__
+        raise
+    finally:
+        observe(name, time.perf_counter() - start, status=status, **labels)
+
+
+def callback_label(output: str) -> str:
+    """
+    Name of a Dash callback from its output(s), with the index of pattern-matching ids
+    replaced by "*" so that every library doesn't get its own series.
+    """
+    return re.sub(r'("index":)("[^"]*"|[\d.]+)', r'\1"*"', output or "")
+
+
+def flush(cache):
+    """
+    Add the pending values of this process to `cache` in one transaction.
+    """
+    with _lock:
+        pending = _pending.copy()
+        _pending.clear()
+    if not pending:
+        return
+    with cache.transact():
+        for key, value in pending.items():
+            try:
+                cache.incr(key, value, default=0)
+            except TypeError:
+                # totals written before numbers were stored unpickled
+                cache.set(key, cache.get(key, 0) + value)
+
+
+def start_flush(cache, interval=METRICS_FLUSH_INTERVAL):
+    """
+    Flush the metrics of this process to `cache` every `interval` seconds in a daemon
+    thread, and once more when the process exits.
+    """
+    if not interval:
+        return None
+    atexit.register(flush, cache)
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                flush(cache)
+            except Exception:
+                traceback.print_exc()
+
+    thread = threading.Thread(target=loop, name="metrics-flush", daemon=True)
+    thread.start()
+    return thread
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    # json string escaping is the one of the exposition format (\\, \", \n)
+    pairs = [f"{key}={json.dumps(value, ensure_ascii=False)}" for key, value in labels]
+    return "{" + ",".join(pairs) + "}"
+
+
+def render(cache) -> str:
+    """
+    Flush this process and return the totals of all the processes in the Prometheus
+    text exposition format.
+    """
+    flush(cache)
+    series = {}
+    for key in cache.iterkeys():
+        value = cache.get(key)
+        if value is not None:
+            series[key] = value
+
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+        if metric_type == "counter":
+            for (series_name, labels), value in sorted(series.items()):
+                if series_name == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+            continue
+
+        # histograms: cumulative buckets per label set, then sum and count
+        buckets = {}
+        for (series_name, labels), value in series.items():
+            if series_name == f"{name}_bucket":
+                *labels, (_, le) = labels
+                buckets.setdefault(tuple(labels), {})[le] = value
+        for labels in sorted(buckets):
+            cumulative = 0
+            for le in [str(b) for b in LATENCY_BUCKETS] + ["+Inf"]:
+                cumulative += buckets[labels].get(le, 0)
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}"
+                )
+            for suffix in ["sum", "count"]:
+                value = series.get((f"{name}_{suffix}", labels), 0)
+                lines.append(f"{name}_{suffix}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
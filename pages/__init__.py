@@ -2,3 +2,9 @@ from . import import_files
 from . import strip_req
 from . import packages_changelogs
 from . import packages_history
+from . import cache_admin
+from . import freeze_diff
+from . import portfolio
+from . import search_notes
+from . import error_help
+from . import profiles
@@ -0,0 +1,107 @@
+import dash
+from dash import dcc, html
+from dash import callback, Input, Output, State, ctx
+import dash_ag_grid as dag
+import dash_mantine_components as dmc
+from dash_iconify import DashIconify
+import flask
+import profiling
+import utils
+
+
+def format_size(size: int) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def namespaces_records():
+    return [
+        dict(
+            info,
+            size_human=format_size(info["size"]),
+            size_limit_human=format_size(info["size_limit"]),
+            usage=round(100 * info["size"] / info["size_limit"], 1),
+        )
+        for info in utils.cache_namespaces_info()
+    ]
+
+
+def layout():
+
+    columnDefs = [
+        {"field": "namespace"},
+        {"field": "entries", "filter": "agNumberColumnFilter"},
+        {"field": "size_human", "headerName": "Size"},
+        {"field": "size_limit_human", "headerName": "Size limit"},
+        {"field": "usage", "headerName": "Usage (%)", "filter": "agNumberColumnFilter"},
+        {"field": "eviction_policy", "headerName": "Eviction policy"},
+        {"field": "compression"},
+    ]
+
+    return dmc.Container(
+        [
+            dmc.Group(
+                [
+                    dmc.Button(
+                        "Refresh",
+                        id="cache_admin_refresh",
+                        leftSection=DashIconify(icon="tabler:reload"),
+                        variant="outline",
+                    ),
+                    # locks the cache files while it runs: same secret as the profiles
+                    dmc.Button(
+                        "Cull and vacuum now",
+                        id="cache_admin_cull",
+                        leftSection=DashIconify(icon="lucide:trash-2"),
+                        variant="outline",
+                        color="red",
+                        disabled=not profiling.authorized(flask.request),
+                    ),
+                ],
+                mt="10px",
+                mb="10px",
+            ),
+            dmc.Text(
+                (
+                    ""
+                    if profiling.authorized(flask.request)
+                    else "Open this page with ?profile=<secret> to cull and vacuum the cache (see the profiles page)."
+                ),
+                id="cache_admin_status",
+                size="sm",
+                mb="10px",
+            ),
+            dag.AgGrid(
+                id="cache_admin_grid",
+                rowData=namespaces_records(),
+                columnDefs=columnDefs,
+                defaultColDef={"sortable": True, "filter": True},
+                columnSize="sizeToFit",
+            ),
+        ],
+        fluid=True,
+    )
+
+
+@callback(
+    Output("cache_admin_grid", "rowData"),
+    Output("cache_admin_status", "children"),
+    Input("cache_admin_refresh", "n_clicks"),
+    Input("cache_admin_cull", "n_clicks"),
+    prevent_initial_call=True,
+)
+def update_cache_admin_grid(n_clicks_refresh, n_clicks_cull):
+    if ctx.triggered_id == "cache_admin_cull":
+        if not profiling.authorized(flask.request):
+            raise dash.exceptions.PreventUpdate
+        if utils.start_cache_maintenance_now():
+            status = (
+                "Culling and vacuuming in the background, refresh to see the sizes."
+            )
+        else:
+            status = "Culling and vacuuming is already running."
+        return namespaces_records(), status
+    return namespaces_records(), dash.no_update
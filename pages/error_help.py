@@ -1,19 +1,148 @@
 import dash
-from dash import Dash, dcc, html, register_page
-from dash import callback, Input, Output, State, ctx
+from dash import dcc, html
+from dash import callback, Input, Output, State
 import dash_mantine_components as dmc
+from packaging.utils import canonicalize_name
+import import_index
+import utils
 
-layout = html.Div(
-    [
-        dmc.Textarea(
-            label="Paste traceback/logs here",
-            placeholder="""
+
+def uploaded_versions(store_req, store_pip) -> dict[str, str]:
+    """
+    {canonical name: version} of the uploaded files, the pip freeze winning over the
+    requirements.txt.
+    """
+    versions = {
+        canonicalize_name(lib["name"]): lib.get("req_version")
+        for lib in store_req or []
+    }
+    versions.update(
+        {
+            canonicalize_name(lib["name"]): lib.get("installed_version")
+            for lib in store_pip or []
+        }
+    )
+    return {name: version for name, version in versions.items() if version}
+
+
+def release_notes_list(distribution, symbol, version):
+    notes = utils.symbol_release_notes(distribution, symbol)
+    if not notes:
+        return dmc.Text(
+            f"No release notes of {distribution} mention {symbol}.", size="sm"
+        )
+    items = []
+    for note in notes:
+        included = ""
+        if version and utils.is_valid_version(version):
+            included = (
+                " (included in your version)"
+                if utils.is_valid_version(note["version"])
+                and utils.parse(note["version"]) <= utils.parse(version)
+                else " (newer than your version)"
+            )
+        items.append(
+            dmc.ListItem(
+                dcc.Markdown(
+                    f"[{note['version']}]({note['release_url']}) ({note['release_date']}){included}: {note['snippet']}"
+                )
+            )
+        )
+    return dmc.List(items, size="sm")
+
+
+def error_card(error: dict, versions: dict[str, str]):
+    distributions = import_index.distributions_for_module(error["module"])
+    # the uploaded files tell which of the candidates is used
+    installed = [d for d in distributions if d in versions] or distributions
+    content = [dmc.Code(error["line"], block=True)]
+    for distribution in installed:
+        version = versions.get(distribution)
+        if error["error"] == "no module named" and not version:
+            content.append(
+                dcc.Markdown(
+                    f"`{error['module']}` is provided by **{distribution}**, which isn't in your uploaded files: `pip install {distribution}`"
+                )
+            )
+            continue
+        # missing sub modules were usually renamed or removed
+        symbol = error["symbol"] or error["module"].split(".")[-1]
+        content += [
+            dcc.Markdown(
+                f"`{error['module']}` is provided by **{distribution}** "
+                + (f"{version}" if version else "(not in your uploaded files)")
+                + f", release notes mentioning `{symbol}`:"
+            ),
+            release_notes_list(distribution, symbol, version),
+        ]
+    return dmc.Paper(content, withBorder=True, p="xs")
+
+
+def layout(store_req, store_pip):
+    return dmc.Container(
+        [
+            dmc.Textarea(
+                id="error_help_traceback",
+                label="Paste traceback/logs here",
+                placeholder="""
         Format is typically similar to: `ImportError: cannot import name 'url_quote' from 'werkzeug.urls' (/app/.heroku/python/lib/python3.9/site-packages/werkzeug/urls.py)`.\n Include as many lines as possible!
         """,
-            autosize=True,
-            minRows=10,
-        ),
-    ]
+                autosize=True,
+                minRows=10,
+                debounce=True,
+            ),
+            dmc.Text(
+                "Upload your pip freeze above to compare the errors with the installed versions",
+                size="sm",
+                c="dimmed",
+                display="none" if store_pip else "block",
+            ),
+            dcc.Loading(html.Div(id="error_help_results")),
+        ],
+        fluid=True,
+    )
+
+
+@callback(
+    Output("error_help_results", "children"),
+    Input("error_help_traceback", "value"),
+    State({"type": "store", "index": "req"}, "data"),
+    State({"type": "store", "index": "pip_freeze"}, "data"),
+    prevent_initial_call=True,
 )
+def analyze_traceback(text, store_req, store_pip):
+    if not text:
+        return []
+    versions = uploaded_versions(store_req, store_pip)
+    errors = utils.parse_import_errors(text)
+    frames = [
+        (module, import_index.distributions_for_module(module)[0])
+        for module in utils.traceback_modules(text)
+    ]
 
-register_page("Error help", path="/error-help", layout=layout)
+    content = []
+    if not errors:
+        content.append(dmc.Text("No import error was found in the traceback."))
+    # the release notes of every library are fetched (and indexed) in parallel
+    cards = {
+        error["line"]: (
+            card
+            if not err
+            else dmc.Text(f"{error['line']} couldn't be analyzed: {err!r}", c="red")
+        )
+        for error, card, err in utils.run_concurrently(
+            lambda error: error_card(error, versions), errors
+        )
+    }
+    content += [cards[error["line"]] for error in errors]
+    if frames:
+        content.append(
+            dcc.Markdown(
+                "Packages in the traceback: "
+                + ", ".join(
+                    f"{distribution} {versions.get(distribution, '')}".strip()
+                    for module, distribution in frames
+                )
+            )
+        )
+    return dmc.Stack(content, gap="xs", mt="10px")
@@ -0,0 +1,155 @@
+import dash
+from dash import dcc, html
+from dash import callback, Input, Output, State
+import dash_ag_grid as dag
+import dash_mantine_components as dmc
+from collections import Counter
+import utils
+from pages.packages_changelogs import version_markdown_format
+
+
+def enrich_change(change: dict) -> dict:
+    """
+    Add release dates, the newest version and, for upgrades/downgrades, the versions whose
+    release notes lie between the old and the new version (newest first).
+    """
+    name = change["name"]
+    _, timeline = utils.find_package_timeline(name)
+    versions = timeline["versions"]
+    record = dict(
+        change,
+        old_release_date=utils.format_date(versions.get(change["old_version"])),
+        new_release_date=utils.format_date(versions.get(change["new_version"])),
+        newest_version=list(versions)[-1] if versions else None,
+        notes_versions=[],
+    )
+    if change["change"] in ["upgraded", "downgraded"]:
+        low, high = sorted(
+            [change["old_version"], change["new_version"]], key=utils.Version
+        )
+        changelogs = utils.get_library_changelogs(name)
+        record["notes_versions"] = utils.versions_in_range(
+            changelogs.get("versions_reversed") or [], low, high, include_min=False
+        )
+    record["release_notes"] = len(record["notes_versions"])
+    return record
+
+
+def diff_grid(records):
+    columnDefs = [
+        {"field": "name", "checkboxSelection": True},
+        {"field": "change"},
+        {"field": "old_version", "headerName": "Before"},
+        {"field": "old_release_date", "headerName": "Released"},
+        {"field": "new_version", "headerName": "After"},
+        {"field": "new_release_date", "headerName": "Released"},
+        {"field": "newest_version", "headerName": "Newest"},
+        {
+            "field": "release_notes",
+            "headerName": "Release notes in range",
+            "filter": "agNumberColumnFilter",
+        },
+    ]
+    return dag.AgGrid(
+        id="freeze_diff_grid",
+        rowData=records,
+        columnDefs=columnDefs,
+        defaultColDef={"sortable": True, "filter": True, "floatingFilter": True},
+        columnSize="sizeToFit",
+        dashGridOptions={"rowSelection": "single"},
+    )
+
+
+def diff_content(store_before, store_after):
+    if not (store_before and store_after):
+        return dmc.Text(
+            "Upload the current pip freeze in the top section and the previous one here to compare them"
+        )
+
+    changes = utils.diff_freezes(store_before, store_after)
+    # only the packages whose version changed are looked up
+    to_enrich = [c for c in changes if c["change"] != "removed"]
+    records = [c for c in changes if c["change"] == "removed"] + [
+        dict(change, error=repr(err)) if err else record
+        for change, record, err in utils.run_concurrently(enrich_change, to_enrich)
+    ]
+    counts = Counter(c["change"] for c in changes)
+    unchanged = (
+        len(store_after)
+        - counts["added"]
+        - sum(counts[c] for c in ["upgraded", "downgraded", "changed"])
+    )
+
+    return [
+        dmc.Group(
+            [
+                dmc.Badge(f"{counts[change]} {change}", variant="light")
+                for change in ["added", "removed", "upgraded", "downgraded", "changed"]
+            ]
+            + [dmc.Badge(f"{unchanged} unchanged", variant="outline", color="gray")],
+            mt="10px",
+            mb="10px",
+        ),
+        diff_grid(records),
+        dcc.Markdown(
+            id="freeze_diff_notes",
+            style={"height": "50vh", "overflow-y": "scroll"},
+        ),
+    ]
+
+
+def layout(store_pip):
+    return dmc.Container(
+        [
+            utils.text_upload_set(
+                "pip_freeze_before",
+                placeholder="pip freeze from before the upgrade, the pip freeze uploaded above is used as the current one",
+            ),
+            dcc.Loading(html.Div(id="freeze_diff_content")),
+        ],
+        fluid=True,
+    )
+
+
+@callback(
+    Output({"type": "store", "index": "pip_freeze_before"}, "data"),
+    Input({"type": "textarea", "index": "pip_freeze_before"}, "value"),
+    State({"type": "streamed-upload", "index": "pip_freeze_before"}, "data"),
+    prevent_initial_call=True,
+)
+def process_previous_freeze(raw_info_pip, streamed):
+    # uploads are parsed while streamed and already are in the store
+    if utils.is_streamed_upload(raw_info_pip, streamed):
+        if streamed is not None:
+            dash.set_props(
+                {"type": "streamed-upload", "index": "pip_freeze_before"},
+                {"data": None},
+            )
+        return dash.no_update
+    return utils.parse_requirements_text(raw_info_pip, file_type="pip_freeze")
+
+
+@callback(
+    Output("freeze_diff_content", "children"),
+    Input({"type": "store", "index": "pip_freeze_before"}, "data"),
+    State({"type": "store", "index": "pip_freeze"}, "data"),
+)
+def update_freeze_diff(store_before, store_after):
+    return diff_content(store_before, store_after)
+
+
+@callback(
+    Output("freeze_diff_notes", "children"),
+    Input("freeze_diff_grid", "selectedRows"),
+    prevent_initial_call=True,
+)
+def show_release_notes(selected_rows):
+    if not selected_rows:
+        return ""
+    record = selected_rows[0]
+    if not record.get("notes_versions"):
+        return f"No release notes found between {record.get('old_version')} and {record.get('new_version')} for {record['name']}."
+    changelogs = utils.get_library_changelogs(record["name"])
+    return version_markdown_format(
+        changelogs["all_changelogs"], record["notes_versions"]
+    )
@@ -7,7 +7,8 @@ from dash_iconify import DashIconify
 from operator import itemgetter
 import utils
 
-cache = utils.cache
+cache = utils.caches["components"]
+
 
 @cache.memoize()
 def version_markdown_format(all_changelogs, versions_to_add):
@@ -165,13 +166,14 @@ def update_changelog_versions(
         return new_text
 
 
-@cache.memoize()
+# not memoized: the changelogs are cached by utils, except after a download error,
+# and the accordion must show them once they can be downloaded
 def changelog_accordion(lib_name):
     lib = utils.get_library_history(lib_name)
-    repo_url = utils.get_repo_url(lib)
+    full_changelog = utils.get_library_changelogs(lib_name)
 
-    if repo_url.get("is_github"):
-        full_changelog = utils.get_changelogs(repo_url)
+    # GitHub releases and parsed changelog files share the same format
+    if full_changelog.get("versions_reversed"):
         changelogs_dict = full_changelog.get("all_changelogs")
         versions_reversed = full_changelog.get("versions_reversed")
         accordion_content = [
@@ -184,13 +186,9 @@ def changelog_accordion(lib_name):
             ),
             version_management_layout_gh(lib_name, full_changelog),
         ]
-    elif repo_url.get("url"):
-        accordion_content = [
-            html.Iframe(
-                src=repo_url.get("url"),
-                style={"width": "-webkit-fill-available", "height": "50vh"},
-            )
-        ]
+    elif full_changelog.get("url"):
+        text = f"The [changelog of {lib_name}]({full_changelog['url']}) couldn't be split into versions. Check the library page: {lib.get('urls')}"
+        accordion_content = dcc.Markdown(text)
     else:
         text = f"The changelog for {lib_name} couldn't be processed. Check the library page: {lib.get('urls')}"
         accordion_content = dcc.Markdown(text)
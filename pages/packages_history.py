@@ -5,8 +5,9 @@ import dash_ag_grid as dag
 import dash_mantine_components as dmc
 import pandas as pd
 import utils
+from pages.packages_changelogs import version_markdown_format
 
-cache = utils.cache
+cache = utils.caches["components"]
 
 
 @cache.memoize()
@@ -69,6 +70,48 @@ def libraries_grid(lib_data, req=True, pip=True):
                 },
             ],
         },
+        # staleness of the installed (or requirements.txt) version
+        {
+            "headerName": "Behind newest",
+            "children": [
+                {
+                    "field": "days_behind",
+                    "headerName": "Days",
+                    "filter": "agNumberColumnFilter",
+                    "hide": False,
+                },
+                {
+                    "field": "releases_behind",
+                    "headerName": "Releases",
+                    "filter": "agNumberColumnFilter",
+                    "hide": False,
+                },
+                {
+                    "field": "major_lag",
+                    "headerName": "Major",
+                    "filter": "agNumberColumnFilter",
+                    "hide": False,
+                },
+                {
+                    "field": "minor_lag",
+                    "headerName": "Minor",
+                    "filter": "agNumberColumnFilter",
+                },
+                {
+                    "field": "patch_lag",
+                    "headerName": "Patch",
+                    "filter": "agNumberColumnFilter",
+                },
+            ],
+        },
+        # dependency graph (filled once the graph is resolved)
+        {
+            "headerName": "Dependencies",
+            "children": [
+                {"field": "pulled_in_by", "headerName": "Pulled in by"},
+                {"field": "upgrade_blocked_by", "headerName": "Upgrade blocked by"},
+            ],
+        },
         # other info
         # https://community.plotly.com/t/how-to-make-dash-ag-grid-table-cells-hyperlinked/77482/9
         {
@@ -105,7 +148,34 @@ def libraries_grid(lib_data, req=True, pip=True):
     )
 
 
-def layout(store_req, store_pip):
+def summary_panel(summary: dict):
+    stats = [
+        ("Packages", summary["packages"]),
+        ("Outdated", summary["outdated"]),
+        ("Major version behind", summary["major_behind"]),
+        ("Releases behind (total)", summary["releases_behind"]),
+        ("Median days behind", summary["median_days_behind"]),
+        ("Max days behind", summary["max_days_behind"]),
+        ("Version not found", summary["unknown"]),
+    ]
+    return dmc.SimpleGrid(
+        [
+            dmc.Paper(
+                [
+                    dmc.Text(label, size="xs", c="dimmed"),
+                    dmc.Text(value if value is not None else "-", fw=700, size="lg"),
+                ],
+                withBorder=True,
+                p="xs",
+            )
+            for label, value in stats
+        ],
+        cols=len(stats),
+        spacing="xs",
+    )
+
+
+def layout(store_req, store_pip, store_extra=None):
 
     req = True
     pip = True
@@ -127,23 +197,284 @@ def layout(store_req, store_pip):
         df_records = store_pip.copy()
         req = False
 
-    df_complete_records = [utils.get_library_history(lib) for lib in df_records]
+    # private indexes from --extra-index-url are queried at the same time as pypi
+    extra_index_urls = utils.extract_index_urls(
+        (store_extra or {}).get("extra_index_url")
+    )
+    df_complete_records = [
+        lib if err else complete_lib
+        for lib, complete_lib, err in utils.run_concurrently(
+            lambda lib: utils.get_library_history(lib, extra_index_urls), df_records
+        )
+    ]
+    # staleness columns for all the packages at once
+    staleness_df = utils.staleness_frame(df_complete_records)
+    df_complete_records = staleness_df.to_dict("records")
     return dmc.Container(
         [
-            dmc.Button(
-                id="show_details_button",
-                children="Show selected libraries changelogs",
-                disabled=True,
+            dmc.Group(
+                [
+                    dmc.Button(
+                        id="show_details_button",
+                        children="Show selected libraries changelogs",
+                        disabled=True,
+                    ),
+                    dmc.Button(
+                        id="breaking_scan_button",
+                        children="Scan outdated packages for breaking changes",
+                        variant="outline",
+                    ),
+                    dmc.Switch(
+                        id="dependency_graph_switch",
+                        label="Resolve dependency graph",
+                        checked=False,
+                    ),
+                ],
                 mt="10px",
                 mb="10px",
             ),
+            summary_panel(utils.staleness_summary(staleness_df)),
             html.Br(),
             libraries_grid(df_complete_records, req, pip),
+            # results of the breaking changes scan, filled one batch at a time
+            dcc.Store(id="store_breaking_scan", data={}, storage_type="session"),
+            # triggers the next batch: every batch allows one more tick while packages
+            # are left to scan, so that a batch never starts before the previous ended
+            dcc.Interval(
+                id="breaking_scan_interval",
+                interval=BREAKING_SCAN_INTERVAL,
+                max_intervals=0,
+            ),
+            html.Div(
+                [
+                    dmc.Text(
+                        id="breaking_scan_status", size="sm", c="dimmed", mt="10px"
+                    ),
+                    breaking_scan_grid([]),
+                    dcc.Markdown(
+                        id="breaking_scan_notes",
+                        style={"height": "50vh", "overflow-y": "scroll"},
+                    ),
+                ],
+                id="breaking_scan_container",
+                style={"display": "none"},
+            ),
         ],
         fluid=True,
     )
 
 
+def add_dependency_columns(records: list[dict], extra_index_urls=()) -> list[dict]:
+    """
+    Resolve the dependency graph of the grid packages and fill the "pulled_in_by" and
+    "upgrade_blocked_by" columns. Dependencies that aren't in the uploaded files are added
+    as new rows.
+    """
+    if any(row.get("raw_line_req") for row in records):
+        # the requirements.txt packages are the top-level ones
+        roots = {
+            row["name"]: (row["req_version"] if row.get("req_pinned") == "==" else None)
+            for row in records
+            if isinstance(row.get("raw_line_req"), str)
+        }
+    else:
+        roots = {row["name"]: row.get("installed_version") for row in records}
+    installed = {
+        row["name"]: row["installed_version"]
+        for row in records
+        if isinstance(row.get("installed_version"), str)
+    }
+
+    graph = utils.resolve_dependency_graph(roots, pinned=installed)
+    parents = utils.dependency_parents(graph)
+    blockers = utils.upgrade_blockers(graph)
+
+    rows_by_name = {utils.canonicalize_name(row["name"]): row for row in records}
+    missing = [
+        {"name": name, "installed_version": version, "source": "dependency"}
+        for name, version in graph["nodes"].items()
+        if name not in rows_by_name
+    ]
+    for lib, complete_lib, err in utils.run_concurrently(
+        lambda lib: utils.get_library_history(lib, extra_index_urls), missing
+    ):
+        rows_by_name[lib["name"]] = lib if err else complete_lib
+
+    for name, row in rows_by_name.items():
+        row["pulled_in_by"] = ", ".join(sorted(parents.get(name, [])))
+        row["upgrade_blocked_by"] = "; ".join(
+            f"{' > '.join(b['path'])} requires {name}{b['specifier']}"
+            for b in blockers.get(name, [])
+        )
+    return list(rows_by_name.values())
+
+
+@callback(
+    Output("libraries_grid", "rowData"),
+    Input("dependency_graph_switch", "checked"),
+    State("libraries_grid", "rowData"),
+    State("store_extra", "data"),
+    prevent_initial_call=True,
+)
+def update_dependency_columns(checked, row_data, store_extra):
+    if not checked:
+        return [
+            dict(row, pulled_in_by=None, upgrade_blocked_by=None)
+            for row in row_data
+            if row.get("source") != "dependency"
+        ]
+    extra_index_urls = utils.extract_index_urls(
+        (store_extra or {}).get("extra_index_url")
+    )
+    return add_dependency_columns(row_data, extra_index_urls)
+
+
+def breaking_scan_grid(results: list[dict]):
+    columnDefs = [
+        {"field": "name"},
+        {"field": "current_version", "headerName": "Current"},
+        {"field": "newest_version", "headerName": "Newest"},
+        {"field": "score", "headerName": "Risk score", "sort": "desc"},
+        {"field": "major_bumps", "headerName": "Major bumps"},
+        {"field": "breaking"},
+        {"field": "removed"},
+        {"field": "deprecated"},
+        {"field": "releases_scanned", "headerName": "Release notes scanned"},
+        {"field": "release_notes_found", "headerName": "Notes found"},
+    ]
+    return dag.AgGrid(
+        id="breaking_scan_grid",
+        rowData=results,
+        columnDefs=columnDefs,
+        defaultColDef={"sortable": True, "filter": True},
+        columnSize="sizeToFit",
+        # keeps the selection while the rows of the next batches are added
+        getRowId="params.data.name",
+        dashGridOptions={"rowSelection": "single"},
+    )
+
+
+# packages scanned per callback call: the results show up one batch at a time
+BREAKING_SCAN_BATCH = 16
+# ms between the end of a batch and the start of the next one
+BREAKING_SCAN_INTERVAL = 500
+
+
+def outdated_packages(row_data: list[dict]) -> list[list[str]]:
+    """
+    [name, current version, newest version] of the grid packages with a newer release.
+    """
+    outdated = []
+    for row in row_data:
+        current = row.get("installed_version")
+        if not isinstance(current, str) and row.get("req_pinned") == "==":
+            current = row.get("req_version")
+        newest = row.get("newest_version")
+        if (
+            isinstance(current, str)
+            and newest
+            and utils.is_valid_version(current)
+            and utils.parse(current) < utils.parse(newest)
+        ):
+            outdated.append([row["name"], current, newest])
+    return outdated
+
+
+@callback(
+    Output("store_breaking_scan", "data"),
+    Output("breaking_scan_interval", "max_intervals"),
+    Input("breaking_scan_button", "n_clicks"),
+    Input("breaking_scan_interval", "n_intervals"),
+    State("store_breaking_scan", "data"),
+    State("libraries_grid", "rowData"),
+    prevent_initial_call=True,
+)
+def scan_outdated_packages(n_clicks, n_intervals, scan, row_data):
+    """
+    Scan the outdated packages one batch at a time: each call scans the next batch
+    in parallel and stores its results, the interval triggers the next call until none
+    are pending. A new scan reuses the results of the previous one for the packages
+    that are still at the same versions, failed scans are retried.
+    """
+    scan = scan or {}
+    if ctx.triggered_id == "breaking_scan_button":
+        outdated = outdated_packages(row_data)
+        previous = scan.get("results", {})
+        results = {}
+        pending = []
+        for name, current, newest in outdated:
+            key = f"{name}|{current}|{newest}"
+            if key in previous:
+                results[key] = previous[key]
+            else:
+                pending.append([name, current, newest])
+        scan = {
+            "total": len(outdated),
+            "reused": len(results),
+            "results": results,
+            "failed": {},
+            "pending": pending,
+        }
+    elif not scan.get("pending"):
+        return dash.no_update, dash.no_update
+
+    batch = scan["pending"][:BREAKING_SCAN_BATCH]
+    for (name, current, newest), result, err in utils.run_concurrently(
+        lambda args: utils.scan_breaking_changes(*args),
+        [tuple(args) for args in batch],
+        workers=BREAKING_SCAN_BATCH,
+    ):
+        key = f"{name}|{current}|{newest}"
+        if err:
+            scan["failed"][key] = repr(err)
+        else:
+            scan["results"][key] = result
+    scan["pending"] = scan["pending"][BREAKING_SCAN_BATCH:]
+    n_intervals = n_intervals or 0
+    return scan, n_intervals + 1 if scan["pending"] else n_intervals
+
+
+@callback(
+    Output("breaking_scan_status", "children"),
+    Output("breaking_scan_grid", "rowData"),
+    Output("breaking_scan_container", "style"),
+    Input("store_breaking_scan", "data"),
+    prevent_initial_call=True,
+)
+def show_breaking_scan(scan):
+    if not scan:
+        return "", [], {"display": "none"}
+    scanned = len(scan["results"]) - scan["reused"]
+    failed = [key.split("|")[0] for key in scan["failed"]]
+    status = f"{scan['total']} outdated packages: {scanned} scanned"
+    if scan["reused"]:
+        status += f", {scan['reused']} from the previous scan"
+    if failed:
+        status += f", {len(failed)} failed ({', '.join(failed)})"
+    if scan["pending"]:
+        status += f", {len(scan['pending'])} left to scan..."
+    else:
+        status += ". Select one to read its flagged release notes"
+    return status, list(scan["results"].values()), {}
+
+
+@callback(
+    Output("breaking_scan_notes", "children"),
+    Input("breaking_scan_grid", "selectedRows"),
+    prevent_initial_call=True,
+)
+def show_flagged_notes(selected_rows):
+    if not selected_rows:
+        return ""
+    result = selected_rows[0]
+    if not result["flagged_versions"]:
+        return f"No breaking change markers in the release notes of {result['name']}."
+    changelogs = utils.get_library_changelogs(result["name"])
+    return version_markdown_format(
+        changelogs["all_changelogs"], result["flagged_versions"]
+    )
+
+
 # enable "Show changelogs" button
 clientside_callback(
     """
@@ -174,6 +505,10 @@ def switch_to_chagelogs(n_clicks, selectedRows):
         libs = "&".join([lib["name"] for lib in selectedRows])
 
         dash.set_props(
-            "location", {"pathname": dash.get_relative_path("/changelogs"), "search": f"?libs={libs}"}
+            "location",
+            {
+                "pathname": dash.get_relative_path("/changelogs"),
+                "search": f"?libs={libs}",
+            },
         )
         dash.set_props("choose_action", {"value": "changelogs"})
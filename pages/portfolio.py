@@ -0,0 +1,196 @@
+import dash
+from dash import dcc, html
+from dash import callback, Input, Output, State, ctx
+import dash_ag_grid as dag
+import dash_mantine_components as dmc
+from dash_iconify import DashIconify
+import base64
+import utils
+
+
+def parse_uploads(contents: list[str], filenames: list[str]) -> dict[str, list[dict]]:
+    """
+    Parse uploaded manifests into {project: libraries}. Several services usually have a file
+    with the same name (requirements.txt), so repeated names get a numeric suffix.
+    """
+    manifests = {}
+    for content, filename in zip(contents, filenames):
+        project = filename
+        suffix = 2
+        while project in manifests:
+            project = f"{filename} ({suffix})"
+            suffix += 1
+        content_type, content_string = content.split(",")
+        text = base64.b64decode(content_string).decode("utf-8").replace("\ufeff", "")
+        manifests[project] = utils.parse_requirements_text(text, file_type="req")
+    return manifests
+
+
+def requirement_cell(entry: dict) -> str:
+    # exact pins only show the version, other specifiers keep their operator
+    pinned = entry["pinned"] if entry["pinned"] not in ["==", "Not pinned"] else ""
+    return f"{pinned}{entry['version'] or ''}" or "*"
+
+
+def portfolio_grid(manifests: dict[str, list[dict]], portfolio_index: dict):
+    projects = list(manifests)
+
+    # every package is looked up once, whatever the number of projects using it
+    newest = {
+        name: lib
+        for name, lib, err in utils.run_concurrently(
+            utils.get_library_history, list(portfolio_index)
+        )
+        if not err
+    }
+
+    # project names (e.g. requirements.txt) can't be ag grid fields: dots are nested paths
+    fields = {project: f"project_{i}" for i, project in enumerate(projects)}
+    records = [
+        dict(
+            {
+                "name": name,
+                "projects": len(entries),
+                "newest_version": newest.get(name, {}).get("newest_version"),
+                "newest_release_date": newest.get(name, {}).get("newest_release_date"),
+            },
+            **{
+                fields[project]: requirement_cell(entry)
+                for project, entry in entries.items()
+            },
+        )
+        for name, entries in portfolio_index.items()
+    ]
+
+    columnDefs = [
+        {"field": "name", "pinned": "left"},
+        {"field": "projects", "filter": "agNumberColumnFilter", "pinned": "left"},
+        {"field": "newest_version", "headerName": "Newest", "pinned": "left"},
+        {"field": "newest_release_date", "headerName": "Released", "pinned": "left"},
+    ] + [{"field": fields[project], "headerName": project} for project in projects]
+
+    return dag.AgGrid(
+        id="portfolio_grid",
+        rowData=records,
+        columnDefs=columnDefs,
+        defaultColDef={"sortable": True, "filter": True, "floatingFilter": True},
+        dashGridOptions={"sideBar": True},
+        enableEnterpriseModules=True,
+        licenseKey="placeholder",
+    )
+
+
+def layout():
+    return dmc.Container(
+        [
+            dcc.Store(id="store_portfolio", data={}, storage_type="session"),
+            # inverted index of the projects (see `utils.build_portfolio_index`), built
+            # once per upload for the queries
+            dcc.Store(id="store_portfolio_index", data={}),
+            dmc.Group(
+                [
+                    dcc.Upload(
+                        dmc.Button(
+                            "Upload manifests",
+                            leftSection=DashIconify(icon="lucide:upload"),
+                            variant="outline",
+                        ),
+                        id="portfolio_upload",
+                        multiple=True,
+                    ),
+                    dmc.ActionIcon(
+                        DashIconify(icon="lucide:trash-2", width=20),
+                        variant="transparent",
+                        id="portfolio_clear",
+                    ),
+                    dmc.Text(id="portfolio_projects", size="sm", c="dimmed"),
+                ],
+                mt="10px",
+                mb="10px",
+            ),
+            dmc.Group(
+                [
+                    dmc.Select(
+                        id="portfolio_query_package",
+                        label="Who still pins",
+                        searchable=True,
+                        clearable=True,
+                        data=[],
+                    ),
+                    dmc.TextInput(
+                        id="portfolio_query_version",
+                        label="below version",
+                        debounce=True,
+                    ),
+                ],
+                align="end",
+            ),
+            html.Div(id="portfolio_query_result"),
+            dcc.Loading(html.Div(id="portfolio_content")),
+        ],
+        fluid=True,
+    )
+
+
+@callback(
+    Output("store_portfolio", "data"),
+    Input("portfolio_upload", "contents"),
+    Input("portfolio_clear", "n_clicks"),
+    State("portfolio_upload", "filename"),
+    State("store_portfolio", "data"),
+    prevent_initial_call=True,
+)
+def update_portfolio(contents, n_clicks, filenames, store_portfolio):
+    if ctx.triggered_id == "portfolio_clear":
+        return {}
+    elif contents:
+        # new uploads are added to the projects already loaded
+        return dict(store_portfolio or {}, **parse_uploads(contents, filenames))
+    return dash.no_update
+
+
+@callback(
+    Output("portfolio_content", "children"),
+    Output("portfolio_projects", "children"),
+    Output("portfolio_query_package", "data"),
+    Output("store_portfolio_index", "data"),
+    Input("store_portfolio", "data"),
+)
+def show_portfolio(store_portfolio):
+    if not store_portfolio:
+        return (
+            "Upload the requirements.txt of every project to compare them",
+            "",
+            [],
+            {},
+        )
+    portfolio_index = utils.build_portfolio_index(store_portfolio)
+    return (
+        portfolio_grid(store_portfolio, portfolio_index),
+        f"{len(store_portfolio)} projects, {len(portfolio_index)} packages",
+        sorted(portfolio_index),
+        portfolio_index,
+    )
+
+
+@callback(
+    Output("portfolio_query_result", "children"),
+    Input("portfolio_query_package", "value"),
+    Input("portfolio_query_version", "value"),
+    State("store_portfolio_index", "data"),
+    prevent_initial_call=True,
+)
+def query_portfolio(package, version, portfolio_index):
+    if not (package and version and portfolio_index):
+        return ""
+    if not utils.is_valid_version(version):
+        return dmc.Text(f"{version} is not a valid version", c="red")
+    projects = utils.projects_pinning_below(portfolio_index, package, version)
+    if not projects:
+        return dmc.Text(f"No project pins {package} below {version}")
+    return dmc.List(
+        [
+            dmc.ListItem(f"{p['project']}: {package}{p['pinned']}{p['version']}")
+            for p in projects
+        ]
+    )
@@ -0,0 +1,183 @@
+import dash
+from dash import dcc, html
+from dash import callback, Input, Output, State, ctx
+import dash_ag_grid as dag
+import dash_mantine_components as dmc
+from dash_iconify import DashIconify
+import flask
+import time
+import profiling
+import utils
+
+# how long the admin toggle profiles every callback
+TOGGLE_MINUTES = 15
+
+
+def check_authorized():
+    # the page and its callbacks need the profiling secret, see profiling.py
+    if not profiling.authorized(flask.request):
+        raise dash.exceptions.PreventUpdate
+
+
+def toggle_status():
+    cache = utils.caches["profiles"]
+    expire_time = cache.get(profiling.TOGGLE_KEY, expire_time=True)[1]
+    if not expire_time:
+        return "Profiling is on for the sessions opened with ?profile=<secret> and the requests with the X-Profile: <secret> header."
+    minutes = max(0, round((expire_time - time.time()) / 60))
+    return f"Every callback is profiled for {minutes} more minutes."
+
+
+def layout():
+    if not profiling.available():
+        return dmc.Container(
+            dmc.Text(
+                "Profiling is disabled, set PROFILING_ENABLED=1 and PROFILING_SECRET to enable it.",
+                mt="10px",
+            )
+        )
+    if not profiling.authorized(flask.request):
+        return dmc.Container(
+            dmc.Text(
+                "Open this page with ?profile=<secret> to see the profiles.", mt="10px"
+            )
+        )
+
+    columnDefs = [
+        {"field": "created", "checkboxSelection": True, "sort": "desc"},
+        {"field": "callback"},
+        {"field": "changed", "headerName": "Triggered by"},
+        {"field": "inputs_digest", "headerName": "Inputs digest"},
+        {
+            "field": "duration",
+            "headerName": "Duration (s)",
+            "filter": "agNumberColumnFilter",
+        },
+        {"field": "samples", "filter": "agNumberColumnFilter"},
+    ]
+
+    return dmc.Container(
+        [
+            dmc.Group(
+                [
+                    dmc.Button(
+                        "Refresh",
+                        id="profiles_refresh",
+                        leftSection=DashIconify(icon="tabler:reload"),
+                        variant="outline",
+                    ),
+                    dmc.Button(
+                        f"Profile every callback for {TOGGLE_MINUTES} minutes",
+                        id="profiles_toggle_on",
+                        leftSection=DashIconify(icon="tabler:flame"),
+                        variant="outline",
+                    ),
+                    dmc.Button(
+                        "Stop",
+                        id="profiles_toggle_off",
+                        leftSection=DashIconify(icon="tabler:player-stop"),
+                        variant="outline",
+                        color="red",
+                    ),
+                ],
+                mt="10px",
+                mb="10px",
+            ),
+            dmc.Text(toggle_status(), id="profiles_status", size="sm", mb="10px"),
+            dag.AgGrid(
+                id="profiles_grid",
+                rowData=profiling.recent_profiles(utils.caches["profiles"]),
+                columnDefs=columnDefs,
+                defaultColDef={"sortable": True, "filter": True},
+                columnSize="sizeToFit",
+                dashGridOptions={"rowSelection": "single"},
+            ),
+            html.Div(id="profiles_details"),
+            dcc.Download(id="profiles_download"),
+        ],
+        fluid=True,
+    )
+
+
+@callback(
+    Output("profiles_grid", "rowData"),
+    Output("profiles_status", "children"),
+    Input("profiles_refresh", "n_clicks"),
+    Input("profiles_toggle_on", "n_clicks"),
+    Input("profiles_toggle_off", "n_clicks"),
+    prevent_initial_call=True,
+)
+def update_profiles(n_clicks_refresh, n_clicks_on, n_clicks_off):
+    check_authorized()
+    cache = utils.caches["profiles"]
+    if ctx.triggered_id == "profiles_toggle_on":
+        profiling.set_toggle(cache, TOGGLE_MINUTES)
+    elif ctx.triggered_id == "profiles_toggle_off":
+        profiling.set_toggle(cache, None)
+    return profiling.recent_profiles(cache), toggle_status()
+
+
+@callback(
+    Output("profiles_details", "children"),
+    Input("profiles_grid", "selectedRows"),
+    prevent_initial_call=True,
+)
+def show_profile(selected_rows):
+    check_authorized()
+    if not selected_rows:
+        return []
+    profile = utils.caches["profiles"].get(selected_rows[0]["key"])
+    if not profile:
+        return dmc.Text("This profile was evicted from the cache.")
+    return dmc.Stack(
+        [
+            dmc.Group(
+                [
+                    dmc.Text(
+                        f"{profile['callback']}: {profile['samples']} samples in {profile['duration']} s",
+                        size="sm",
+                    ),
+                    dmc.Button(
+                        "Download folded stacks",
+                        id="profiles_download_button",
+                        leftSection=DashIconify(icon="tabler:download"),
+                        variant="outline",
+                        size="xs",
+                    ),
+                ]
+            ),
+            dmc.Text(
+                "Open the folded stacks in speedscope.app or flamegraph.pl for the flame graph.",
+                size="sm",
+                c="dimmed",
+            ),
+            dag.AgGrid(
+                rowData=profile["top_functions"],
+                columnDefs=[
+                    {"field": "function", "flex": 3},
+                    {"field": "total", "headerName": "Total samples", "flex": 1},
+                    {"field": "self", "headerName": "Self samples", "flex": 1},
+                ],
+                defaultColDef={"sortable": True, "filter": True},
+            ),
+        ],
+        mt="10px",
+        gap="xs",
+    )
+
+
+@callback(
+    Output("profiles_download", "data"),
+    Input("profiles_download_button", "n_clicks"),
+    State("profiles_grid", "selectedRows"),
+    prevent_initial_call=True,
+)
+def download_profile(n_clicks, selected_rows):
+    check_authorized()
+    if not selected_rows:
+        raise dash.exceptions.PreventUpdate
+    profile = utils.caches["profiles"].get(selected_rows[0]["key"])
+    if not profile:
+        raise dash.exceptions.PreventUpdate
+    filename = profile["key"].removeprefix(profiling.PROFILE_KEY_PREFIX)
+    return dict(content=profile["folded"], filename=f"{filename}.folded")
@@ -0,0 +1,121 @@
+import dash
+from dash import dcc, html
+from dash import callback, Input, Output, State, ctx
+import dash_mantine_components as dmc
+from dash_iconify import DashIconify
+import utils
+
+
+def upload_version_ranges(store_req, store_pip) -> dict:
+    """
+    {package: (current version, newest version)} for the uploaded packages, the current
+    version being the installed one or the requirements.txt one.
+    """
+    current = {lib["name"]: lib.get("req_version") for lib in store_req or []}
+    current.update(
+        {lib["name"]: lib.get("installed_version") for lib in store_pip or []}
+    )
+    return {
+        name: (version, lib["newest_version"])
+        for name, version in current.items()
+        for lib in [utils.get_library_history(name)]
+        if lib["newest_version"]
+    }
+
+
+def layout(store_req, store_pip):
+    return dmc.Container(
+        [
+            dmc.Group(
+                [
+                    dmc.TextInput(
+                        id="search_notes_query",
+                        label="Search release notes",
+                        placeholder='breaking OR deprecated, "url_quote", remov*',
+                        debounce=True,
+                        style={"flex": 1},
+                    ),
+                    dmc.Switch(
+                        id="search_notes_range",
+                        label="Only versions between installed and newest",
+                        checked=bool(store_req or store_pip),
+                    ),
+                    dmc.Button(
+                        "Index uploaded packages",
+                        id="search_notes_index",
+                        leftSection=DashIconify(icon="lucide:database"),
+                        variant="outline",
+                        disabled=not (store_req or store_pip),
+                    ),
+                ],
+                align="end",
+                mt="10px",
+                mb="10px",
+            ),
+            dmc.TagsInput(
+                id="search_notes_packages",
+                label="Packages (all indexed packages if empty)",
+                data=utils.get_lib_names_list(store_req or [], store_pip or []),
+                clearable=True,
+            ),
+            dmc.Text(id="search_notes_status", size="sm", c="dimmed"),
+            dcc.Loading(html.Div(id="search_notes_results")),
+        ],
+        fluid=True,
+    )
+
+
+@callback(
+    Output("search_notes_status", "children"),
+    Input("search_notes_index", "n_clicks"),
+    State({"type": "store", "index": "req"}, "data"),
+    State({"type": "store", "index": "pip_freeze"}, "data"),
+    prevent_initial_call=True,
+)
+def index_uploaded_packages(n_clicks, store_req, store_pip):
+    names = utils.get_lib_names_list(store_req or [], store_pip or [])
+    results = list(utils.run_concurrently(utils.get_library_changelogs, names))
+    indexed = [
+        name
+        for name, changelogs, err in results
+        if changelogs and changelogs.get("all_changelogs")
+    ]
+    return f"Release notes of {len(indexed)}/{len(names)} packages are indexed"
+
+
+@callback(
+    Output("search_notes_results", "children"),
+    Input("search_notes_query", "value"),
+    Input("search_notes_range", "checked"),
+    Input("search_notes_packages", "value"),
+    State({"type": "store", "index": "req"}, "data"),
+    State({"type": "store", "index": "pip_freeze"}, "data"),
+    prevent_initial_call=True,
+)
+def search_notes(query, only_range, packages, store_req, store_pip):
+    if not query:
+        return []
+    version_ranges = upload_version_ranges(store_req, store_pip) if only_range else None
+    if packages and version_ranges:
+        version_ranges = {p: version_ranges[p] for p in packages if p in version_ranges}
+    results = utils.search_release_notes(
+        query, packages=packages or None, version_ranges=version_ranges
+    )
+    if not results:
+        return dmc.Text(f"No release notes match {query}")
+    return dmc.Stack(
+        [
+            dmc.Paper(
+                [
+                    dcc.Markdown(
+                        f"**{r['package']}** [{r['version']}]({r['release_url']}) ({r['release_date']})"
+                    ),
+                    dcc.Markdown(r["snippet"]),
+                ],
+                withBorder=True,
+                p="xs",
+            )
+            for r in results
+        ],
+        gap="xs",
+    )
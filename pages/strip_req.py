@@ -6,7 +6,7 @@ import utils
 from dash_iconify import DashIconify
 
 
-def load_stripped_req(store_req, store_stripped_req, store_extra):
+def load_stripped_req(store_req, store_stripped_req, store_extra, as_of_date=None):
 
     textarea_value = None
     placeholder = None
@@ -18,7 +18,15 @@ def load_stripped_req(store_req, store_stripped_req, store_extra):
             extra_index_string = "\n".join(store_extra.get("extra_index_url", ""))
         else:
             extra_index_string = ""
-        if store_stripped_req:
+        if as_of_date:
+            # what pip would have installed on that date
+            extra_index_urls = utils.extract_index_urls(
+                (store_extra or {}).get("extra_index_url")
+            )
+            stripped_req = utils.pin_requirements_as_of(
+                store_req, as_of_date, extra_index_urls
+            )
+        elif store_stripped_req:
             stripped_req = store_stripped_req
         else:
             stripped_req = [lib["name"] for lib in store_req]
@@ -27,7 +35,8 @@ def load_stripped_req(store_req, store_stripped_req, store_extra):
         textarea_value.replace("\n\n", "\n")
 
         # save stripped requirements
-        dash.set_props("store_stripped_requirements", {"data": stripped_req})
+        if not as_of_date:
+            dash.set_props("store_stripped_requirements", {"data": stripped_req})
 
     return {"value": textarea_value, "placeholder": placeholder}
 
@@ -60,6 +69,15 @@ def layout(store_req, store_stripped_req, store_extra):
                 maxRows=15,
                 **textarea_args
             ),
+            dmc.DatePickerInput(
+                id="as_of_date",
+                label="Pin the versions released on or before",
+                placeholder="Pick a date to pin the versions pip would have installed then",
+                valueFormat="YYYY-MM-DD",
+                clearable=True,
+                w=400,
+                mt="10px",
+            ),
             dcc.Download(id="download_stripped_req"),
         ]
     )
@@ -68,14 +86,15 @@ def layout(store_req, store_stripped_req, store_extra):
 @callback(
     Output("textarea_stripped_req", "value"),
     Input("reload_stripped_req_button", "n_clicks"),
+    Input("as_of_date", "value"),
     # this store should already be updated based on the values that have been modified in the text area
     State({"type": "store", "index": "req"}, "data"),
     State("store_extra", "data"),
     prevent_initial_call=True,
 )
-def update_textarea(n_clicks, store_req, store_extra):
-    new_textarea_args = load_stripped_req(store_req, None, store_extra)
-    return load_stripped_req["value"]
+def update_textarea(n_clicks, as_of_date, store_req, store_extra):
+    new_textarea_args = load_stripped_req(store_req, None, store_extra, as_of_date)
+    return new_textarea_args["value"]
 
 
 @callback(
@@ -0,0 +1,241 @@
+"""
+Opt-in sampling profiler for the Dash callback requests.
+
+Profiling is off unless PROFILING_ENABLED=1 and a PROFILING_SECRET are set: profiles
+reveal the code paths and timings of the app, and profiling costs CPU. A callback
+request is then profiled when any of these is set:
+- the `X-Profile: <secret>` header (curl, load tests),
+- the `profile` cookie, set for the browser session by opening any page with
+  `?profile=<secret>` (`?profile=0` removes it); it holds a value derived from the
+  secret, not the secret itself,
+- the admin toggle of the profiles page, which profiles every callback for a while.
+The profiles page (and its callbacks) need the header or the cookie too.
+
+While the callback runs, a thread samples the stack of the request thread, and of the
+threads of the pools it starts with `utils.run_concurrently` (each stack starts with the
+thread name), every `PROFILE_INTERVAL` seconds. The other requests served at the same time
+are left out. The result is stored as folded stacks, the input of flamegraph.pl and
+speedscope, together with a digest of the callback inputs so that slow calls can be
+replayed. When profiling is off, a request only costs a flag lookup.
+"""
+
+import datetime
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "").lower() in ["1", "true"]
+PROFILING_SECRET = os.environ.get("PROFILING_SECRET", "")
+# seconds between two samples
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", 0.005))
+PROFILE_HEADER = "X-Profile"
+PROFILE_COOKIE = "profile"
+# key of the admin toggle in the profiles cache, set with an expiry
+TOGGLE_KEY = "profiling-enabled"
+# the toggle is read from the cache at most this often (seconds) by each process
+TOGGLE_CHECK_INTERVAL = 5
+PROFILE_KEY_PREFIX = "profile:"
+
+_toggle = {"checked": float("-inf"), "enabled": False}
+
+
+def available() -> bool:
+    return PROFILING_ENABLED and bool(PROFILING_SECRET)
+
+
+def is_secret(value: str) -> bool:
+    return available() and hmac.compare_digest(
+        (value or "").encode(), PROFILING_SECRET.encode()
+    )
+
+
+def session_token() -> str:
+    """
+    Value of the profile cookie: derived from the secret, which never leaves the server.
+    """
+    return hmac.new(
+        PROFILING_SECRET.encode(), b"profile-session", hashlib.sha256
+    ).hexdigest()
+
+
+def authorized(request) -> bool:
+    """
+    Whether the request carries the secret (header) or the session cookie.
+    """
+    return available() and (
+        is_secret(request.headers.get(PROFILE_HEADER))
+        or hmac.compare_digest(
+            request.cookies.get(PROFILE_COOKIE, "").encode(), session_token().encode()
+        )
+    )
+
+
+def pool_thread_prefix(ident: int) -> str:
+    """
+    Name prefix of the threads of a pool started by the thread `ident`, so that its
+    profile can include them.
+    """
+    return f"pool-of-{ident}"
+
+
+def toggle_enabled(cache) -> bool:
+    now = time.monotonic()
+    if now - _toggle["checked"] > TOGGLE_CHECK_INTERVAL:
+        _toggle.update(checked=now, enabled=cache.get(TOGGLE_KEY) is not None)
+    return _toggle["enabled"]
+
+
+def set_toggle(cache, minutes: int | None):
+    """
+    Profile every callback of every worker for `minutes`, or stop (None).
+    """
+    if minutes:
+        cache.set(TOGGLE_KEY, True, expire=60 * minutes)
+    else:
+        cache.delete(TOGGLE_KEY)
+    _toggle["checked"] = float("-inf")
+
+
+def requested(request, cache) -> bool:
+    return available() and (authorized(request) or toggle_enabled(cache))
+
+
+def inputs_digest(callback_request: dict) -> str:
+    """
+    Digest of the inputs and states of a callback request: equal digests mean the
+    callback was called with the same values.
+    """
+    values = [
+        callback_request.get(part) for part in ["inputs", "state", "changedPropIds"]
+    ]
+    data = json.dumps(values, sort_keys=True, default=str).encode()
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of the thread that created it (the request thread) and of the
+    threads of its pools (see `pool_thread_prefix`) every `interval` seconds and counts
+    them as folded stacks ("thread;outer (file:line);...;inner (file:line)"). Pool
+    threads are skipped while they wait for work, so idle ones don't fill the profile.
+    """
+
+    IDLE_FILES = {"threading.py", "queue.py"}
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.target = threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self.duration = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._start
+        return self
+
+    def _run(self):
+        pool_prefix = f"{pool_thread_prefix(self.target)}_"
+        while not self._stopped.wait(self.interval):
+            names = {
+                thread.ident: thread.name
+                for thread in threading.enumerate()
+                if thread.ident == self.target or thread.name.startswith(pool_prefix)
+            }
+            for ident, frame in sys._current_frames().items():
+                if ident not in names:
+                    continue
+                if ident != self.target and (
+                    os.path.basename(frame.f_code.co_filename) in self.IDLE_FILES
+                ):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names[ident])
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+    def top_functions(self, limit: int = 25) -> list[dict]:
+        """
+        Functions with the most samples: `self` where they were running, `total` where
+        they were on the stack.
+        """
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            own[frames[-1]] += count
+            for function in set(frames):
+                total[function] += count
+        return [
+            {"function": function, "total": count, "self": own[function]}
+            for function, count in total.most_common(limit)
+        ]
+
+
+def save_profile(cache, profiler: SamplingProfiler, callback: str, callback_request):
+    """
+    Store a finished profile with its callback and inputs digest. Returns its key.
+    """
+    created = datetime.datetime.now(datetime.timezone.utc)
+    digest = inputs_digest(callback_request)
+    key = f"{PROFILE_KEY_PREFIX}{created.strftime('%Y%m%dT%H%M%S.%f')}-{digest}"
+    cache.set(
+        key,
+        {
+            "key": key,
+            "created": created.isoformat(timespec="seconds"),
+            "callback": callback,
+            "changed": ", ".join(callback_request.get("changedPropIds") or []),
+            "inputs_digest": digest,
+            "duration": round(profiler.duration, 3),
+            "samples": profiler.samples,
+            "top_functions": profiler.top_functions(),
+            "folded": profiler.folded(),
+        },
+    )
+    return key
+
+
+def recent_profiles(cache, limit: int = 100) -> list[dict]:
+    """
+    Summaries of the most recent profiles (without their stacks), newest first.
+    """
+    keys = sorted(
+        (
+            key
+            for key in cache.iterkeys()
+            if isinstance(key, str) and key.startswith(PROFILE_KEY_PREFIX)
+        ),
+        reverse=True,
+    )[:limit]
+    profiles = [cache.get(key) for key in keys]
+    return [
+        {k: v for k, v in profile.items() if k not in ["folded", "top_functions"]}
+        for profile in profiles
+        if profile
+    ]
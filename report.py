@@ -0,0 +1,67 @@
+import csv
+import json
+
+# columns of the headless report, in order
+REPORT_FIELDS = [
+    "source_file",
+    "name",
+    "source",
+    "index",
+    "req_version",
+    "req_pinned",
+    "req_release_date",
+    "installed_version",
+    "installed_release_date",
+    "newest_version",
+    "newest_release_date",
+    "days_behind",
+    "changelog_url",
+    "error",
+]
+
+REPORT_FORMATS = ["json", "csv", "ndjson"]
+
+
+def report_row(lib: dict) -> dict:
+    """
+    Keep only the report columns of an enriched library, in order.
+    """
+    return {field: lib.get(field) for field in REPORT_FIELDS}
+
+
+def write_report(rows, f, report_format="ndjson"):
+    """
+    Write `rows` to the text file `f` one by one, as they are produced.
+
+    Parameters
+    ----------
+    rows : iterable of dict
+        Rows with (at least) the `REPORT_FIELDS` keys.
+    f : file-like object
+        Opened in text mode.
+    report_format : str
+        One of `REPORT_FORMATS`. "json" writes a single array, but still row by row.
+
+    Returns
+    -------
+    int
+        Number of rows written.
+    """
+    count = 0
+    if report_format == "csv":
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for count, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            f.flush()
+    elif report_format == "json":
+        f.write("[")
+        for count, row in enumerate(rows, start=1):
+            f.write(("\n" if count == 1 else ",\n") + json.dumps(report_row(row)))
+            f.flush()
+        f.write("\n]\n")
+    else:
+        for count, row in enumerate(rows, start=1):
+            f.write(json.dumps(report_row(row)) + "\n")
+            f.flush()
+    return count
@@ -0,0 +1,115 @@
+import datetime
+import gzip
+import json
+import os
+import utils
+
+SNAPSHOT_FORMAT = "libraries-changelogs-snapshot"
+SNAPSHOT_VERSION = 1
+
+# only namespaces with plain data (json serializable values, string keys) can be exported,
+# memoized results and components depend on the code version
+SNAPSHOT_NAMESPACES = ["timelines", "release_notes"]
+
+
+def export_snapshot(path: str, namespaces: list[str] = SNAPSHOT_NAMESPACES) -> dict:
+    """
+    Write the content of the data namespaces of the cache to a gzipped NDJSON file.
+
+    The first line is a header with the format and its version, each following line
+    is one cache entry: {"namespace": ..., "key": ..., "value": ...}.
+
+    Parameters
+    ----------
+    path : str
+        Destination file, usually ending in `.ndjson.gz`.
+    namespaces : list of str
+        Cache namespaces to export.
+
+    Returns
+    -------
+    dict
+        Number of entries exported per namespace.
+    """
+    counts = {}
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        header = {
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "namespaces": namespaces,
+        }
+        f.write(json.dumps(header) + "\n")
+        for namespace in namespaces:
+            namespace_cache = utils.caches[namespace]
+            counts[namespace] = 0
+            for key in namespace_cache.iterkeys():
+                # memoized results (tuple keys) may contain anything, never export them
+                if not isinstance(key, str):
+                    continue
+                value = namespace_cache.get(key)
+                # the entry may have been evicted while iterating
+                if value is None:
+                    continue
+                f.write(
+                    json.dumps({"namespace": namespace, "key": key, "value": value})
+                    + "\n"
+                )
+                counts[namespace] += 1
+    return counts
+
+
+def import_snapshot(path: str, overwrite: bool = False) -> dict:
+    """
+    Load a snapshot written by `export_snapshot` into the cache.
+
+    Entries that are already cached are kept unless `overwrite` is True, since they
+    are at least as recent as the snapshot ones.
+
+    Returns
+    -------
+    dict
+        Number of entries imported per namespace.
+    """
+    counts = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not a cache snapshot")
+        version = header.get("version")
+        if not isinstance(version, int) or isinstance(version, bool) or version < 1:
+            raise ValueError(
+                f"{path} is not a valid cache snapshot: invalid version {version!r}"
+            )
+        if version > SNAPSHOT_VERSION:
+            raise ValueError(
+                f"{path} uses snapshot version {version}, "
+                f"only versions up to {SNAPSHOT_VERSION} are supported"
+            )
+        for line in f:
+            entry = json.loads(line)
+            namespace = entry["namespace"]
+            # namespaces may be removed between code versions
+            if namespace not in SNAPSHOT_NAMESPACES:
+                continue
+            namespace_cache = utils.caches[namespace]
+            if overwrite:
+                namespace_cache.set(entry["key"], entry["value"])
+                added = True
+            else:
+                added = namespace_cache.add(entry["key"], entry["value"])
+            counts[namespace] = counts.get(namespace, 0) + int(added)
+    return counts
+
+
+def import_snapshot_at_boot(path: str | None = os.environ.get("CACHE_SNAPSHOT")):
+    """
+    Import the snapshot at `path` (CACHE_SNAPSHOT env var by default) once per snapshot file,
+    even if several gunicorn workers boot at the same time.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    lock_key = f"snapshot-imported:{os.path.abspath(path)}:{os.path.getmtime(path)}"
+    if utils.cache.add(lock_key, os.getpid()):
+        return import_snapshot(path)
+    return None
@@ -0,0 +1,42 @@
+"""
+The cache directory is read by `utils` at import time: point it at a temporary
+directory before any test module imports the app code.
+"""
+
+import os
+import sys
+import tempfile
+from contextvars import copy_context
+import dash
+import pytest
+from dash._callback_context import context_value
+from dash._utils import AttributeDict
+
+os.environ["CACHE_DIRECTORY"] = tempfile.mkdtemp(prefix="tests-cache-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# the pages register themselves, which needs an app
+dash.Dash(__name__, use_pages=True, pages_folder="")
+
+
+def run_callback(func, triggered: str, *args, updated_props: dict = None):
+    """
+    Call a Dash callback as the renderer does, `triggered` being the "<id>.<prop>" that
+    fired it. The props it sets with `dash.set_props` are added to `updated_props`.
+    """
+
+    def call():
+        context_value.set(
+            AttributeDict(
+                triggered_inputs=[{"prop_id": triggered, "value": None}],
+                updated_props={} if updated_props is None else updated_props,
+            )
+        )
+        return func(*args)
+
+    return copy_context().run(call)
+
+
+@pytest.fixture
+def callback():
+    return run_callback
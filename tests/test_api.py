@@ -0,0 +1,35 @@
+import flask
+import pytest
+import utils
+from api import api
+
+TIMELINE = {"versions": {"1.0": "2024-01-01T00:00:00", "2.0": "2024-06-01T00:00:00"}}
+PROJECT_URLS = {"Source": "https://github.com/owner/simple-only"}
+
+
+@pytest.fixture
+def client():
+    app = flask.Flask(__name__)
+    app.register_blueprint(api)
+    return app.test_client()
+
+
+def test_package_links_in_simple_mode(client, monkeypatch):
+    monkeypatch.setattr(utils, "PYPI_FETCH_MODE", "simple")
+    monkeypatch.setattr(
+        utils,
+        "fetch_simple_timeline",
+        lambda name, index_url=None: dict(TIMELINE, project_urls=None),
+    )
+    monkeypatch.setattr(
+        utils,
+        "fetch_json_timeline",
+        lambda name: dict(TIMELINE, project_urls=PROJECT_URLS),
+    )
+
+    response = client.get("/api/packages/simple-only")
+
+    assert response.status_code == 200
+    assert response.json["newest_version"] == "2.0"
+    # the first call already has the links, the simple index doesn't
+    assert response.json["project_urls"] == PROJECT_URLS
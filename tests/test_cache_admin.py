@@ -0,0 +1,44 @@
+import threading
+import dash
+import flask
+import pytest
+import profiling
+import utils
+from pages import cache_admin
+
+
+@pytest.fixture
+def maintenance_threads(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILING_SECRET", "s3cret")
+    threads = []
+    done = threading.Event()
+
+    def cache_maintenance():
+        threads.append(threading.current_thread())
+        done.set()
+
+    monkeypatch.setattr(utils, "cache_maintenance", cache_maintenance)
+    return threads, done
+
+
+def test_cull_needs_the_secret(callback, maintenance_threads):
+    threads, _ = maintenance_threads
+    with flask.Flask(__name__).test_request_context():
+        with pytest.raises(dash.exceptions.PreventUpdate):
+            callback(
+                cache_admin.update_cache_admin_grid, "cache_admin_cull.n_clicks", 0, 1
+            )
+    assert threads == []
+
+
+def test_cull_runs_outside_the_request(callback, maintenance_threads):
+    threads, done = maintenance_threads
+    headers = {profiling.PROFILE_HEADER: "s3cret"}
+    with flask.Flask(__name__).test_request_context(headers=headers):
+        _, status = callback(
+            cache_admin.update_cache_admin_grid, "cache_admin_cull.n_clicks", 0, 1
+        )
+    assert "background" in status
+    assert done.wait(5)
+    assert threads[0] is not threading.current_thread()
@@ -0,0 +1,31 @@
+import dash
+import pytest
+from pages import import_files
+
+TRIGGERED = '{"index":"req","type":"textarea"}.value'
+STREAMED = '{"index":"req","type":"streamed-upload"}'
+TEXT = "dash==3.3.0\nflask\n"
+
+
+def test_streamed_upload_isnt_parsed_again(callback):
+    updated_props = {}
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        callback(
+            import_files.process_textarea,
+            TRIGGERED,
+            TEXT,
+            None,
+            TEXT,
+            None,
+            updated_props=updated_props,
+        )
+    # cleared, so that the next edits are parsed
+    assert updated_props == {STREAMED: {"data": None}}
+
+
+def test_edited_textarea_is_parsed(callback):
+    _, store_req, store_pip = callback(
+        import_files.process_textarea, TRIGGERED, TEXT, None, None, None
+    )
+    assert [lib["name"] for lib in store_req] == ["dash", "flask"]
+    assert store_pip is dash.no_update
@@ -0,0 +1,24 @@
+import requests
+import import_index
+import utils
+
+
+def fake_get(statuses):
+    def get(url, **kwargs):
+        response = requests.Response()
+        response.status_code = statuses[url.split("/")[-2]]
+        response.url = url
+        response._content = b'{"urls": []}'
+        return response
+
+    return get
+
+
+def test_pypi_errors_are_reported_as_failed(monkeypatch):
+    statuses = {"unknown": 404, "sdist-only": 200, "overloaded": 503, "limited": 429}
+    monkeypatch.setattr(utils.session, "get", fake_get(statuses))
+
+    modules, failed = import_index.build_import_index(package_names=list(statuses))
+
+    assert modules == {}
+    assert sorted(failed) == ["limited", "overloaded"]
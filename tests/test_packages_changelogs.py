@@ -0,0 +1,43 @@
+import requests
+import utils
+from pages import packages_changelogs
+
+REPO = {
+    "url": "https://example.org/flaky",
+    "is_github": False,
+    "changelog_url": "https://example.org/flaky/changelog",
+}
+
+
+def test_changelog_shown_after_a_download_error(monkeypatch):
+    responses = [
+        requests.ConnectionError("connection reset"),
+        {
+            "1.0.0": {
+                "release_date": "2024-01-01",
+                "release_url": None,
+                "changelog_text": "first release",
+            }
+        },
+    ]
+
+    def get_file_changelogs(url):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(
+        utils, "get_library_history", lambda name: {"name": name, "urls": None}
+    )
+    monkeypatch.setattr(utils, "get_repo_url", lambda lib: REPO)
+    monkeypatch.setattr(utils, "get_file_changelogs", get_file_changelogs)
+
+    failed = repr(packages_changelogs.changelog_accordion("flaky"))
+    assert "first release" not in failed
+    assert "couldn't be split into versions" in failed
+
+    # the page shows the changelog once it can be downloaded
+    recovered = repr(packages_changelogs.changelog_accordion("flaky"))
+    assert "first release" in recovered
+    assert responses == []
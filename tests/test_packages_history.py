@@ -0,0 +1,48 @@
+import utils
+from pages import packages_history
+
+
+def test_breaking_scan_finishes_past_one_batch(callback, monkeypatch):
+    scanned = []
+
+    def scan_breaking_changes(name, current_version, newest_version):
+        scanned.append(name)
+        return {"name": name, "score": 0}
+
+    monkeypatch.setattr(utils, "scan_breaking_changes", scan_breaking_changes)
+    count = packages_history.BREAKING_SCAN_BATCH * 2 + 5
+    row_data = [
+        {
+            "name": f"pkg{i}",
+            "req_pinned": "==",
+            "req_version": "1.0",
+            "newest_version": "2.0",
+        }
+        for i in range(count)
+    ]
+
+    scan, max_intervals = callback(
+        packages_history.scan_outdated_packages,
+        "breaking_scan_button.n_clicks",
+        1,
+        0,
+        {},
+        row_data,
+    )
+    n_intervals = 0
+    # the dcc.Interval ticks until it reaches max_intervals
+    while n_intervals < max_intervals:
+        n_intervals += 1
+        scan, max_intervals = callback(
+            packages_history.scan_outdated_packages,
+            "breaking_scan_interval.n_intervals",
+            1,
+            n_intervals,
+            scan,
+            row_data,
+        )
+
+    assert scan["pending"] == []
+    assert len(scan["results"]) == count
+    assert sorted(scanned) == sorted(row["name"] for row in row_data)
+    assert n_intervals == 2
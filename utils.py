@@ -1,23 +1,52 @@
+import numpy as np
 import pandas as pd
 import re
 import requests
 
 # https://stackoverflow.com/a/72188040
-from packaging.version import Version, parse
+from packaging.version import InvalidVersion, Version, parse
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import SpecifierSet
+from packaging.utils import (
+    InvalidSdistFilename,
+    InvalidWheelFilename,
+    canonicalize_name,
+    parse_sdist_filename,
+    parse_wheel_filename,
+)
 
 import base64
+import codecs
 import dash_mantine_components as dmc
 from dash import dcc, html, ctx
 from dash_iconify import DashIconify
 import time
 import dash
 import datetime
+import functools
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from collections import Counter
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
 import diskcache
+import flask
+import metrics
+import profiling
 import os
+import pickle
+import sqlite3
+import zlib
 import github
 from github import Github, Auth
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 # for debugging purposes
 # def timestamp():
 #     return "%i |> " % int(time.time())
@@ -25,18 +54,398 @@ from github import Github, Auth
 
 # ic.configureOutput(prefix=timestamp)
 
-cache = diskcache.Cache("./cache")
+PYPI_URL = os.environ.get("PYPI_URL", "https://pypi.org")
+# PEP 691 index, also used for the --extra-index-url indexes
+PYPI_SIMPLE_URL = os.environ.get("PYPI_SIMPLE_URL", f"{PYPI_URL}/simple")
+SIMPLE_JSON_CONTENT_TYPE = "application/vnd.pypi.simple.v1+json"
+# "simple": versions from the JSON simple index, project urls fetched only when needed
+# "json": everything from /pypi/<name>/json (downloads every file of every release)
+PYPI_FETCH_MODE = os.environ.get("PYPI_FETCH_MODE", "simple")
+# seconds before a PyPI (or extra index) request is given up
+PYPI_TIMEOUT = float(os.environ.get("PYPI_TIMEOUT", 30))
+# GitHub REST API and raw files, e.g. a GitHub Enterprise instance or the load-test
+# stand-in (loadtest/upstream.py)
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+GITHUB_RAW_URL = os.environ.get("GITHUB_RAW_URL", "https://raw.githubusercontent.com")
+
+CACHE_DIRECTORY = os.environ.get("CACHE_DIRECTORY", "./cache")
+
+# one diskcache per namespace so that small, hot parse results are never evicted
+# to make room for changelog text or whole components
+# every setting can be overridden with CACHE_<NAMESPACE>_<SETTING> env vars
+# e.g. CACHE_CHANGELOGS_SIZE_LIMIT=1073741824
+CACHE_NAMESPACES = {
+    # parse helpers: tiny values, recomputing them is cheap
+    "parse": {
+        "size_limit": 2**26,  # 64 MB
+        "eviction_policy": "least-recently-stored",
+        "compress": False,
+    },
+    # pypi records enriched with the uploaded file info
+    "pypi": {
+        "size_limit": 2**27,  # 128 MB
+        "eviction_policy": "least-recently-used",
+        "compress": True,
+    },
+    # changelogs ready to be displayed
+    "changelogs": {
+        "size_limit": 2**27,  # 128 MB
+        "eviction_policy": "least-recently-used",
+        "compress": True,
+    },
+    # package timelines (version -> upload time, project urls), plain data keyed by package name
+    "timelines": {
+        "size_limit": 2**27,  # 128 MB
+        "eviction_policy": "least-recently-used",
+        "compress": True,
+    },
+    # github releases, plain data keyed by repo
+    "release_notes": {
+        "size_limit": 2**28,  # 256 MB
+        "eviction_policy": "least-recently-used",
+        "compress": True,
+    },
+    # rendered dash components (grids, accordions)
+    "components": {
+        "size_limit": 2**27,  # 128 MB
+        "eviction_policy": "least-frequently-used",
+        "compress": True,
+    },
+    # metrics totals of all the workers (see metrics.py), never evicted
+    "metrics": {
+        "size_limit": 2**24,  # 16 MB
+        "eviction_policy": "none",
+        "compress": False,
+    },
+    # callback profiles (see profiling.py), the oldest are dropped first
+    "profiles": {
+        "size_limit": 2**26,  # 64 MB
+        "eviction_policy": "least-recently-stored",
+        "compress": True,
+    },
+}
+
+# zlib (always available) or zstd (if zstandard is installed)
+CACHE_COMPRESSION = os.environ.get("CACHE_COMPRESSION", "zlib")
+# values smaller than this (in bytes, once pickled) are stored as is
+CACHE_COMPRESS_THRESHOLD = int(os.environ.get("CACHE_COMPRESS_THRESHOLD", 1024))
+# seconds between two cull/vacuum runs, 0 disables the maintenance task
+CACHE_MAINTENANCE_INTERVAL = int(os.environ.get("CACHE_MAINTENANCE_INTERVAL", 3600))
+
+
+class CompressedDisk(diskcache.Disk):
+    """
+    diskcache Disk that pickles every value and compresses the large ones.
+
+    The first byte of each stored value says how it was encoded, so values written
+    with different compression settings can still be read. Numbers are stored as is,
+    like diskcache does, so that `Cache.incr` can add to them.
+    """
+
+    RAW = b"\x00"
+    ZLIB = b"\x01"
+    ZSTD = b"\x02"
+
+    def __init__(
+        self, directory, compression="zlib", compress_threshold=1024, **kwargs
+    ):
+        if compression == "zstd" and zstandard is None:
+            compression = "zlib"
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        super().__init__(directory, **kwargs)
+
+    def store(self, value, read, key=diskcache.core.UNKNOWN):
+        if not read and type(value) not in (int, float):
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            if self.compression == "none" or len(data) < self.compress_threshold:
+                value = self.RAW + data
+            elif self.compression == "zstd":
+                value = self.ZSTD + zstandard.ZstdCompressor().compress(data)
+            else:
+                value = self.ZLIB + zlib.compress(data)
+        return super().store(value, read, key=key)
+
+    def fetch(self, mode, filename, value, read):
+        data = super().fetch(mode, filename, value, read)
+        if not read and isinstance(data, bytes):
+            header, data = data[:1], data[1:]
+            if header == self.ZLIB:
+                data = zlib.decompress(data)
+            elif header == self.ZSTD:
+                data = zstandard.ZstdDecompressor().decompress(data)
+            data = pickle.loads(data)
+        return data
+
+
+class InstrumentedCache(diskcache.Cache):
+    """
+    diskcache Cache whose `memoize` records, for every memoized function, the cache hits
+    and misses, the time spent building keys, reading the cache and computing the misses
+    (see metrics.py). Keys are built exactly like diskcache does, so existing entries
+    still match.
+    """
+
+    def memoize(self, name=None, typed=False, expire=None, tag=None, ignore=()):
+        if callable(name):
+            raise TypeError("name cannot be callable")
+
+        def decorator(func):
+            base = (diskcache.core.full_name(func),) if name is None else (name,)
+            function = base[0]
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                key = wrapper.__cache_key__(*args, **kwargs)
+                key_built = time.perf_counter()
+                result = self.get(key, default=diskcache.core.ENOVAL, retry=True)
+                looked_up = time.perf_counter()
+                metrics.inc(
+                    "memoize_key_seconds_total", key_built - start, function=function
+                )
+                metrics.inc(
+                    "memoize_lookup_seconds_total",
+                    looked_up - key_built,
+                    function=function,
+                )
+
+                if result is diskcache.core.ENOVAL:
+                    metrics.inc("memoize_calls_total", function=function, result="miss")
+                    result = func(*args, **kwargs)
+                    if expire is None or expire > 0:
+                        self.set(key, result, expire, tag=tag, retry=True)
+                    metrics.observe(
+                        "memoize_compute_seconds",
+                        time.perf_counter() - looked_up,
+                        function=function,
+                    )
+                else:
+                    metrics.inc("memoize_calls_total", function=function, result="hit")
+                return result
+
+            def __cache_key__(*args, **kwargs):
+                return diskcache.core.args_to_key(base, args, kwargs, typed, ignore)
+
+            wrapper.__cache_key__ = __cache_key__
+            return wrapper
+
+        return decorator
+
+
+def cache_namespace_settings(namespace: str) -> dict:
+    """
+    Return the settings of a cache namespace, with env var overrides applied.
+    """
+    settings = CACHE_NAMESPACES[namespace].copy()
+    prefix = f"CACHE_{namespace.upper()}_"
+    if os.environ.get(f"{prefix}SIZE_LIMIT"):
+        settings["size_limit"] = int(os.environ[f"{prefix}SIZE_LIMIT"])
+    if os.environ.get(f"{prefix}EVICTION_POLICY"):
+        settings["eviction_policy"] = os.environ[f"{prefix}EVICTION_POLICY"]
+    if os.environ.get(f"{prefix}COMPRESS"):
+        settings["compress"] = os.environ[f"{prefix}COMPRESS"].lower() in ["1", "true"]
+    return settings
+
+
+def open_cache(namespace: str) -> diskcache.Cache:
+    settings = cache_namespace_settings(namespace)
+    return InstrumentedCache(
+        os.path.join(CACHE_DIRECTORY, namespace),
+        size_limit=settings["size_limit"],
+        eviction_policy=settings["eviction_policy"],
+        disk=CompressedDisk,
+        disk_compression=CACHE_COMPRESSION if settings["compress"] else "none",
+        disk_compress_threshold=CACHE_COMPRESS_THRESHOLD,
+    )
+
+
+caches = {namespace: open_cache(namespace) for namespace in CACHE_NAMESPACES}
+
+# default namespace, kept as `cache` for the pages that memoize their own helpers
+cache = caches["parse"]
+
+
+def cache_maintenance():
+    """
+    Remove expired items, cull every namespace down to its size limit and vacuum the sqlite files.
+    """
+    for namespace_cache in caches.values():
+        namespace_cache.expire()
+        namespace_cache.cull()
+        namespace_cache.check(fix=True)
+
+
+def start_cache_maintenance(interval=CACHE_MAINTENANCE_INTERVAL):
+    """
+    Run `cache_maintenance` every `interval` seconds in a daemon thread.
+    Only one gunicorn worker runs it for each interval: the first one that gets the lock.
+    """
+    if not interval:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            if cache.add("cache-maintenance-lock", os.getpid(), expire=interval / 2):
+                try:
+                    cache_maintenance()
+                except Exception:
+                    traceback.print_exc()
+
+    thread = threading.Thread(target=loop, name="cache-maintenance", daemon=True)
+    thread.start()
+    return thread
+
+
+# a manual run (cache admin page) is given up on after this many seconds by the lock
+MANUAL_MAINTENANCE_LOCK_EXPIRE = 3600
+
+
+def start_cache_maintenance_now() -> bool:
+    """
+    Run `cache_maintenance` once in a daemon thread, unless a manual run is already going
+    on in any worker. Returns whether it was started.
+    """
+    lock = "cache-maintenance-manual-lock"
+    if not cache.add(lock, os.getpid(), expire=MANUAL_MAINTENANCE_LOCK_EXPIRE):
+        return False
+
+    def run():
+        try:
+            cache_maintenance()
+        except Exception:
+            traceback.print_exc()
+        finally:
+            cache.delete(lock)
+
+    threading.Thread(target=run, name="cache-maintenance-now", daemon=True).start()
+    return True
+
+
+def cache_namespaces_info() -> list[dict]:
+    """
+    Return one record per cache namespace with its size, number of entries and settings.
+    """
+    info = []
+    for namespace, namespace_cache in caches.items():
+        info.append(
+            {
+                "namespace": namespace,
+                "entries": len(namespace_cache),
+                "size": namespace_cache.volume(),
+                "size_limit": namespace_cache.size_limit,
+                "eviction_policy": namespace_cache.eviction_policy,
+                "compression": namespace_cache.disk.compression,
+            }
+        )
+    return info
+
 
 # file_ids
 file_ids = {
     "req": "requirements.txt",
     "pip_freeze": "Pip Freeze",
+    "pip_freeze_before": "Previous Pip Freeze",
     "build_logs": "Build logs",
 }
 
 
+class RateLimiter:
+    """
+    Thread-safe token bucket: `wait` blocks until one more call fits in `rate` calls per second.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+
+# outbound calls per second for each process, 0 disables the limit
+# github allows 5000 requests per hour with a token
+rate_limiters = {
+    "pypi": RateLimiter(float(os.environ.get("PYPI_RATE_LIMIT", 20)), burst=20),
+    "github": RateLimiter(float(os.environ.get("GITHUB_RATE_LIMIT", 1.3)), burst=10),
+}
+
+
+# pooled connections shared by all the threads of a worker
+# (http too, for plain http mirrors and the load-test stand-in)
+session = requests.Session()
+session_adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32)
+session.mount("https://", session_adapter)
+session.mount("http://", session_adapter)
+
+
+def record_response(response, *args, **kwargs):
+    """
+    requests response hook: latency, status and size of every outbound call.
+    """
+    host = urlsplit(response.url).netloc
+    metrics.observe(
+        "http_client_request_seconds",
+        response.elapsed.total_seconds(),
+        host=host,
+        status=response.status_code,
+    )
+    metrics.inc("http_client_response_bytes_total", len(response.content), host=host)
+
+
+session.hooks["response"].append(record_response)
+
+# long-lived pool for the per-index lookups, so that a slow index can finish
+# (and fill the cache) in the background once another index has answered
+index_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="index")
+
+
+def run_concurrently(func, items, workers: int = 8):
+    """
+    Call `func` on every item with a pool of `workers` threads.
+
+    Yields
+    ------
+    tuple
+        (item, result, error) as soon as each call finishes, in completion order.
+        `error` is the exception raised by `func`, or None.
+    """
+    with ThreadPoolExecutor(
+        max_workers=workers,
+        # named after the calling thread, whose profile includes them
+        thread_name_prefix=profiling.pool_thread_prefix(threading.get_ident()),
+    ) as executor:
+        futures = {executor.submit(func, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result(), None
+            except Exception as err:
+                yield item, None, err
+
+
 def raise_callback_error(err):
     err_traceback = traceback.format_exc()
+    callback_request = flask.request.get_json(silent=True) or {}
+    metrics.inc(
+        "dash_callback_errors_total",
+        callback=metrics.callback_label(callback_request.get("output")),
+    )
     print(
         f"""
         Error in callback with outputs: 
@@ -68,17 +477,20 @@ def text_upload_set(file_type, placeholder=None):
             dcc.Store(
                 id={"type": "store", "index": file_type}, data=[], storage_type="local"
             ),  # for requirements.txt
+            # content of the last small file streamed to /api/upload, until the textarea
+            # callback sees it (see `is_streamed_upload`)
+            dcc.Store(id={"type": "streamed-upload", "index": file_type}, data=None),
             dmc.Textarea(
                 id={"type": "textarea", "index": file_type},
                 label=dmc.Group(
                     [
                         dmc.Text(file_ids[file_type]),
-                        dcc.Upload(
-                            dmc.ActionIcon(
-                                DashIconify(icon="lucide:upload", width=20),
-                                variant="transparent",
-                            ),
+                        # files are streamed to /api/upload by assets/streaming_upload.js
+                        dmc.ActionIcon(
+                            DashIconify(icon="lucide:upload", width=20),
+                            variant="transparent",
                             id={"type": "upload", "index": file_type},
+                            className="streaming-upload",
                         ),
                         dmc.ActionIcon(
                             DashIconify(icon="lucide:trash-2", width=20),
@@ -232,6 +644,71 @@ def extract_name_version(line, file_type="req") -> dict:
     return lib
 
 
+def parse_requirements_lines(lines, file_type="req") -> tuple[list[dict], list[str]]:
+    """
+    Parse requirements.txt or pip freeze lines one by one, as they come (e.g. from an
+    upload stream), into one dict per library (see `extract_name_version`).
+
+    The lines aren't memoized one by one: a disk cache lookup per line is far slower than
+    parsing it, and a large file would fill the cache.
+
+    Returns
+    -------
+    tuple
+        The libraries and the `--extra-index-url` lines.
+    """
+    libs, extra_index_lines = [], []
+    for line in lines:
+        line = line.rstrip("\r")
+        if re.match("^--extra-index-url", line):
+            extra_index_lines.append(line)
+        if line and check_library_valid_format.__wrapped__(line):
+            libs.append(extract_name_version.__wrapped__(line, file_type=file_type))
+    return libs, extra_index_lines
+
+
+def parse_requirements_text(req_text: str, file_type="req") -> list[dict]:
+    """
+    Parse the content of a requirements.txt or pip freeze file into one dict per library
+    (see `extract_name_version`).
+    """
+    libs, _ = parse_requirements_lines((req_text or "").split("\n"), file_type)
+    return libs
+
+
+def iter_stream_lines(stream, chunk_size: int = 64 * 1024):
+    """
+    Yield the lines of a binary stream (e.g. `flask.request.stream`) as its chunks arrive,
+    decoded as UTF-8 (a BOM is dropped).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    while chunk := stream.read(chunk_size):
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        yield from lines
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+# first line written in the textarea instead of a file too large to be shown: its
+# libraries are already in the store, so the textarea must not be parsed
+STREAMED_UPLOAD_MARKER = "# uploaded file, not shown: "
+
+
+def is_streamed_upload(text: str, streamed_text: str | None) -> bool:
+    """
+    Whether the textarea of an upload set holds a file already parsed by /api/upload:
+    the note of a large file, or the content of a small one, which
+    assets/streaming_upload.js also writes to the "streamed-upload" store of the set.
+    """
+    text = text or ""
+    return text.startswith(STREAMED_UPLOAD_MARKER) or (
+        streamed_text is not None and text == streamed_text
+    )
+
+
 @cache.memoize()
 def is_valid_version(version):
     try:
@@ -241,11 +718,266 @@ def is_valid_version(version):
         return False
 
 
-@cache.memoize()
-def get_library_history(lib: dict | str) -> dict:
+def format_date(timestamp: str | None) -> str | None:
+    """
+    Convert an ISO 8601 upload time to "%Y-%m-%d", None stays None.
+    """
+    if not timestamp:
+        return None
+    return datetime.datetime.fromisoformat(timestamp).strftime("%Y-%m-%d")
+
+
+def sort_versions(versions_dict: dict) -> dict:
+    """
+    Sort a {version: upload_time} dict from oldest to newest version.
+    """
+    # only keep valid version keys to make sorting possible
+    # even if that means leaving out versions like '0.8.0-final0'
+    versions_keys = [v for v in versions_dict.keys() if is_valid_version(v)]
+    versions_keys.sort(key=Version)
+    return {k: versions_dict[k] for k in versions_keys}
+
+
+def fetch_json_timeline(name: str) -> dict:
+    """
+    Build the timeline of a package from the PyPI JSON API (`/pypi/<name>/json`).
+    This downloads every file of every release and the full description.
+
+    Unknown packages (404) give an empty timeline, which is cached like any other.
+    Other errors (rate limiting, 5xx, timeouts) raise, so that they aren't cached.
+    """
+    # get information from the pypi page in json forman
+    rate_limiters["pypi"].wait()
+    response = session.get(f"{PYPI_URL}/pypi/{name}/json", timeout=PYPI_TIMEOUT)
+    if response.status_code == 404:
+        return {"versions": {}, "project_urls": {}}
+    response.raise_for_status()
+    releases_json = response.json()
+    versions_dict = {
+        k: v[0]["upload_time"] for k, v in releases_json["releases"].items() if len(v)
+    }
+    return {
+        "versions": sort_versions(versions_dict),
+        "project_urls": releases_json["info"]["project_urls"] or {},
+    }
+
+
+def version_from_filename(filename: str) -> str | None:
+    """
+    Return the version of a wheel or sdist filename, None for other (legacy) distributions.
+    """
+    try:
+        if filename.endswith(".whl"):
+            return str(parse_wheel_filename(filename)[1])
+        elif filename.endswith((".tar.gz", ".zip")):
+            return str(parse_sdist_filename(filename)[1])
+    except (InvalidWheelFilename, InvalidSdistFilename):
+        pass
+    return None
+
+
+def fetch_simple_timeline(name: str, index_url: str = None) -> dict:
+    """
+    Build the timeline of a package from a PEP 691 JSON simple index: the first `upload-time`
+    of the files of each version. Project urls are not part of the simple API, they are
+    left as None and fetched on demand by `get_project_urls`.
+
+    Indexes that don't report upload times (API version 1.0) still give the list of versions,
+    with None as upload time. Returns None if the index doesn't speak PEP 691 (html only).
+
+    Like `fetch_json_timeline`, only unknown packages (404) give a (cacheable) empty
+    timeline, other errors raise.
+    """
+    index_url = (index_url or PYPI_SIMPLE_URL).rstrip("/")
+    rate_limiters["pypi"].wait()
+    response = session.get(
+        f"{index_url}/{canonicalize_name(name)}/",
+        headers={"Accept": SIMPLE_JSON_CONTENT_TYPE},
+        timeout=PYPI_TIMEOUT,
+    )
+    if response.status_code == 404:
+        return {"versions": {}, "project_urls": {}}
+    response.raise_for_status()
+    if not response.headers.get("Content-Type", "").startswith(
+        SIMPLE_JSON_CONTENT_TYPE
+    ):
+        return None
+
+    simple_json = response.json()
+    # raw version strings (PEP 700), to report them as the project wrote them
+    raw_versions = {
+        str(parse(v)): v for v in simple_json.get("versions", []) if is_valid_version(v)
+    }
+    versions_dict = {}
+    for file in simple_json["files"]:
+        version = version_from_filename(file["filename"])
+        if not version:
+            continue
+        version = raw_versions.get(version, version)
+        # same format as the upload_time of the json api
+        upload_time = file.get("upload-time", "")[:19] or None
+        current = versions_dict.get(version)
+        if current is None or (upload_time and upload_time < current):
+            versions_dict[version] = upload_time or current
+
+    return {"versions": sort_versions(versions_dict), "project_urls": None}
+
+
+def get_package_timeline(name: str, index_url: str = None) -> dict:
+    """
+    Return the release timeline of a package: its versions (sorted, oldest first) with their
+    first upload time and its project urls.
+
+    Depending on PYPI_FETCH_MODE, the versions come from the PEP 691 JSON simple index
+    ("simple", default, much lighter) or from the PyPI JSON API ("json"). The JSON API is
+    also used when the simple index only serves html.
+
+    The result only contains plain data (no components) and is cached in the `timelines`
+    namespace with the package name as key, so it can be exported to a snapshot.
+
+    Timelines from other indexes (`index_url`, e.g. from --extra-index-url) always come
+    from their JSON simple index and have no project urls.
+
+    Parameters
+    ----------
+    name : str
+        Package name.
+    index_url : str, optional
+        Simple index to query instead of PyPI.
+
+    Returns
+    -------
+    dict
+        {"versions": {version: upload_time}, "project_urls": {label: url}}. Both are empty
+        if the package doesn't exist on the index. "project_urls" is None if they haven't
+        been fetched yet (see `get_project_urls`).
+    """
+    name = name.lower()
+    key = timeline_cache_key(name, index_url)
+    timeline = caches["timelines"].get(key)
+    if timeline is not None:
+        return timeline
+
+    if index_url:
+        timeline = fetch_simple_timeline(name, index_url) or {"versions": {}}
+        timeline["project_urls"] = {}
+    else:
+        timeline = fetch_simple_timeline(name) if PYPI_FETCH_MODE == "simple" else None
+        if timeline is None:
+            timeline = fetch_json_timeline(name)
+
+    caches["timelines"].set(key, timeline)
+    return timeline
+
+
+def index_cache_id(index_url: str) -> str:
+    """
+    Identity of an index in cache keys: its url without scheme and credentials.
+    """
+    url = urlsplit(index_url.rstrip("/"))
+    return f"{url.hostname}{':' + str(url.port) if url.port else ''}{url.path}"
+
+
+def timeline_cache_key(name: str, index_url: str = None) -> str:
+    """
+    Cache key of a timeline: the package name for PyPI, "<index>|<name>" for other indexes.
+    Credentials in the index url are left out of the key.
+    """
+    if not index_url:
+        return name
+    return f"{index_cache_id(index_url)}|{name}"
+
+
+def extract_index_urls(extra_index_lines: list[str]) -> list[str]:
+    """
+    Return the urls of `--extra-index-url` lines (see `extract_extra_index_url`).
+    """
+    return [
+        re.split("[ =]", line.strip(), maxsplit=1)[1].strip()
+        for line in extra_index_lines or []
+        if re.match("^--extra-index-url[ =]", line.strip())
+    ]
+
+
+def find_package_timeline(name: str, extra_index_urls=()) -> tuple[str | None, dict]:
+    """
+    Query the extra indexes and PyPI at the same time and return the timeline of the
+    first index, in priority order, that has versions: the extra (private) indexes in
+    their given order, then PyPI. A public package with the same name as a private one
+    never shadows it, whichever index answers first.
+
+    Lower priority indexes aren't waited for once one has versions (their lookups still
+    finish and get cached in the background). If an index fails before one with versions
+    is found, its error is raised rather than falling back to the next index, which could
+    be the public package.
+
+    Returns
+    -------
+    tuple
+        (index_url, timeline); index_url is None for PyPI. If no index knows the package,
+        the (empty) PyPI timeline is returned.
+    """
+    index_urls = list(extra_index_urls) + [None]
+
+    # cached timelines don't need any thread, as long as the higher priority ones are cached
+    for index_url in index_urls:
+        timeline = caches["timelines"].get(timeline_cache_key(name.lower(), index_url))
+        if timeline is None:
+            break
+        if timeline["versions"]:
+            return index_url, timeline
+    else:
+        return None, timeline
+    if len(index_urls) == 1:
+        return None, get_package_timeline(name)
+
+    futures = [
+        index_executor.submit(get_package_timeline, name, index_url)
+        for index_url in index_urls
+    ]
+    try:
+        for index_url, future in zip(index_urls, futures):
+            timeline = future.result()
+            if timeline["versions"]:
+                return index_url, timeline
+    finally:
+        for future in futures:
+            future.cancel()
+    # the PyPI one, the last
+    return None, timeline
+
+
+def get_project_urls(name: str) -> dict:
+    """
+    Return the project urls of a package, fetching the PyPI JSON metadata only if the
+    cached timeline doesn't have them yet.
+    """
+    name = name.lower()
+    timeline = get_package_timeline(name)
+    if timeline["project_urls"] is None:
+        timeline = dict(
+            timeline, project_urls=fetch_json_timeline(name)["project_urls"]
+        )
+        caches["timelines"].set(name, timeline)
+    return timeline["project_urls"]
+
+
+def get_library_history(lib: dict | str, extra_index_urls=()) -> dict:
     """
     lib: dict
+    extra_index_urls: indexes to query together with PyPI (see `find_package_timeline`)
+    """
+    extra_index_urls = tuple(extra_index_urls)
+    # the index urls can carry credentials (user:token@), the memo key only gets
+    # their identity and the urls themselves are only passed to the lookups
+    indexes = tuple(index_cache_id(index_url) for index_url in extra_index_urls)
+    return memoized_library_history(lib, indexes, extra_index_urls=extra_index_urls)
+
 
+@caches["pypi"].memoize(ignore={"extra_index_urls"})
+def memoized_library_history(lib: dict | str, indexes: tuple, extra_index_urls=()):
+    """
+    `get_library_history`, memoized with the `indexes` ids instead of their urls.
     """
     if isinstance(lib, str):
         lib = {"name": lib}
@@ -253,49 +985,29 @@ def get_library_history(lib: dict | str) -> dict:
     # we use .lower to make the grid sorting easier (it treats uppercase differently)
     name = lib["name"].lower()
 
-    # get information from the pypi page in json forman
-    releases_json = requests.get(f"https://pypi.org/pypi/{name}/json").json()
-    if releases_json and releases_json.get("message") != "Not Found":
-        versions_dict = {
-            k: v[0]["upload_time"]
-            for k, v in releases_json["releases"].items()
-            if len(v)
-        }
-        # only keep valid version keys to make sorting possible
-        # even if that means leaving out versions like '0.8.0-final0'
-        versions_keys = [v for v in versions_dict.keys() if is_valid_version(v)]
-        versions_keys.sort(key=Version)
-        versions = {k: versions_dict[k] for k in versions_keys}
-        newest = versions_keys[-1]
-        newest_date = datetime.datetime.fromisoformat(versions[newest]).strftime(
-            "%Y-%m-%d"
-        )
+    index_url, timeline = find_package_timeline(name, extra_index_urls)
+    versions = timeline["versions"]
+    if versions:
+        newest = list(versions)[-1]
+        newest_date = format_date(versions[newest])
 
         # installed version
-        installed_version_info = versions.get(lib.get("installed_version"))
-
-        installed_date = (
-            datetime.datetime.fromisoformat(installed_version_info).strftime("%Y-%m-%d")
-            if installed_version_info
-            else None
-        )
+        installed_date = format_date(versions.get(lib.get("installed_version")))
 
         # requirements version
-        req_version_info = versions.get(lib.get("req_version"))
+        req_date = format_date(versions.get(lib.get("req_version")))
 
-        req_date = (
-            datetime.datetime.fromisoformat(req_version_info).strftime("%Y-%m-%d")
-            if req_version_info
-            else None
-        )
+        project_urls_raw = timeline["project_urls"]
 
-        project_urls_raw = releases_json["info"]["project_urls"]
-
-        project_urls = (
-            ", ".join([f"[{k}]({v})" for k, v in project_urls_raw.items()])
-            if project_urls_raw
-            else ""
-        )
+        if project_urls_raw is None:
+            # not fetched yet (simple api), link the pypi page instead of fetching them
+            project_urls = f"[PyPI]({PYPI_URL}/project/{name}/)"
+        else:
+            project_urls = (
+                ", ".join([f"[{k}]({v})" for k, v in project_urls_raw.items()])
+                if project_urls_raw
+                else ""
+            )
 
     else:
         newest = None
@@ -315,62 +1027,153 @@ def get_library_history(lib: dict | str) -> dict:
             # "all_versions": versions,
             "urls": project_urls,
             "urls_dict": project_urls_raw,
+            "index": urlsplit(index_url).hostname if index_url else "pypi.org",
+            # to find the timeline again without exposing credentials
+            "timeline_key": timeline_cache_key(name, index_url),
         }
     )
 
     return lib
 
 
-@cache.memoize()
+@caches["pypi"].memoize()
 def get_repo_url(lib: dict):
-    for name, url in lib["urls_dict"].items():
-        if (name.lower() in ["source", "github"]) or ("github" in url):
-            is_github = True
-            url_parts = url.removeprefix("https://github.com/").split("/")
+    """
+    Find the GitHub repo and the changelog file or page of a library in its project urls.
+
+    Returns
+    -------
+    dict
+        `url`: the GitHub repo (owner/name only) or, failing that, the changelog url;
+        `is_github`; `changelog_url`: the changelog url (None if there isn't any).
+    """
+    urls_dict = lib.get("urls_dict")
+    if urls_dict is None:
+        urls_dict = get_project_urls(lib["name"])
+    gh_url = None
+    changelog_url = None
+    for name, url in urls_dict.items():
+        parts = urlsplit(url)
+        is_github = parts.netloc in ["github.com", "www.github.com"]
+        is_changelog = (
+            name.lower() in ["changes", "changelog", "history", "release notes"]
+        ) or ("change" in parts.path.lower())
+        # files of a GitHub repo (.../blob/main/CHANGES.rst) are changelogs too,
+        # other GitHub urls (.../releases) point to the repo
+        if is_changelog and (not is_github or "/blob/" in parts.path):
+            changelog_url = changelog_url or url
+        elif gh_url is None and (is_github or name.lower() == "github"):
+            url_parts = parts.path.strip("/").split("/")
             # make sure that the url matches the format for the GitHub API (gh/repo_owner/repo_name)
             # for example if the url is https://github.com/plotly/dash/releases, remove /releases
-            if len(url_parts) > 2:
-                url = f"https://github.com/{url_parts[0]}/{url_parts[1]}"
-            return {"url": url, "is_github": True}
-        elif (name.lower() in ["changes", "changelog"]) or ("change" in url):
-            return {"url": url, "is_github": False}
-
+            if is_github and len(url_parts) >= 2:
+                gh_url = f"https://github.com/{url_parts[0]}/{url_parts[1]}"
+
+    if gh_url:
+        return {"url": gh_url, "is_github": True, "changelog_url": changelog_url}
+    elif changelog_url:
+        return {
+            "url": changelog_url,
+            "is_github": False,
+            "changelog_url": changelog_url,
+        }
     return {"url": None}
 
 
-# https://flask-caching.readthedocs.io/en/latest/index.html#deleting-memoize-cache
-# TODO: add checks for recent updates to delete memoized result
+# part of the cache keys of parsed changelogs: bump it when their parsing or format
+# changes, so that the entries cached before are ignored (and evicted in time)
+CHANGELOG_PARSER_VERSION = 1
+
+
+# TODO: add checks for recent updates to delete the cached result
 # and re-execute the get_gh_changelogs function
-@cache.memoize()
 def get_changelogs(repo_url_dict, github_pat=None):
-    if repo_url_dict.get("url"):
-        if repo_url_dict.get("is_github"):
-            changelogs_dict = get_gh_changelogs(
-                repo_url_dict.get("url"), github_pat=github_pat
-            )
-            versions_reversed = [i for i in changelogs_dict.keys()]
-            return {
-                "all_changelogs": changelogs_dict,
-                "versions_reversed": versions_reversed,
-            }
-        else:
-            return {"url": repo_url}
-    else:
+    """
+    Return the changelogs of a repo as {"all_changelogs": {version: {release_date,
+    release_url, changelog_text}}, "versions_reversed": [...]}.
+
+    The GitHub releases are used first, then the changelog file or page of the library,
+    then a CHANGELOG/CHANGES/HISTORY file at the root of the GitHub repo. If a changelog
+    url exists but can't be parsed, {"url": url} is returned.
+
+    Results are cached in the `changelogs` namespace, unless a changelog file couldn't
+    be downloaded (network error, 5xx...): those are tried again on the next call.
+    """
+    # the token would be written to the cache files (and snapshots) as part of the key:
+    # only whether there is one is part of it, since without one the GitHub releases
+    # are skipped
+    authenticated = bool(os.environ.get("GITHUB_PAT", github_pat))
+    key = (
+        "changelogs",
+        CHANGELOG_PARSER_VERSION,
+        repo_url_dict.get("url"),
+        repo_url_dict.get("is_github"),
+        repo_url_dict.get("changelog_url"),
+        authenticated,
+    )
+    result = caches["changelogs"].get(key)
+    if result is not None:
+        return result
+
+    if not repo_url_dict.get("url"):
         return {"error_message": "No changelog was found for this library."}
 
+    changelogs_dict = {}
+    failed = False
+    if repo_url_dict.get("is_github"):
+        changelogs_dict = get_gh_changelogs(
+            repo_url_dict.get("url"), github_pat=github_pat
+        )
+    try:
+        if not changelogs_dict and repo_url_dict.get("changelog_url"):
+            changelogs_dict = get_file_changelogs(repo_url_dict["changelog_url"])
+        if not changelogs_dict and repo_url_dict.get("is_github"):
+            changelogs_dict = find_gh_changelog_file(repo_url_dict.get("url"))
+    except requests.RequestException as err:
+        print(f"changelog of {repo_url_dict.get('url')} not cached: {err!r}")
+        failed = True
+
+    if changelogs_dict or repo_url_dict.get("is_github"):
+        result = {
+            "all_changelogs": changelogs_dict,
+            "versions_reversed": list(changelogs_dict),
+        }
+    else:
+        result = {"url": repo_url_dict.get("url")}
+    if not failed:
+        caches["changelogs"].set(key, result)
+    return result
+
+
+GITHUB_API_HOST = urlsplit(GITHUB_API_URL).netloc
+
 
 # https://github.com/PyGithub/PyGithub
-@cache.memoize()
 def get_gh_changelogs(repo_url, github_pat=None):
+    """
+    Return the GitHub releases of a repo as {version: {release_date, release_url, changelog_text}}.
+
+    Results are cached in the `release_notes` namespace with the repo url as key
+    (never the token), so they can be exported to a snapshot.
+    """
 
     stripped_url = repo_url.replace("https://", "").replace("github.com/", "")
 
+    changelogs = caches["release_notes"].get(stripped_url)
+    if changelogs is not None:
+        return changelogs
+
     GITHUB_PAT = os.environ.get("GITHUB_PAT", github_pat)
 
     if GITHUB_PAT:
+        rate_limiters["github"].wait()
         auth = Auth.Token(GITHUB_PAT)
         # Public Web Github
-        with Github(auth=auth) as g:
+        # PyGithub has its own session, the whole (paginated) fetch is timed instead
+        with (
+            metrics.timed("http_client_request_seconds", host=GITHUB_API_HOST),
+            Github(base_url=GITHUB_API_URL, auth=auth) as g,
+        ):
             repo = g.get_repo(stripped_url)
 
             # Call get_releases() to fetch the releases
@@ -383,11 +1186,1151 @@ def get_gh_changelogs(repo_url, github_pat=None):
                 }
                 for r in releases
             }
+            caches["release_notes"].set(stripped_url, changelogs)
             return changelogs
 
     return {}
 
 
+# changelog files looked for at the root of GitHub repos without releases
+CHANGELOG_FILENAMES = [
+    "CHANGELOG.md",
+    "CHANGES.md",
+    "HISTORY.md",
+    "CHANGES.rst",
+    "CHANGELOG.rst",
+    "HISTORY.rst",
+]
+# version in a changelog heading: "Version 3.1.0", "[1.2.0] - 2024-01-01", "v2.0.0rc1 (...)"
+HEADING_VERSION = re.compile(
+    r"(?<![\w.])v?(\d+(?:\.\d+)+(?:[-_.]?(?:a|b|c|rc|alpha|beta|pre|preview|post|dev)[-_.]?\d*)*)(?!\.?\w)",
+    re.IGNORECASE,
+)
+RELEASE_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+ATX_HEADING = re.compile(r"^(#{1,6})\s+(.*?)[\s#]*$")
+# rst adornment or markdown setext underline
+HEADING_ADORNMENT = re.compile(r"^([=\-~^\"'*+#:.`_])\1{2,}\s*$")
+
+
+def raw_changelog_url(url: str) -> str:
+    """
+    Url of the raw content of a changelog file: GitHub and GitLab file pages are turned
+    into their raw counterpart, other urls (e.g. ReadTheDocs pages) are kept.
+    """
+    parts = urlsplit(url)
+    if parts.netloc in ["github.com", "www.github.com"] and "/blob/" in parts.path:
+        repo, _, ref_path = parts.path.strip("/").partition("/blob/")
+        return f"{GITHUB_RAW_URL}/{repo}/{ref_path}"
+    # GitLab, including self-hosted instances
+    url = url.split("#")[0]
+    return url.replace("/-/blob/", "/-/raw/", 1)
+
+
+class ChangelogHTMLParser(HTMLParser):
+    """
+    Turn an HTML changelog page (ReadTheDocs, Sphinx, MkDocs) into markdown: headings
+    become "#" headings, list items bullets, and navigation and permalinks are left out.
+    """
+
+    SKIPPED_TAGS = {"script", "style", "head", "nav", "header", "footer", "aside"}
+    BLOCK_TAGS = {"p", "div", "section", "article", "main", "ul", "ol", "dl", "dd"}
+    BLOCK_TAGS |= {"dt", "table", "tr", "blockquote", "br"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.skip_tag = None
+        self.skip_depth = 0
+        self.in_pre = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self.skip_tag:
+            self.skip_depth += tag == self.skip_tag
+            return
+        if (
+            tag in self.SKIPPED_TAGS
+            or attrs.get("role") in ["navigation", "search"]
+            or "headerlink" in (attrs.get("class") or "")
+        ):
+            self.skip_tag, self.skip_depth = tag, 1
+        elif tag in ["h1", "h2", "h3", "h4", "h5", "h6"]:
+            self.parts.append("\n\n" + "#" * int(tag[1]) + " ")
+        elif tag == "li":
+            self.parts.append("\n- ")
+        elif tag == "pre":
+            self.in_pre = True
+            self.parts.append("\n```\n")
+        elif tag == "code" and not self.in_pre:
+            self.parts.append("`")
+        elif tag in self.BLOCK_TAGS and self.parts[-1:] != ["\n- "]:
+            # <li><p>...</p></li> stays on the bullet line
+            self.parts.append("\n\n")
+
+    def handle_endtag(self, tag):
+        if self.skip_tag:
+            self.skip_depth -= tag == self.skip_tag
+            if not self.skip_depth:
+                self.skip_tag = None
+            return
+        if tag in ["h1", "h2", "h3", "h4", "h5", "h6"]:
+            self.parts.append("\n\n")
+        elif tag == "pre":
+            self.in_pre = False
+            self.parts.append("\n```\n")
+        elif tag == "code" and not self.in_pre:
+            self.parts.append("`")
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data):
+        if self.skip_tag:
+            return
+        self.parts.append(data if self.in_pre else re.sub(r"\s+", " ", data))
+
+    def markdown(self) -> str:
+        lines = [line.rstrip() for line in "".join(self.parts).split("\n")]
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def html_to_markdown(text: str) -> str:
+    parser = ChangelogHTMLParser()
+    parser.feed(text)
+    parser.close()
+    return parser.markdown()
+
+
+def rst_to_markdown(text: str) -> str:
+    """
+    Convert the most common inline rst markup of changelogs to markdown: literals,
+    links and roles (:issue:`123`, :func:`name <target>`).
+    """
+    text = re.sub(r"``([^`]+)``", r"`\1`", text)
+    text = re.sub(r"`([^`<]+?)\s*<(https?://[^>]+)>`__?", r"[\1](\2)", text)
+    text = re.sub(r":[\w:-]+:`([^`<]+?)\s*<[^>]+>`", r"`\1`", text)
+    return re.sub(r":[\w:-]+:`([^`]+)`", r"`\1`", text)
+
+
+def changelog_headings(text: str) -> tuple[list[str], list[tuple[int, int, str]]]:
+    """
+    Find the headings of a markdown or rst document. Underlined (and overlined) titles
+    are rewritten as "#" headings, their level being the order in which each adornment
+    style first appears, as in rst.
+
+    Returns
+    -------
+    tuple
+        The document lines and a list of (line index, level, title).
+    """
+    source = text.splitlines()
+    lines, headings, styles = [], [], []
+    i = 0
+    while i < len(source):
+        line = source[i]
+        following = source[i + 1] if i + 1 < len(source) else ""
+        match = ATX_HEADING.match(line)
+        title = style = None
+        if match:
+            level, title = len(match[1]), match[2]
+            i += 1
+        elif (
+            HEADING_ADORNMENT.match(line)
+            and following.strip()
+            and i + 2 < len(source)
+            and source[i + 2].rstrip() == line.rstrip()
+        ):
+            style, title = (line[0], True), following.strip()
+            i += 3
+        elif (
+            line.strip()
+            and not line.startswith((" ", "\t"))
+            and HEADING_ADORNMENT.match(following)
+            and len(following.rstrip()) >= len(line.strip())
+        ):
+            style, title = (following[0], False), line.strip()
+            i += 2
+        else:
+            lines.append(line)
+            i += 1
+            continue
+        if style:
+            if style not in styles:
+                styles.append(style)
+            level = min(styles.index(style) + 1, 6)
+        headings.append((len(lines), level, title))
+        lines.append("#" * level + " " + title)
+    return lines, headings
+
+
+def heading_version(title: str):
+    for match in HEADING_VERSION.finditer(title):
+        if is_valid_version(match[1]):
+            return match[1]
+    return None
+
+
+def split_changelog(text: str, url: str, markup: str = "md") -> dict:
+    """
+    Split a changelog document into per-version sections, in the format of
+    `get_gh_changelogs`: {version: {release_date, release_url, changelog_text}}, newest
+    version first.
+
+    The sections are the headings that contain a version, at the level where most of
+    these headings are (sub-headings such as "Python 3.12 support" are kept in the
+    section text). A section ends at the next heading of the same or a higher level.
+
+    Parameters
+    ----------
+    text : str
+        The changelog, markdown (HTML pages are converted first) or rst.
+    url : str
+        Used as the `release_url` of every version.
+    markup : str
+        "rst" converts the inline rst markup of the sections to markdown.
+    """
+    lines, headings = changelog_headings(text)
+    headings = [(i, level, heading_version(title)) for i, level, title in headings]
+    levels = Counter(level for _, level, version in headings if version)
+    if not levels:
+        return {}
+    section_level = min(levels, key=lambda level: (-levels[level], level))
+    bounds = [i for i, level, _ in headings if level <= section_level] + [len(lines)]
+
+    changelogs = {}
+    for i, level, version in headings:
+        if level != section_level or not version or version in changelogs:
+            continue
+        end = next(bound for bound in bounds if bound > i)
+        body = "\n".join(lines[i + 1 : end]).strip()
+        # the date is in the heading, or on the first lines ("Released 2024-11-13")
+        date = RELEASE_DATE.search(lines[i]) or RELEASE_DATE.search(
+            "\n".join(lines[i + 1 : min(i + 4, end)])
+        )
+        changelogs[version] = {
+            "release_date": date[0] if date else None,
+            "release_url": url,
+            "changelog_text": rst_to_markdown(body) if markup == "rst" else body,
+        }
+    return dict(
+        sorted(changelogs.items(), key=lambda item: parse(item[0]), reverse=True)
+    )
+
+
+def get_file_changelogs(url: str) -> dict:
+    """
+    Download a changelog file (GitHub/GitLab file, raw file, ReadTheDocs page) and split
+    it into per-version sections (see `split_changelog`).
+
+    Results are cached in the `release_notes` namespace with the url (without scheme) and
+    `CHANGELOG_PARSER_VERSION` as key, like the GitHub releases, when at least one version
+    was found. Missing files (404) give {}; other errors (network, 5xx, rate limiting)
+    raise a `requests.RequestException`.
+    """
+    key = f"{url.split('://', 1)[-1]}|v{CHANGELOG_PARSER_VERSION}"
+    changelogs = caches["release_notes"].get(key)
+    if changelogs is not None:
+        return changelogs
+
+    raw_url = raw_changelog_url(url)
+    response = session.get(raw_url, timeout=30)
+    if response.status_code in [404, 410]:
+        return {}
+    response.raise_for_status()
+
+    path = urlsplit(raw_url).path.lower()
+    if "html" in response.headers.get("Content-Type", ""):
+        text, markup = html_to_markdown(response.text), "md"
+    else:
+        text = response.text
+        markup = "rst" if path.endswith((".rst", ".txt")) else "md"
+
+    changelogs = split_changelog(text, url, markup=markup)
+    if changelogs:
+        caches["release_notes"].set(key, changelogs)
+    return changelogs
+
+
+def find_gh_changelog_file(repo_url: str) -> dict:
+    """
+    Look for a changelog file (see `CHANGELOG_FILENAMES`) at the root of the default
+    branch of a GitHub repo and return its sections (see `split_changelog`).
+    """
+    for filename in CHANGELOG_FILENAMES:
+        changelogs = get_file_changelogs(f"{repo_url}/blob/HEAD/{filename}")
+        if changelogs:
+            return changelogs
+    return {}
+
+
 @cache.memoize()
 def get_lib_names_list(store_req=[], store_pip=[]):
     return list(set([lib["name"] for lib in store_req + store_pip]))
+
+
+def get_library_changelogs(lib_name: str, github_pat=None) -> dict:
+    """
+    Return the changelogs of a library (see `get_changelogs`) from its name.
+    """
+    lib = get_library_history(lib_name)
+    repo_url = get_repo_url(lib)
+    changelogs = get_changelogs(repo_url, github_pat=github_pat)
+    all_changelogs = changelogs.get("all_changelogs")
+    if all_changelogs:
+        # changelog files don't always date their versions, PyPI does
+        if not all(c["release_date"] for c in all_changelogs.values()):
+            _, timeline = find_package_timeline(lib["name"])
+            for version, changelog in all_changelogs.items():
+                changelog["release_date"] = changelog["release_date"] or format_date(
+                    timeline["versions"].get(version)
+                )
+        index_release_notes(lib["name"], all_changelogs)
+    return changelogs
+
+
+# full-text index of the release notes, next to the diskcache
+RELEASE_NOTES_INDEX = os.path.join(CACHE_DIRECTORY, "release_notes_fts.db")
+
+
+def release_notes_index_connection() -> sqlite3.Connection:
+    connection = sqlite3.connect(RELEASE_NOTES_INDEX, timeout=30)
+    connection.row_factory = sqlite3.Row
+    # several gunicorn workers write to the same file
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS release_notes USING fts5(
+            package UNINDEXED,
+            version UNINDEXED,
+            release_date UNINDEXED,
+            release_url UNINDEXED,
+            body,
+            tokenize = 'porter unicode61'
+        );
+        CREATE TABLE IF NOT EXISTS indexed_versions (
+            package TEXT,
+            version TEXT,
+            PRIMARY KEY (package, version)
+        );
+        """
+    )
+    return connection
+
+
+def index_release_notes(package: str, changelogs: dict) -> int:
+    """
+    Add the release notes of a package (see `get_gh_changelogs`) to the full-text index.
+    Only the versions that aren't indexed yet are inserted.
+
+    Returns
+    -------
+    int
+        Number of versions added.
+    """
+    package = package.lower()
+    with closing(release_notes_index_connection()) as connection, connection:
+        indexed = {
+            row["version"]
+            for row in connection.execute(
+                "SELECT version FROM indexed_versions WHERE package = ?", (package,)
+            )
+        }
+        new_versions = [v for v in changelogs if v not in indexed]
+        connection.executemany(
+            "INSERT INTO release_notes VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    package,
+                    v,
+                    changelogs[v].get("release_date"),
+                    changelogs[v].get("release_url"),
+                    changelogs[v].get("changelog_text") or "",
+                )
+                for v in new_versions
+            ],
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO indexed_versions VALUES (?, ?)",
+            [(package, v) for v in new_versions],
+        )
+    return len(new_versions)
+
+
+def search_release_notes(
+    query: str, packages=None, version_ranges: dict = None, limit: int = 100
+) -> list[dict]:
+    """
+    Full-text search over the indexed release notes, best matches first.
+
+    Parameters
+    ----------
+    query : str
+        FTS5 query (e.g. `breaking OR deprecated`, `"url_quote"`). If it isn't valid FTS5
+        syntax, its words are searched as plain terms.
+    packages : list of str, optional
+        Only search the release notes of these packages.
+    version_ranges : dict, optional
+        {package: (min_version, max_version)}: only keep the versions newer than min_version
+        and up to max_version (e.g. installed and newest) for these packages.
+    limit : int
+        Maximum number of results.
+
+    Returns
+    -------
+    list of dict
+        {"package", "version", "release_date", "release_url", "snippet"}
+    """
+    if packages is None and version_ranges:
+        packages = list(version_ranges)
+    sql = (
+        "SELECT package, version, release_date, release_url, "
+        "snippet(release_notes, 4, '**', '**', '...', 24) AS snippet "
+        "FROM release_notes WHERE release_notes MATCH ?"
+    )
+    params = [query]
+    if packages is not None:
+        sql += f" AND package IN ({', '.join('?' * len(packages))})"
+        params += [p.lower() for p in packages]
+    if version_ranges:
+        sql += " AND in_version_range(package, version)"
+    # filtering and limiting in sqlite: snippets are only built for the rows returned
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+
+    # parsed once, the function is called for every matching row
+    bounds = {
+        package: tuple(
+            parse(v) if v and is_valid_version(v) else None for v in version_range
+        )
+        for package, version_range in (version_ranges or {}).items()
+    }
+
+    @functools.lru_cache(maxsize=None)
+    def parse_or_none(version):
+        try:
+            return Version(version)
+        except InvalidVersion:
+            return None
+
+    def in_version_range(package, version):
+        if package not in bounds:
+            return True
+        min_version, max_version = bounds[package]
+        parsed = parse_or_none(version)
+        return (
+            parsed is not None
+            and (min_version is None or parsed > min_version)
+            and (max_version is None or parsed <= max_version)
+        )
+
+    with closing(release_notes_index_connection()) as connection:
+        connection.create_function(
+            "in_version_range", 2, in_version_range, deterministic=True
+        )
+        try:
+            rows = connection.execute(sql, params).fetchall()
+        except sqlite3.OperationalError:
+            # not valid fts5 syntax (e.g. "werkzeug.urls"), search the words instead
+            params[0] = " ".join(
+                f'"{word}"' for word in query.replace('"', " ").split()
+            )
+            rows = connection.execute(sql, params).fetchall()
+
+    return [dict(row) for row in rows]
+
+
+def days_between(start_date: str | None, end_date: str | None) -> int | None:
+    """
+    Number of days between two "%Y-%m-%d" dates, None if any of them is missing.
+    """
+    if not (start_date and end_date):
+        return None
+    return (
+        datetime.date.fromisoformat(end_date) - datetime.date.fromisoformat(start_date)
+    ).days
+
+
+def enrich_library(lib: dict | str, extra_index_urls=()) -> dict:
+    """
+    Add the PyPI history (see `get_library_history`), the staleness and the changelog url
+    to a library parsed with `extract_name_version`.
+
+    `days_behind` is the number of days between the release of the installed version
+    (or the requirements.txt one if there's no pip freeze) and the newest release.
+    """
+    lib = get_library_history(lib, extra_index_urls).copy()
+    lib["days_behind"] = days_between(
+        lib.get("installed_release_date") or lib.get("req_release_date"),
+        lib.get("newest_release_date"),
+    )
+    repo_url = get_repo_url(lib)
+    lib["changelog_url"] = repo_url.get("changelog_url") or repo_url.get("url")
+    return lib
+
+
+def versions_in_range(
+    versions, min_version=None, max_version=None, include_min=True
+) -> list[str]:
+    """
+    Return the versions between `min_version` and `max_version` (both optional),
+    keeping the input order. `max_version` is always included; `min_version` only if
+    `include_min` (set it to False to get what changed since an installed version).
+    Versions that can't be parsed (e.g. odd tag names) are left out.
+    """
+    min_parsed = (
+        parse(min_version) if min_version and is_valid_version(min_version) else None
+    )
+    max_parsed = (
+        parse(max_version) if max_version and is_valid_version(max_version) else None
+    )
+    selected = []
+    for version in versions:
+        if not is_valid_version(version):
+            continue
+        parsed = parse(version)
+        if min_parsed and (
+            parsed < min_parsed or (parsed == min_parsed and not include_min)
+        ):
+            continue
+        if max_parsed and parsed > max_parsed:
+            continue
+        selected.append(version)
+    return selected
+
+
+def timeline_versions(timeline_key: str) -> tuple:
+    """
+    (version, upload_time) pairs of a cached timeline (see `get_package_timeline`), oldest
+    first; empty if it isn't cached.
+    """
+    versions = (caches["timelines"].get(timeline_key) or {}).get("versions") or {}
+    return tuple(versions.items())
+
+
+def timeline_arrays(timeline_key: str) -> dict:
+    """
+    Compact, sorted numpy arrays of a cached timeline (see `get_package_timeline`): for every
+    version (oldest first), its release components and upload date. The rank of a version
+    is its position. Versions are parsed once here, so `staleness_frame` doesn't parse anything.
+    """
+    return versions_arrays(timeline_versions(timeline_key))
+
+
+# small and read for every row of every grid: keep the hot ones in memory, keyed by the
+# timeline content so that a refreshed (or evicted) timeline never gets stale arrays
+@functools.lru_cache(maxsize=4096)
+def versions_arrays(versions: tuple) -> dict:
+    """
+    `timeline_arrays` of the (version, upload_time) pairs of a timeline.
+    """
+    versions = dict(versions)
+    return {
+        "version": np.array(list(versions), dtype=object),
+        "release": np.array(
+            [(Version(v).release + (0, 0))[:3] for v in versions], dtype=np.int64
+        ).reshape(-1, 3),
+        "date": np.array(
+            [d[:10] if d else "NaT" for d in versions.values()], dtype="datetime64[D]"
+        ),
+    }
+
+
+def timelines_frame(timeline_keys) -> pd.DataFrame:
+    """
+    One row per (timeline_key, version) for all the timelines, built by concatenating
+    their arrays.
+    """
+    arrays = [timeline_arrays(key) for key in timeline_keys]
+    lengths = [len(a["version"]) for a in arrays]
+    release = np.concatenate([a["release"] for a in arrays] or [np.empty((0, 3))])
+    return pd.DataFrame(
+        {
+            "timeline_key": np.repeat(np.array(timeline_keys, dtype=object), lengths),
+            "version": np.concatenate([a["version"] for a in arrays] or [[]]),
+            "rank": np.concatenate([np.arange(n) for n in lengths] or [[]]),
+            "major": release[:, 0],
+            "minor": release[:, 1],
+            "patch": release[:, 2],
+            "date": np.concatenate(
+                [a["date"] for a in arrays] or [np.empty(0, "datetime64[D]")]
+            ),
+        }
+    )
+
+
+# keyed by the timeline content like `versions_arrays`, never by the package name
+@functools.lru_cache(maxsize=4096)
+def release_order(versions: tuple) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Upload dates of the final versions of a timeline (its (version, upload_time) pairs,
+    see `timeline_versions`), sorted chronologically, and for each of them the position
+    (see `timeline_arrays`) of the highest version uploaded up to that date. Versions are
+    sorted oldest first, so a running maximum of the positions gives the highest version.
+    """
+    arrays = versions_arrays(versions)
+    final = np.array(
+        [not Version(v).is_prerelease for v in arrays["version"]], dtype=bool
+    )
+    positions = np.flatnonzero(final & ~np.isnat(arrays["date"]))
+    order = positions[np.argsort(arrays["date"][positions], kind="stable")]
+    return arrays["date"][order], np.maximum.accumulate(order) if len(order) else order
+
+
+def version_as_of(timeline_key: str, cutoff_date: str) -> str | None:
+    """
+    Highest final version of a cached timeline uploaded on or before `cutoff_date`
+    ("%Y-%m-%d"), i.e. what pip would have installed that day. None if there was none.
+    A bisect over the sorted upload dates, without any network call.
+    """
+    versions = timeline_versions(timeline_key)
+    dates, highest = release_order(versions)
+    i = np.searchsorted(dates, np.datetime64(cutoff_date[:10], "D"), side="right")
+    return versions_arrays(versions)["version"][highest[i - 1]] if i else None
+
+
+def pin_requirement(line: str, name: str, version: str) -> str:
+    """
+    Rewrite a requirements.txt line with `==version`, keeping its extras and markers.
+    """
+    try:
+        requirement = Requirement(line.split(" #")[0].strip())
+    except InvalidRequirement:
+        return f"{name}=={version}"
+    requirement.specifier = SpecifierSet(f"=={version}")
+    requirement.url = None
+    return str(requirement)
+
+
+def pin_requirements_as_of(
+    libs: list[dict], cutoff_date: str, extra_index_urls=()
+) -> list[str]:
+    """
+    Pin every library of a requirements.txt to the version pip would have installed on
+    `cutoff_date`. Cached timelines are used as they are, only the missing ones are
+    fetched (concurrently).
+
+    Returns
+    -------
+    list of str
+        One line per library, in the input order. Libraries without a release before the
+        cutoff are kept unpinned with a comment.
+    """
+
+    def project_name(lib):
+        # names can carry extras (requests[socks]), the project is what PyPI knows
+        try:
+            return Requirement(lib.get("raw_line_req") or lib["name"]).name
+        except InvalidRequirement:
+            return lib["name"]
+
+    def timeline_key(name):
+        index_url, _ = find_package_timeline(name, extra_index_urls)
+        return timeline_cache_key(name, index_url)
+
+    names = [project_name(lib) for lib in libs]
+    keys = {
+        name: key
+        for name, key, err in run_concurrently(timeline_key, list(set(names)))
+        if not err
+    }
+    lines = []
+    for lib, name in zip(libs, names):
+        version = version_as_of(keys[name], cutoff_date) if name in keys else None
+        if version:
+            line = lib.get("raw_line_req") or lib["name"]
+            lines.append(pin_requirement(line, name, version))
+        else:
+            lines.append(f"{lib['name']}  # no release on or before {cutoff_date}")
+    return lines
+
+
+STALENESS_COLUMNS = [
+    "days_behind",
+    "releases_behind",
+    "major_lag",
+    "minor_lag",
+    "patch_lag",
+]
+
+
+def staleness_frame(records: list[dict]) -> pd.DataFrame:
+    """
+    Add the staleness columns to libraries enriched by `get_library_history`, for all of them
+    at once: the timelines are concatenated and merged with the current (installed, or
+    requirements.txt) and newest versions, then every column is a vectorized operation.
+
+    - days_behind: days between the current and the newest release
+    - releases_behind: number of releases between the current and the newest version
+    - major_lag: newest major - current major
+    - minor_lag: newest minor - current minor, if they share the major version (else 0)
+    - patch_lag: newest patch - current patch, if they share major and minor (else 0)
+
+    Columns are empty when the current version isn't in the timeline.
+    """
+    df = pd.DataFrame.from_records(records)
+    if df.empty or "timeline_key" not in df:
+        return df.assign(**{column: None for column in STALENESS_COLUMNS})
+
+    timelines = timelines_frame(list(df["timeline_key"].dropna().unique()))
+    current_version = df.get("installed_version", pd.Series(index=df.index)).fillna(
+        df.get("req_version", pd.Series(index=df.index))
+    )
+
+    current = pd.DataFrame(
+        {"timeline_key": df["timeline_key"], "version": current_version}
+    ).merge(timelines, how="left", on=["timeline_key", "version"])
+    newest = pd.DataFrame(
+        {"timeline_key": df["timeline_key"], "version": df["newest_version"]}
+    ).merge(timelines, how="left", on=["timeline_key", "version"])
+
+    major_lag = newest["major"] - current["major"]
+    minor_lag = (newest["minor"] - current["minor"]).where(major_lag == 0, 0)
+    patch_lag = (newest["patch"] - current["patch"]).where(
+        (major_lag == 0) & (minor_lag == 0), 0
+    )
+    staleness = pd.DataFrame(
+        {
+            "days_behind": (newest["date"] - current["date"]).dt.days,
+            "releases_behind": newest["rank"] - current["rank"],
+            "major_lag": major_lag,
+            "minor_lag": minor_lag.where(current["rank"].notna()),
+            "patch_lag": patch_lag.where(current["rank"].notna()),
+        }
+    ).astype("Int64")
+    df[STALENESS_COLUMNS] = staleness.to_numpy(dtype=object, na_value=None)
+    return df
+
+
+def staleness_summary(df: pd.DataFrame) -> dict:
+    """
+    Aggregates of a `staleness_frame` for the whole upload.
+    """
+    known = df["releases_behind"].dropna() if "releases_behind" in df else pd.Series()
+    days = df["days_behind"].dropna() if "days_behind" in df else pd.Series()
+    return {
+        "packages": len(df),
+        "outdated": int((known > 0).sum()),
+        "unknown": len(df) - len(known),
+        "major_behind": int((df.get("major_lag", pd.Series()).dropna() > 0).sum()),
+        "median_days_behind": int(days.median()) if len(days) else None,
+        "max_days_behind": int(days.max()) if len(days) else None,
+        "releases_behind": int(known.sum()),
+    }
+
+
+def diff_freezes(before: list[dict], after: list[dict]) -> list[dict]:
+    """
+    Compare two pip freezes parsed with `extract_name_version(..., file_type="pip_freeze")`.
+
+    Returns
+    -------
+    list of dict
+        One record per package that changed: {"name", "change", "old_version",
+        "new_version"}, "change" being "added", "removed", "upgraded", "downgraded"
+        or "changed" (versions that can't be compared). Equal versions written
+        differently (1.0 / 1.0.0) aren't changes.
+    """
+    before_index = {lib["name"]: lib["installed_version"] for lib in before}
+    after_index = {lib["name"]: lib["installed_version"] for lib in after}
+
+    changes = []
+    for name in sorted(before_index.keys() | after_index.keys()):
+        old_version = before_index.get(name)
+        new_version = after_index.get(name)
+        if old_version == new_version:
+            continue
+        elif old_version is None:
+            change = "added"
+        elif new_version is None:
+            change = "removed"
+        elif is_valid_version(old_version) and is_valid_version(new_version):
+            if parse(new_version) == parse(old_version):
+                # same version, spelled differently (1.0 / 1.0.0)
+                continue
+            change = (
+                "upgraded" if parse(new_version) > parse(old_version) else "downgraded"
+            )
+        else:
+            change = "changed"
+        changes.append(
+            {
+                "name": name,
+                "change": change,
+                "old_version": old_version,
+                "new_version": new_version,
+            }
+        )
+    return changes
+
+
+def build_portfolio_index(
+    manifests: dict[str, list[dict]]
+) -> dict[str, dict[str, dict]]:
+    """
+    Inverted index of many manifests (requirements.txt or pip freezes parsed with
+    `parse_requirements_text`): package name -> {project: {"version", "pinned"}}.
+
+    Parameters
+    ----------
+    manifests : dict
+        {project: list of libraries}
+    """
+    index = {}
+    for project, libs in manifests.items():
+        for lib in libs:
+            index.setdefault(lib["name"], {})[project] = {
+                "version": lib.get("req_version") or lib.get("installed_version"),
+                "pinned": lib.get("req_pinned", "=="),
+            }
+    return index
+
+
+def projects_pinning_below(
+    portfolio_index: dict, name: str, version: str
+) -> list[dict]:
+    """
+    Return the projects whose requirement for `name` doesn't allow `version` or newer:
+    pinned (==) to an older version, or capped (<, <=) at or below `version`.
+    """
+    limit = parse(version)
+    projects = []
+    for project, entry in portfolio_index.get(name.lower(), {}).items():
+        if not (entry["version"] and is_valid_version(entry["version"])):
+            continue
+        pinned_version = parse(entry["version"])
+        if (entry["pinned"] in ["==", "<="] and pinned_version < limit) or (
+            entry["pinned"] == "<" and pinned_version <= limit
+        ):
+            projects.append(dict(entry, project=project))
+    return projects
+
+
+def get_requires_dist(name: str, version: str | None = None) -> list[str]:
+    """
+    Return the `requires_dist` metadata of a release (of the newest stable one if `version`
+    is None, looked up in its timeline so that the memoized entry names the version).
+    """
+    if version is None:
+        versions = get_package_timeline(name)["versions"]
+        version = newest_stable_version(versions) or next(reversed(versions), None)
+        if version is None:
+            return []
+    return release_requires_dist(name, version)
+
+
+@caches["pypi"].memoize()
+def release_requires_dist(name: str, version: str) -> list[str]:
+    """
+    `get_requires_dist` of a given release. Memoized per (package, version): the metadata
+    of a release never changes. Releases that PyPI doesn't have (404) have no
+    dependencies; other errors raise, so that they aren't memoized.
+    """
+    rate_limiters["pypi"].wait()
+    response = session.get(
+        f"{PYPI_URL}/pypi/{name}/{version}/json", timeout=PYPI_TIMEOUT
+    )
+    if response.status_code == 404:
+        # the project endpoint only describes the latest release
+        response = session.get(f"{PYPI_URL}/pypi/{name}/json", timeout=PYPI_TIMEOUT)
+        if response.status_code == 404:
+            return []
+        response.raise_for_status()
+        if response.json()["info"]["version"] != version:
+            return []
+    response.raise_for_status()
+    return response.json()["info"]["requires_dist"] or []
+
+
+def newest_stable_version(versions) -> str | None:
+    """
+    Last version of a sorted (oldest first) list that isn't a pre or dev release.
+    """
+    for version in reversed(list(versions)):
+        if not parse(version).is_prerelease:
+            return version
+    return None
+
+
+def resolve_dependency_graph(
+    roots: dict[str, str | None], pinned: dict[str, str] = None, workers: int = 8
+) -> dict:
+    """
+    Build the dependency graph of `roots` from the `requires_dist` metadata, breadth-first:
+    all the packages of a level are fetched concurrently.
+
+    Parameters
+    ----------
+    roots : dict
+        {package: version} of the top-level packages. Packages without version use their
+        newest stable release.
+    pinned : dict, optional
+        {package: version} to use for the dependencies found on the way (e.g. a pip freeze).
+
+    Returns
+    -------
+    dict
+        {"nodes": {package: version}, "edges": {package: [{"name", "specifier"}]}} with
+        canonical package names. Extras and requirements whose markers don't apply are left out.
+    """
+    pinned = {canonicalize_name(k): v for k, v in (pinned or {}).items()}
+    nodes = {}
+    edges = {}
+
+    def node_version(name, version=None):
+        version = version or pinned.get(name)
+        if not version:
+            version = newest_stable_version(get_package_timeline(name)["versions"])
+        return version
+
+    def fetch(item):
+        name, version = item
+        return get_requires_dist(name, version)
+
+    level = {
+        canonicalize_name(name): node_version(canonicalize_name(name), version)
+        for name, version in roots.items()
+    }
+    while level:
+        nodes.update(level)
+        next_level = {}
+        for (name, version), requires_dist, err in run_concurrently(
+            fetch, list(level.items()), workers=workers
+        ):
+            edges[name] = []
+            for requirement_string in requires_dist or []:
+                try:
+                    requirement = Requirement(requirement_string)
+                except InvalidRequirement:
+                    continue
+                if requirement.marker and not requirement.marker.evaluate(
+                    {"extra": ""}
+                ):
+                    continue
+                child = canonicalize_name(requirement.name)
+                edges[name].append(
+                    {"name": child, "specifier": str(requirement.specifier)}
+                )
+                if child not in nodes and child not in next_level:
+                    next_level[child] = None
+        # versions of the next level are looked up concurrently too
+        level = {
+            child: version
+            for child, version, err in run_concurrently(
+                node_version, list(next_level), workers=workers
+            )
+        }
+
+    return {"nodes": nodes, "edges": edges}
+
+
+def dependency_parents(graph: dict) -> dict[str, list[str]]:
+    """
+    Reverse adjacency index of a dependency graph: package -> packages requiring it.
+    """
+    parents = {}
+    for parent, children in graph["edges"].items():
+        for child in children:
+            parents.setdefault(child["name"], []).append(parent)
+    return parents
+
+
+def dependency_path(graph: dict, parents: dict, target: str) -> list[str]:
+    """
+    Shortest path from a package without parents (a top-level one) to `target`.
+    """
+    paths = {target: [target]}
+    queue = [target]
+    while queue:
+        name = queue.pop(0)
+        if not parents.get(name):
+            return paths[name]
+        for parent in parents[name]:
+            if parent not in paths:
+                paths[parent] = [parent] + paths[name]
+                queue.append(parent)
+    return paths[target]
+
+
+def upgrade_blockers(graph: dict) -> dict[str, list[dict]]:
+    """
+    For every package of the graph, the requirements that exclude its newest stable
+    release, with the path leading to each requiring package.
+
+    Returns
+    -------
+    dict
+        {package: [{"parent", "specifier", "path"}]}
+    """
+    parents = dependency_parents(graph)
+    # the timelines of all the constrained packages at once, not one edge after the other
+    constrained = {
+        child["name"]
+        for children in graph["edges"].values()
+        for child in children
+        if child["specifier"]
+    }
+    newest_versions = {
+        name: newest_stable_version(timeline["versions"])
+        for name, timeline, err in run_concurrently(
+            get_package_timeline, list(constrained)
+        )
+        if not err
+    }
+    blockers = {}
+    for parent, children in graph["edges"].items():
+        for child in children:
+            if not child["specifier"]:
+                continue
+            newest = newest_versions.get(child["name"])
+            if newest and not SpecifierSet(child["specifier"]).contains(newest):
+                blockers.setdefault(child["name"], []).append(
+                    {
+                        "parent": parent,
+                        "specifier": child["specifier"],
+                        "path": dependency_path(graph, parents, parent),
+                    }
+                )
+    return blockers
+
+
+# markers searched in the release notes, with their weight in the upgrade risk score
+BREAKING_CHANGE_MARKERS = {
+    "breaking": (
+        re.compile(r"\bbreaking\b|\bbackwards?[- ]incompatib\w*", re.IGNORECASE),
+        5,
+    ),
+    "removed": (re.compile(r"\bremov(?:e|ed|al)\b|\bdropped\b", re.IGNORECASE), 2),
+    "deprecated": (re.compile(r"\bdeprecat\w*", re.IGNORECASE), 1),
+}
+# weight of each major version bump between the current and the newest version
+MAJOR_BUMP_WEIGHT = 10
+
+
+def scan_breaking_changes(name: str, current_version: str, newest_version: str) -> dict:
+    """
+    Scan the release notes of the versions after `current_version` up to `newest_version`
+    for breaking change markers (see `BREAKING_CHANGE_MARKERS`) and compute an upgrade
+    risk score. Scans are cached in the `changelogs` namespace, except when no release
+    notes were found, so that they are scanned once they can be fetched.
+
+    Returns
+    -------
+    dict
+        Counts per marker, major bumps, number of release notes scanned, the versions with
+        markers (newest first) and the score.
+    """
+    key = ("breaking_changes", name, current_version, newest_version)
+    result = caches["changelogs"].get(key)
+    if result is not None:
+        return result
+
+    changelogs = get_library_changelogs(name)
+    all_changelogs = changelogs.get("all_changelogs") or {}
+    versions = versions_in_range(
+        changelogs.get("versions_reversed") or [],
+        current_version,
+        newest_version,
+        include_min=False,
+    )
+    result = {
+        "name": name,
+        "current_version": current_version,
+        "newest_version": newest_version,
+        "release_notes_found": bool(all_changelogs),
+        "releases_scanned": len(versions),
+        "major_bumps": 0,
+        "flagged_versions": [],
+    }
+    if is_valid_version(current_version) and is_valid_version(newest_version):
+        result["major_bumps"] = max(
+            0, parse(newest_version).major - parse(current_version).major
+        )
+
+    score = MAJOR_BUMP_WEIGHT * result["major_bumps"]
+    for marker in BREAKING_CHANGE_MARKERS:
+        result[marker] = 0
+    for version in versions:
+        text = all_changelogs[version].get("changelog_text") or ""
+        flagged = False
+        for marker, (pattern, weight) in BREAKING_CHANGE_MARKERS.items():
+            count = len(pattern.findall(text))
+            result[marker] += count
+            score += weight * count
+            flagged = flagged or count > 0
+        if flagged:
+            result["flagged_versions"].append(version)
+    result["score"] = score
+    if all_changelogs:
+        caches["changelogs"].set(key, result)
+    return result
+
+
+# errors of a traceback caused by a package, with the module and (if any) symbol involved
+IMPORT_ERROR_PATTERNS = {
+    "cannot import name": re.compile(
+        r"ImportError: cannot import name '(?P<symbol>[\w.]+)' from "
+        r"(?:partially initialized module )?'(?P<module>[\w.]+)'"
+    ),
+    "no module named": re.compile(
+        r"ModuleNotFoundError: No module named '(?P<module>[\w.]+)'"
+    ),
+    "no attribute": re.compile(
+        r"AttributeError: module '(?P<module>[\w.]+)' has no attribute '(?P<symbol>\w+)'"
+    ),
+}
+# frames of installed packages: File ".../site-packages/werkzeug/urls.py", line 3
+SITE_PACKAGES_FRAME = re.compile(
+    r'File "[^"]*[/\\](?:site|dist)-packages[/\\](?P<module>\w+)'
+)
+
+
+def parse_import_errors(text: str) -> list[dict]:
+    """
+    Find the import errors of pasted tracebacks/logs.
+
+    Returns
+    -------
+    list of dict
+        {"error", "module", "symbol", "line"}, once per (error, module, symbol), in the
+        order they appear. `symbol` is None for missing modules.
+    """
+    errors = {}
+    for line in text.splitlines():
+        for error, pattern in IMPORT_ERROR_PATTERNS.items():
+            match = pattern.search(line)
+            if match:
+                symbol = match.groupdict().get("symbol")
+                errors.setdefault(
+                    (error, match["module"], symbol),
+                    {
+                        "error": error,
+                        "module": match["module"],
+                        "symbol": symbol,
+                        "line": line.strip(),
+                    },
+                )
+    return list(errors.values())
+
+
+def traceback_modules(text: str) -> list[str]:
+    """
+    Top-level modules of the installed packages that appear in the frames of a traceback.
+    """
+    return list(dict.fromkeys(m["module"] for m in SITE_PACKAGES_FRAME.finditer(text)))
+
+
+def symbol_release_notes(name: str, symbol: str, limit: int = 20) -> list[dict]:
+    """
+    Release notes of a library that mention `symbol`, newest version first: where it was
+    deprecated, removed, renamed or added (see `search_release_notes`).
+    """
+    changelogs = get_library_changelogs(name)
+    if not changelogs.get("all_changelogs"):
+        return []
+    results = search_release_notes(f'"{symbol}"', packages=[name], limit=limit)
+    return sorted(
+        results,
+        key=lambda r: (
+            parse(r["version"]) if is_valid_version(r["version"]) else Version("0")
+        ),
+        reverse=True,
+    )